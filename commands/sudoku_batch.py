@@ -0,0 +1,193 @@
+import argparse
+import json
+import sys
+from model.sudoku_engines import engine_names
+from model.sudoku_format import format_puzzle
+from model.sudoku_corpus import is_corpus
+from model.sudoku_pool import get_corpus, solve_corpus, solve_many, solve_text
+
+# Output lines written in place of a solution
+UNSOLVABLE = "unsolvable"
+INVALID = "invalid"
+
+def read_puzzles(stream):
+    """Lazily reads puzzles from a stream, one per line
+
+    Blank lines and lines starting with "#" are skipped. Only the first
+    field of a line is used, so "puzzle,solution" files can be read as well.
+
+    Parameters
+    ----------
+    stream : file
+        A text stream of puzzles
+
+    Yields:
+        The line number and puzzle text of every puzzle
+    """
+
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        yield number, line.replace(",", " ").split()[0]
+
+def solve_puzzles(puzzles, engine="propagation", workers=1, chunksize=64, ordered=True, cache_size=0,
+                  stats=False):
+    """Lazily solves puzzles, optionally across a pool of worker processes
+
+    Parameters
+    ----------
+    puzzles : iterable
+        Pairs of line number and puzzle text
+    engine : str, optional
+        The name of the solving engine, default "propagation"
+    workers : int, optional
+        The number of worker processes, default 1 solves in this process and
+        0 uses one per CPU
+    chunksize : int, optional
+        The number of puzzles sent to a worker at once, default 64
+    ordered : bool, optional
+        Whether results keep the input order, default True
+    cache_size : int, optional
+        The number of solutions each process caches, default 0
+    stats : bool, optional
+        Whether to collect the search stats of every puzzle, default False
+
+    Yields:
+        The line number, puzzle text, solved board (None if unsolvable) and
+        stats dictionary (None unless collected) of every puzzle
+    """
+
+    if workers == 1:
+        for number, text in puzzles:
+            yield solve_text(engine, number, text, cache_size, stats)
+    else:
+        yield from solve_many(puzzles, engine, workers or None, chunksize, ordered, cache_size, stats)
+
+def write_solutions(results, out, errors=sys.stderr, numbered=False, stats_out=None):
+    """Writes one output line per solved puzzle as results arrive
+
+    Parameters
+    ----------
+    results : iterable
+        Line number, puzzle text and solution (or error) triples
+    out : file
+        The text stream for the solutions
+    errors : file, optional
+        The text stream for error messages, default stderr
+    numbered : bool, optional
+        Whether to prefix every line with the puzzle's input line number (its
+        record index in a binary corpus), needed to match up unordered
+        results, default False
+    stats_out : file, optional
+        The text stream receiving one JSON line of search stats per solved
+        puzzle, default None
+
+    Returns:
+        The number of puzzles that could not be solved
+    """
+
+    failures = 0
+    for number, text, solution, stats in results:
+        if isinstance(solution, ValueError):
+            errors.write(f"line {number}: {solution}\n")
+            line = INVALID
+            failures += 1
+        elif solution is None:
+            line = UNSOLVABLE
+            failures += 1
+        else:
+            line = format_puzzle(solution)
+
+        if numbered:
+            line = f"{number} {line}"
+        out.write(line + "\n")
+
+        if stats_out is not None and stats is not None:
+            stats_out.write(json.dumps(dict(line=number, **stats)) + "\n")
+    return failures
+
+def build_parser():
+    """Builds the command line parser
+
+    Returns:
+        An ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(description="Solve Sudoku puzzles written one per line.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="puzzle file or binary corpus, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="solution file, or - for stdout (default)")
+    parser.add_argument("-e", "--engine", default="propagation", choices=engine_names(),
+                        help="solving engine, or portfolio to race several on their own processes "
+                             "(default: propagation)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=64,
+                        help="puzzles sent to a worker at once (default: 64)")
+    parser.add_argument("--cache", type=int, default=0, metavar="SIZE",
+                        help="cache this many solutions per process, keyed by canonical form (default: off)")
+    parser.add_argument("--stats", metavar="FILE",
+                        help="write the search stats of every puzzle to FILE as JSON lines")
+    parser.add_argument("--shard", metavar="INDEX/COUNT",
+                        help="solve only one of COUNT equal record ranges of a binary corpus, e.g. 0/4")
+    parser.add_argument("--unordered", action="store_true",
+                        help="write solutions as they finish, prefixed by their input line number or record index")
+    return parser
+
+def run(argv=None):
+    """Solves every puzzle of the input and streams the solutions out
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments, defaults to sys.argv
+
+    Returns:
+        The exit status, 1 if the input cannot be read or any puzzle could not
+        be solved
+    """
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    corpus = args.input != "-" and is_corpus(args.input)
+    if args.shard and not corpus:
+        parser.error("--shard needs a binary corpus as input")
+
+    try:
+        records = get_corpus(args.input) if corpus else None
+        source = sys.stdin if args.input == "-" or corpus else open(args.input)
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    stats_out = open(args.stats, "w") if args.stats else None
+    try:
+        if corpus:
+            if args.shard:
+                try:
+                    index, count = map(int, args.shard.split("/"))
+                    records = records.shard(index, count)
+                except ValueError:
+                    parser.error(f"invalid shard {args.shard!r}, expected INDEX/COUNT such as 0/4")
+            results = solve_corpus(args.input, args.engine, args.workers or None, args.chunksize,
+                                   not args.unordered, args.cache, stats_out is not None,
+                                   records.start, records.stop)
+        else:
+            results = solve_puzzles(read_puzzles(source), args.engine, args.workers,
+                                    args.chunksize, not args.unordered, args.cache, stats_out is not None)
+        failures = write_solutions(results, out, numbered=args.unordered, stats_out=stats_out)
+    finally:
+        if stats_out is not None:
+            stats_out.close()
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(run())
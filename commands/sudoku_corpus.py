@@ -0,0 +1,147 @@
+import argparse
+import sys
+from itertools import chain
+from commands.sudoku_batch import read_puzzles
+from model.sudoku_compact import CompactBoard
+from model.sudoku_corpus import PuzzleCorpus, write_corpus
+
+def read_boards(source):
+    """Lazily parses puzzles written one per line
+
+    Every puzzle must have the size of the first one.
+
+    Parameters
+    ----------
+    source : file
+        A text stream of puzzles
+
+    Yields:
+        A CompactBoard for every puzzle
+
+    Raises:
+        ValueError naming the line of the first puzzle that is not valid
+    """
+
+    square_size = None
+    for number, text in read_puzzles(source):
+        try:
+            board = CompactBoard.from_text(text)
+        except ValueError as error:
+            raise ValueError(f"line {number}: {error}") from None
+        if square_size is None:
+            square_size = board.square_size
+        elif board.square_size != square_size:
+            raise ValueError(f"line {number}: the puzzle is not the size of the first one")
+        yield board
+
+def pack(source, path, packed=None):
+    """Converts puzzles written one per line into a binary corpus
+
+    Every puzzle must have the size of the first one.
+
+    Parameters
+    ----------
+    source : file
+        A text stream of puzzles
+    path : str
+        The corpus file to write
+    packed : bool, optional
+        Whether cells are packed two to a byte, default whenever they fit
+
+    Returns:
+        The number of puzzles written
+
+    Raises:
+        ValueError naming the line of the first puzzle that is not valid
+    """
+
+    boards = read_boards(source)
+    first = next(boards, None)
+    if first is None:
+        return write_corpus(path, [], packed=packed)
+    return write_corpus(path, chain([first], boards), first.square_size, packed)
+
+def unpack(path, out, start=0, stop=None):
+    """Writes the puzzles of a binary corpus one per line
+
+    Parameters
+    ----------
+    path : str
+        The corpus file
+    out : file
+        The text stream for the puzzles
+    start : int, optional
+        The index of the first record, default 0
+    stop : int, optional
+        The index after the last record, default the end of the corpus
+    """
+
+    with PuzzleCorpus(path) as corpus:
+        for board in corpus[start:stop]:
+            out.write(f"{board}\n")
+
+def build_parser():
+    """Builds the command line parser
+
+    Returns:
+        An ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(description="Convert puzzles between text and the binary corpus format.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = commands.add_parser("pack", help="write text puzzles to a binary corpus")
+    pack_parser.add_argument("input", help="puzzle file, or - for stdin")
+    pack_parser.add_argument("output", help="corpus file to write")
+    pack_parser.add_argument("--unpacked", action="store_true",
+                             help="store one cell per byte so records are read without unpacking")
+
+    unpack_parser = commands.add_parser("unpack", help="write the puzzles of a binary corpus as text")
+    unpack_parser.add_argument("input", help="corpus file")
+    unpack_parser.add_argument("-o", "--output", default="-",
+                               help="puzzle file, or - for stdout (default)")
+    unpack_parser.add_argument("--start", type=int, default=0,
+                               help="index of the first record (default: 0)")
+    unpack_parser.add_argument("--stop", type=int,
+                               help="index after the last record (default: the end)")
+    return parser
+
+def run(argv=None):
+    """Packs or unpacks a binary corpus
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments, defaults to sys.argv
+
+    Returns:
+        The exit status, 1 if a puzzle or the corpus is not valid
+    """
+
+    args = build_parser().parse_args(argv)
+
+    if args.command == "pack":
+        source = sys.stdin if args.input == "-" else open(args.input)
+        try:
+            count = pack(source, args.output, False if args.unpacked else None)
+        except ValueError as error:
+            print(f"{args.input}: {error}", file=sys.stderr)
+            return 1
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        print(f"Wrote {count} puzzles to {args.output}", file=sys.stderr)
+    else:
+        out = sys.stdout if args.output == "-" else open(args.output, "w")
+        try:
+            unpack(args.input, out, args.start, args.stop)
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run())
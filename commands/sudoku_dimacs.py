@@ -0,0 +1,142 @@
+import argparse
+import sys
+from commands.sudoku_batch import read_puzzles
+from model.sudoku_format import format_puzzle, parse_puzzle
+from model.sudoku_sat import SatSolver
+
+def encode(puzzles, output):
+    """Writes every puzzle as a DIMACS CNF problem
+
+    Parameters
+    ----------
+    puzzles : iterable
+        Line number and puzzle text pairs
+    output : str
+        The file to write, "-" for stdout; "{line}" in the name is replaced
+        by the line number of each puzzle
+
+    Returns:
+        The number of problems written
+    """
+
+    count = 0
+    for number, text in puzzles:
+        if count and "{line}" not in output:
+            raise ValueError('Several puzzles need "{line}" in the output name')
+        board = parse_puzzle(text)
+        problem = SatSolver(int(len(board) ** 0.5)).to_dimacs(board)
+        if output == "-":
+            sys.stdout.write(problem)
+        else:
+            with open(output.format(line=number), "w") as file:
+                file.write(problem)
+        count += 1
+    return count
+
+def read_model(stream):
+    """Reads the model printed by a SAT solver
+
+    Both the MiniSat output ("SAT" then the literals) and the competition
+    output ("s SATISFIABLE" then "v" lines) are understood.
+
+    Parameters
+    ----------
+    stream : file
+        A text stream of the solver output
+
+    Returns:
+        A list of the true variables, or None if the problem is unsatisfiable
+    """
+
+    true_vars = []
+    for line in stream:
+        fields = line.split()
+        if not fields or fields[0] in ("c", "s", "SAT"):
+            if fields[1:2] == ["UNSATISFIABLE"]:
+                return None
+            continue
+        if fields[0] == "UNSAT":
+            return None
+        if fields[0] == "v":
+            fields = fields[1:]
+        true_vars.extend(var for var in map(int, fields) if var > 0)
+    return true_vars
+
+def decode(true_vars):
+    """Builds the puzzle text of a model
+
+    Parameters
+    ----------
+    true_vars : list
+        The true variables of the model
+
+    Returns:
+        The solved puzzle as a string
+    """
+
+    largest = max(true_vars, default=0)
+    square_size = next((size for size in range(2, 6) if size ** 6 >= largest), None)
+    if square_size is None:
+        raise ValueError(f"Variable {largest} is too large for a 25x25 board")
+
+    solver = SatSolver(square_size)
+    return format_puzzle(solver.units.unflatten(solver.decode(true_vars)))
+
+def build_parser():
+    """Builds the command line parser
+
+    Returns:
+        An ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(description="Convert puzzles to DIMACS CNF and SAT solver models back.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    encode_parser = commands.add_parser("encode", help="write puzzles as DIMACS CNF problems")
+    encode_parser.add_argument("input", help="puzzle file, or - for stdin")
+    encode_parser.add_argument("-o", "--output", default="-",
+                               help='CNF file, "{line}" is replaced by the line number of each puzzle, '
+                                    'or - for stdout (default)')
+
+    decode_parser = commands.add_parser("decode", help="write the solution found by a SAT solver")
+    decode_parser.add_argument("input", help="SAT solver output, or - for stdin")
+    return parser
+
+def run(argv=None):
+    """Encodes puzzles or decodes a model
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments, defaults to sys.argv
+
+    Returns:
+        The exit status
+    """
+
+    args = build_parser().parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        if args.command == "encode":
+            count = encode(read_puzzles(source), args.output)
+            print(f"Wrote {count} problems", file=sys.stderr)
+            return 0
+
+        true_vars = read_model(source)
+        solution = None if true_vars is None else decode(true_vars)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    if solution is None:
+        print("unsolvable")
+        return 1
+    print(solution)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run())
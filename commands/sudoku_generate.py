@@ -0,0 +1,62 @@
+import argparse
+import sys
+from model.sudoku_generator import DIFFICULTIES, generate_many
+
+def build_parser():
+    """Builds the command line parser
+
+    Returns:
+        An ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles with a unique solution, one per line.")
+    parser.add_argument("-n", "--count", type=int, default=1,
+                        help="number of puzzles (default: 1)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="puzzle file, or - for stdout (default)")
+    parser.add_argument("--size", type=int, default=3, choices=range(2, 6),
+                        help="tiles along one side of a square, 4 for 16x16 (default: 3)")
+    parser.add_argument("--clues", type=int,
+                        help="exact number of clues (default: remove as many as possible)")
+    parser.add_argument("--difficulty", choices=DIFFICULTIES,
+                        help="easy puzzles need only singles, hard ones need guessing (default: any)")
+    parser.add_argument("--asymmetric", action="store_true",
+                        help="remove clues one at a time instead of in mirrored pairs")
+    parser.add_argument("--seed",
+                        help="seed for a reproducible batch (default: random)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="puzzles generated by a worker at once (default: 16)")
+    return parser
+
+def run(argv=None):
+    """Generates a batch of puzzles and streams them out
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments, defaults to sys.argv
+
+    Returns:
+        The exit status, 1 if the clue count or difficulty cannot be reached
+    """
+
+    args = build_parser().parse_args(argv)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        puzzles = generate_many(args.count, args.size, args.seed, args.workers, args.chunksize,
+                                clues=args.clues, difficulty=args.difficulty, symmetric=not args.asymmetric)
+        for puzzle in puzzles:
+            out.write(puzzle + "\n")
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run())
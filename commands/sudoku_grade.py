@@ -0,0 +1,112 @@
+import argparse
+import json
+import sys
+from model.sudoku_corpus import is_corpus
+from model.sudoku_grader import TECHNIQUES, GUESS, grade_corpus, grade_many
+from model.sudoku_iterative import UNSOLVABLE
+from model.sudoku_pool import get_corpus
+from commands.sudoku_batch import INVALID, read_puzzles
+
+def write_grades(results, out, errors=sys.stderr, as_json=False):
+    """Writes one output line per graded puzzle as results arrive
+
+    Parameters
+    ----------
+    results : iterable
+        Line number, puzzle text and grade (or error) triples
+    out : file
+        The text stream for the grades
+    errors : file, optional
+        The text stream for error messages, default stderr
+    as_json : bool, optional
+        Whether to write every grade as a JSON line, default False writes
+        "puzzle technique steps"
+
+    Returns:
+        The number of puzzles graded with every technique, GUESS,
+        UNSOLVABLE and INVALID
+    """
+
+    summary = dict.fromkeys(TECHNIQUES + (GUESS, UNSOLVABLE, INVALID), 0)
+    for number, text, grade in results:
+        if isinstance(grade, ValueError):
+            errors.write(f"line {number}: {grade}\n")
+            summary[INVALID] += 1
+            out.write(json.dumps({"line": number, "status": INVALID}) + "\n" if as_json
+                      else f"{text} {INVALID} 0\n")
+            continue
+
+        label = grade["technique"] if grade["status"] != UNSOLVABLE else UNSOLVABLE
+        if label is not None:
+            summary[label] += 1
+        if as_json:
+            out.write(json.dumps(dict(line=number, puzzle=text, **grade)) + "\n")
+        else:
+            out.write(f"{text} {label or 'none'} {grade['steps']}\n")
+    return summary
+
+def build_parser():
+    """Builds the command line parser
+
+    Returns:
+        An ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(description="Grade Sudoku puzzles by the hardest human technique they need.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="puzzle file or binary corpus, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="grade file, or - for stdout (default)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=256,
+                        help="puzzles sent to a worker at once (default: 256)")
+    parser.add_argument("--json", action="store_true",
+                        help="write every grade, step count and technique count as a JSON line")
+    parser.add_argument("--summary", action="store_true",
+                        help="print the number of puzzles per grade to stderr")
+    return parser
+
+def run(argv=None):
+    """Grades every puzzle of the input and streams the grades out
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments, defaults to sys.argv
+
+    Returns:
+        The exit status, 1 if the input cannot be read
+    """
+
+    args = build_parser().parse_args(argv)
+
+    corpus = args.input != "-" and is_corpus(args.input)
+    try:
+        if corpus:
+            get_corpus(args.input)
+        source = sys.stdin if args.input == "-" or corpus else open(args.input)
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        if corpus:
+            results = grade_corpus(args.input, args.workers, args.chunksize)
+        else:
+            results = grade_many(read_puzzles(source), args.workers, args.chunksize)
+        summary = write_grades(results, out, as_json=args.json)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    if args.summary:
+        for label, count in summary.items():
+            if count:
+                sys.stderr.write(f"{label}: {count}\n")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run())
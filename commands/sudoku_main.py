@@ -1,19 +1,26 @@
+import argparse
 from model.sudoku_board import SudokuBoard
+from model.sudoku_format import parse_puzzle, square_size_for
 from PyQt6.QtWidgets import QApplication 
 import view.sudoku_view as view
 import controller.sudoku_controller as control
 
-def run():
+def run(square_size=3, puzzle=None):
     # Establishes PyQt
     app = QApplication([])
     
     # Creates the model and view for the board
-    model = SudokuBoard()
-    window = view.SudokuView()
+    model = SudokuBoard(square_size=square_size)
+    window = view.SudokuView(square_size)
     
     # Hands the model and view to the controller, registers view's buttons
     controller = control.SudokuController(model, window)
     controller.register_buttons()
+    app.aboutToQuit.connect(controller.shutdown)
+    
+    # Loads the starting puzzle, if any, through the model
+    if puzzle is not None:
+        controller.load_board(parse_puzzle(puzzle, square_size))
     
     # Shows the view
     window.show()
@@ -22,4 +29,12 @@ def run():
     app.exec()
 
 if __name__ == '__main__':
-    run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Play and solve Sudoku boards.")
+    parser.add_argument("--size", type=int, default=3, choices=range(2, 6),
+                        help="tiles along one side of a square, 4 for 16x16 (default: 3)")
+    parser.add_argument("--puzzle", help="a puzzle written on one line to start with; sets the board size")
+    args = parser.parse_args()
+    if args.puzzle is not None:
+        args.puzzle = args.puzzle.strip()
+        args.size = square_size_for(len(args.puzzle))
+    run(args.size, args.puzzle)
\ No newline at end of file
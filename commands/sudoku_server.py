@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import sys
+from model.sudoku_engines import ENGINES
+from model.sudoku_service import SolveService
+
+def build_parser():
+    """Builds the command line parser
+
+    Returns:
+        An ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(description="Serve Sudoku solve requests as JSON lines over a socket.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="TCP port to listen on (default: 8765)")
+    parser.add_argument("--unix", metavar="PATH",
+                        help="listen on a Unix socket instead of a TCP port")
+    parser.add_argument("-e", "--engine", default="propagation", choices=list(ENGINES),
+                        help="engine for requests that name none (default: propagation)")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="worker processes, 0 for one per CPU (default: 0)")
+    parser.add_argument("--batch-size", type=int, default=32,
+                        help="most requests solved in one batch (default: 32)")
+    parser.add_argument("--batch-delay", type=float, default=2.0, metavar="MS",
+                        help="milliseconds a batch waits to fill up (default: 2)")
+    parser.add_argument("--queue-size", type=int, default=1024,
+                        help="requests that may wait before clients are pushed back (default: 1024)")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="seconds a request may take unless it sets its own (default: 10)")
+    parser.add_argument("--cache", type=int, default=0, metavar="SIZE",
+                        help="cache this many solutions per worker (default: off)")
+    return parser
+
+def run(argv=None):
+    """Runs the solve service until interrupted
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments, defaults to sys.argv
+
+    Returns:
+        The exit status
+    """
+
+    args = build_parser().parse_args(argv)
+    service = SolveService(args.engine, args.workers or None, args.batch_size, args.batch_delay / 1000,
+                           args.queue_size, args.timeout, args.cache)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run())
@@ -1,9 +1,26 @@
+from PyQt6.QtCore import QTimer
 from worker.worker import Worker
+from model.sudoku_engines import PORTFOLIO, engine_names
+from model.sudoku_grader import TechniqueGrader
+from model.sudoku_iterative import FAILED, SOLVED
+from model.sudoku_trace import SolveTrace, TracePlayer
+from model.sudoku_units import get_units
+
+# Operations a second replayed with the speed slider at full speed
+REPLAY_FAST_FORWARD = 200000
+
+# Seconds the validate button may spend proving a solution unique; sparse
+# 16x16 and 25x25 boards can take minutes, and the check runs on the GUI
+# thread
+UNIQUENESS_BUDGET = 1.0
 
 class SudokuController:
     """
     A class used to represent a SudokuController
 
+    The model owns the board. Every action changes the model, and the view
+    only displays the change sets the model sends through boardChanged.
+
     ...
     Attributes
     ----------
@@ -12,15 +29,41 @@ class SudokuController:
     view : SudokuView
         A view to visualize the SudokuBoard
     square_constant : int
-        A default value for the square constant
+        The number of tiles along one side of a square, taken from the model
+    time_budget : float
+        Seconds a solve may take before it gives up, None for no limit
+    grader : TechniqueGrader
+        Finds the next logical step for hints
+    player : TracePlayer
+        Moves through the recorded or loaded trace, None without one
+    replay_timer : QTimer
+        Advances a playing trace once a frame
+    replay_shown : bool
+        Whether the view shows the trace rather than the model's board
         
     Methods
     -------
-    on_model_changed(row, col, pos, value)
-        Handles the view update from the model
+    shutdown()
+        Stops a running solve and the model's portfolio processes before
+        the application exits
+    
+    on_board_changed(changes)
+        Displays a change set from the model in the view
     
     register_buttons()
         Allows the buttons on the board to be clicked
+    
+    edit_tile(square_row, square_col, pos, value)
+        Applies a value typed into a tile to the model
+    
+    load_board(board)
+        Loads a board into the model and displays it
+    
+    clear_board()
+        Empties the board
+    
+    show_hint()
+        Shows the next logical step on the board
         
     enable_buttons()
         Enable all buttons
@@ -34,11 +77,45 @@ class SudokuController:
     solve_board()
         Solves the board displayed in the view
     
-    view_to_model_board()
-        Translates the 2D board from the view to a 2D board for the model
+    stop_solving()
+        Cancels the running solve
+    
+    change_speed(value)
+        Applies the speed slider to the model
+    
+    change_instant(checked)
+        Applies the instant checkbox to the model
+    
+    on_solve_finished(status)
+        Re-enables the board, shows the search stats and reports solves that
+        did not finish
+    
+    change_record(checked)
+        Applies the record checkbox to the model
+    
+    set_trace(trace, position=0)
+        Makes a trace the one to replay
+    
+    show_trace_position(position)
+        Displays the board at a position of the trace
+    
+    toggle_replay()
+        Plays or pauses the trace
+    
+    advance_replay()
+        Moves a playing trace on by one frame
+    
+    leave_replay()
+        Stops replaying and displays the model's board again
+    
+    save_trace()
+        Saves the trace to a file
+    
+    load_trace()
+        Loads a saved trace and its starting board
     """
     
-    def __init__(self, model, view):
+    def __init__(self, model, view, time_budget=None):
         """
         Parameters
         ----------
@@ -46,39 +123,150 @@ class SudokuController:
             A collection of lists of integers
         view : SudokuView
             A view to visualize the SudokuBoard
+        time_budget : float, optional
+            Seconds a solve may take before it gives up, default no limit
         """
         
         self.model = model
         self.view = view
-        self.square_constant = 3
+        self.square_constant = model.square_size
+        self.time_budget = time_budget
+        self.grader = TechniqueGrader(model.square_size)
+        self.worker = None
+        self.player = None
+        self.replay_shown = False
+        self.replay_budget = 0
         
         # Connect signal to change method
-        self.model.elementChanged.connect(self.on_model_changed)
+        self.model.boardChanged.connect(self.on_board_changed)
+        
+        # Replays a trace at the frame rate of the solving animation
+        self.replay_timer = QTimer()
+        self.replay_timer.setInterval(model.frame_timer.interval())
+        self.replay_timer.timeout.connect(self.advance_replay)
         
-    def on_model_changed(self, row, col, pos, value):
-        """Handles the view update from the model
+    def shutdown(self):
+        """Stops a running solve and the model's portfolio processes before
+        the application exits
+        """
+        
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait()
+        if self.model.portfolio is not None:
+            self.model.portfolio.close()
+        
+    def on_board_changed(self, changes):
+        """Displays a change set from the model in the view
         
         Parameters
         ----------
-        row : int
-            Row index of the view's 2D array
-        col : int
-            Column index of the view's 2D array
-        pos : int
-            Position in the 1D array to update
-        value : int
-            Value to replace in the board
+        changes : list
+            (square_row, square_col, pos, value, conflict) tuples, one per
+            changed tile
         """
         
-        self.view.update_tile(row, col, pos, value)
+        self.view.apply_changes(changes)
     
     def register_buttons(self):
         """Allows the buttons on the board to be clicked
         """
         
+        self.view.set_engines(engine_names())
         self.view.get_validate_button().clicked.connect(self.validate_board)
         self.view.get_solve_button().clicked.connect(self.solve_board)
+        self.view.get_clear_button().clicked.connect(self.clear_board)
+        self.view.get_hint_button().clicked.connect(self.show_hint)
+        self.view.get_stop_button().clicked.connect(self.stop_solving)
+        self.view.get_speed_slider().valueChanged.connect(self.change_speed)
+        self.view.get_instant_box().toggled.connect(self.change_instant)
+        self.view.get_record_box().toggled.connect(self.change_record)
+        self.view.get_replay_button().clicked.connect(self.toggle_replay)
+        self.view.get_trace_slider().valueChanged.connect(self.show_trace_position)
+        self.view.get_save_trace_button().clicked.connect(self.save_trace)
+        self.view.get_load_trace_button().clicked.connect(self.load_trace)
+        self.change_speed(self.view.get_speed_slider().value())
         self.view.get_quit_button().clicked.connect(self.view.shutdown)
+        self.enable_buttons()
+        
+        # Routes typed values through the model, which keeps the conflict index
+        for square_row, row in enumerate(self.view.get_squares()):
+            for square_col, square in enumerate(row):
+                for pos, tile in enumerate(square.get_list()):
+                    tile.valueEntered.connect(
+                        lambda value, square_row=square_row, square_col=square_col, pos=pos:
+                        self.edit_tile(square_row, square_col, pos, value))
+    
+    def edit_tile(self, square_row, square_col, pos, value):
+        """Applies a value typed into a tile to the model
+        
+        Parameters
+        ----------
+        square_row : int
+            The SudokuSquare row location
+        square_col : int
+            The SudokuSquare column location
+        pos : int
+            The position in the SudokuSquare list
+        value : int
+            The typed value, 0 to clear the tile
+        """
+        
+        # The board belongs to the solver until it finishes
+        if self.worker is not None and self.worker.isRunning():
+            return
+        
+        self.leave_replay()
+        size = self.square_constant
+        row, col = square_row * size + pos // size, square_col * size + pos % size
+        self.model.set_value(row, col, value)
+        self.model.flush_view()
+    
+    def load_board(self, board):
+        """Loads a board into the model and displays it
+        
+        Only the tiles that differ from the current board are redrawn.
+        
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers of the model's board size
+        """
+        
+        self.leave_replay()
+        self.model.load_board(board)
+        self.model.flush_view()
+    
+    def clear_board(self):
+        """Empties the board
+        """
+        
+        self.leave_replay()
+        self.model.clear_board()
+        self.model.flush_view()
+    
+    def show_hint(self):
+        """Shows the next logical step on the board
+        
+        The step only uses the digits on the board, so it is found at once
+        without searching.
+        """
+        
+        self.leave_replay()
+        hint = self.grader.next_hint(self.model.get_board())
+        if hint is None:
+            if self.model.is_solved() and self.model.check_board():
+                message = "The board is solved."
+            elif self.model.conflicts.conflicts():
+                message = "No hint: the board has conflicting tiles."
+            else:
+                message = "No logical step found: the board needs a guess or has no solution."
+            self.view.show_hint(message)
+            return
+        
+        size = self.model.row_col_len
+        cell = hint.placements[0][0] if hint.placements else hint.cells[0]
+        self.view.show_hint(str(hint), self.model.translate_tile_to_view(cell // size, cell % size))
         
     def enable_buttons(self):
         """Enable all buttons
@@ -86,6 +274,17 @@ class SudokuController:
         
         self.view.get_validate_button().setDisabled(False)
         self.view.get_solve_button().setDisabled(False)
+        self.view.get_clear_button().setDisabled(False)
+        self.view.get_hint_button().setDisabled(False)
+        self.view.get_engine_box().setDisabled(False)
+        self.view.get_instant_box().setDisabled(False)
+        self.view.get_parallel_box().setDisabled(False)
+        self.view.get_record_box().setDisabled(False)
+        self.view.get_load_trace_button().setDisabled(False)
+        self.view.set_trace_length(None if self.player is None else len(self.player.trace))
+        if self.player is not None:
+            self.view.set_trace_position(self.player.position)
+        self.view.get_stop_button().setDisabled(True)
     
     def disable_buttons(self):
         """Disable all buttons
@@ -93,75 +292,238 @@ class SudokuController:
         
         self.view.get_validate_button().setDisabled(True)
         self.view.get_solve_button().setDisabled(True)
+        self.view.get_clear_button().setDisabled(True)
+        self.view.get_hint_button().setDisabled(True)
+        self.view.get_engine_box().setDisabled(True)
+        self.view.get_instant_box().setDisabled(True)
+        self.view.get_parallel_box().setDisabled(True)
+        self.view.get_record_box().setDisabled(True)
+        self.view.get_load_trace_button().setDisabled(True)
+        self.view.set_trace_length(None)
+        self.view.get_stop_button().setDisabled(False)
         
     def validate_board(self):
         """Validates the current board displayed in the view
-        """
-        
-        # Creates the board to be used for the model
-        board = self.view_to_model_board()
         
-        # Assigns translated items to the board   
-        self.model.set_board(board)
+        Typed values already went through the model, so its conflict index
+        answers at once and names the conflicting tiles. Counting solutions
+        is bounded by UNIQUENESS_BUDGET and reported as unknown past it.
+        """
         
-        # Checks if the board is valid
-        if self.model.check_board():
-            self.view.validation_result_message(True)
+        # Checks if the board is valid, then how many solutions it has
+        conflicts = self.model.conflicts.conflicts()
+        if not conflicts:
+            self.view.validation_result_message(True, self.model.uniqueness(UNIQUENESS_BUDGET))
         else:
-            self.view.validation_result_message(False)
+            self.view.validation_result_message(False, conflicts=conflicts)
         
     def solve_board(self):
         """Solves the board displayed in the view
         """
         
-        # Creates the board to be used for the model
-        board = self.view_to_model_board()
-        
-        # Assigns translated items to the board   
-        self.model.set_board(board)
+        self.leave_replay()
         
         # Displays an error message if the board is not valid
         if not self.model.check_board():
             self.view.validation_result_message(False)
             return
 
-        # Creates and starts a worker thread
-        self.worker = Worker(self.model, self)
+        # Disables buttons on the board until the solve ends
+        self.disable_buttons()
+        
+        # Sends the solver's changes to the view once a frame
+        self.model.start_animation()
+        
+        # Creates and starts a worker thread using the selected engine, on
+        # every CPU if asked
+        workers = 0 if self.view.get_parallel_box().isChecked() else 1
+        self.worker = Worker(self.model, self, self.view.get_selected_engine(), self.time_budget, workers)
+        self.worker.solveFinished.connect(self.on_solve_finished)
         self.worker.start()
     
-    def view_to_model_board(self):
-        """Translates the 2D board from the view to a 2D board for the model
-        """
-        
-        # Condenses the board to a 1D list of SudokuSquare objects
-        condensed = []
-        for j in range(3):
-            for k in range(3):
-                condensed.append(self.view.get_squares()[j][k])
-                
-        # Transforms the board from a list of SudokuSquare objects to a 2D list of numbers
-        # Can be used to check if the board is correct or can be used to solve the board
-        board = [[] for _ in range(len(condensed))]
-        
-        # Variables for board translation
-        row, col = 0, 0
-        offset_row, offset_col = 0, 0
-        
-        # For loop that determines the offests to use for translating the board
-        for square in range(len(condensed)):
-            offset_row = self.square_constant * (square // self.square_constant)
-            
-            for num in range(len(condensed)):
-                offset_col = self.square_constant * (square % self.square_constant)
-                row = offset_row + (num // self.square_constant)
-                col = offset_col + (num % self.square_constant)
-                
-                # Appends values to the board at the specified index
-                if condensed[square].get_list()[num].text() == "":
-                    board[row].append(0)
-                else:
-                    board[row].append(int(condensed[square].get_list()[num].text()))
-                    
-            offset_col = 0
-                 
-        return board
\ No newline at end of file
+    def stop_solving(self):
+        """Cancels the running solve
+        """
+        
+        if self.worker is not None:
+            self.worker.cancel()
+    
+    def change_speed(self, value):
+        """Applies the speed slider to the model
+        
+        The slider is logarithmic, from 1 step a second up to full speed
+        at its right end.
+        
+        Parameters
+        ----------
+        value : int
+            The slider position, 0 - 100
+        """
+        
+        if value >= 100:
+            self.model.set_speed(None)
+        else:
+            self.model.set_speed(10 ** (value / 25))
+    
+    def change_instant(self, checked):
+        """Applies the instant checkbox to the model
+        
+        Parameters
+        ----------
+        checked : bool
+            Whether to skip the animation and only display the solution
+        """
+        
+        self.model.animate = not checked
+    
+    def on_solve_finished(self, status):
+        """Re-enables the board, shows the search stats and reports solves that
+        did not finish
+        
+        Parameters
+        ----------
+        status : str
+            The model's solve status
+        """
+        
+        self.model.stop_animation()
+        if self.model.trace is not None:
+            self.set_trace(self.model.trace, len(self.model.trace))
+        self.enable_buttons()
+        if status == FAILED:
+            self.view.show_solve_error(self.worker.error)
+            return
+        if self.model.stats is not None:
+            portfolio = self.view.get_selected_engine() == PORTFOLIO and self.model.portfolio
+            self.view.show_solve_stats(self.model.stats, portfolio.winner if portfolio else None)
+        if status != SOLVED:
+            self.view.solve_result_message(status)
+    
+    def change_record(self, checked):
+        """Applies the record checkbox to the model
+        
+        Parameters
+        ----------
+        checked : bool
+            Whether single-process solves record a trace
+        """
+        
+        self.model.record = checked
+    
+    def set_trace(self, trace, position=0):
+        """Makes a trace the one to replay
+        
+        Parameters
+        ----------
+        trace : SolveTrace
+            The trace to replay
+        position : int, optional
+            The number of operations the view already shows, default 0
+        """
+        
+        self.player = TracePlayer(trace)
+        self.player.seek(position)
+        self.view.set_trace_length(len(trace))
+        self.view.set_trace_position(position)
+    
+    def show_trace_position(self, position):
+        """Displays the board at a position of the trace
+        
+        Only the tiles that differ from the displayed position are sent, in
+        one change set. The model's board is left as it is.
+        
+        Parameters
+        ----------
+        position : int
+            The number of operations applied
+        """
+        
+        if self.player is None:
+            return
+        
+        changed = self.player.seek(position)
+        if not self.replay_shown:
+            # The view showed the model's board, so every tile is redrawn
+            changed = dict(enumerate(self.player.cells))
+            self.replay_shown = True
+        
+        size = self.model.row_col_len
+        for cell, value in changed.items():
+            self.model.update_view(cell // size, cell % size, value)
+        self.model.flush_view()
+        self.view.set_trace_position(self.player.position)
+    
+    def toggle_replay(self):
+        """Plays or pauses the trace
+        """
+        
+        if self.replay_timer.isActive():
+            self.replay_timer.stop()
+            self.view.set_replay_playing(False)
+            return
+        
+        if self.player.at_end():
+            self.show_trace_position(0)
+        self.replay_budget = 0
+        self.replay_timer.start()
+        self.view.set_replay_playing(True)
+    
+    def advance_replay(self):
+        """Moves a playing trace on by one frame
+        
+        The speed slider sets the operations replayed a second, and full
+        speed fast-forwards at REPLAY_FAST_FORWARD operations a second.
+        """
+        
+        rate = self.model.speed or REPLAY_FAST_FORWARD
+        self.replay_budget += rate * self.replay_timer.interval() / 1000
+        steps = int(self.replay_budget)
+        if steps:
+            self.replay_budget -= steps
+            self.show_trace_position(self.player.position + steps)
+        if self.player.at_end():
+            self.replay_timer.stop()
+            self.view.set_replay_playing(False)
+    
+    def leave_replay(self):
+        """Stops replaying and displays the model's board again
+        """
+        
+        self.replay_timer.stop()
+        self.view.set_replay_playing(False)
+        if self.replay_shown:
+            self.replay_shown = False
+            self.model.refresh_view()
+            self.model.flush_view()
+    
+    def save_trace(self):
+        """Saves the trace to a file
+        """
+        
+        path = self.view.ask_trace_path(save=True)
+        if not path or self.player is None:
+            return
+        try:
+            self.player.trace.save(path)
+        except OSError as error:
+            self.view.trace_error_message(f"The trace could not be saved: {error}")
+    
+    def load_trace(self):
+        """Loads a saved trace and its starting board
+        """
+        
+        path = self.view.ask_trace_path(save=False)
+        if not path:
+            return
+        try:
+            trace = SolveTrace.load(path)
+        except (OSError, ValueError) as error:
+            self.view.trace_error_message(f"The trace could not be loaded: {error}")
+            return
+        if trace.square_size != self.square_constant:
+            size = trace.square_size * trace.square_size
+            self.view.trace_error_message(f"The trace is of a {size}x{size} board.")
+            return
+        
+        self.load_board(get_units(trace.square_size).unflatten(list(trace.initial)))
+        self.set_trace(trace)
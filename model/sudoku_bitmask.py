@@ -0,0 +1,104 @@
+from model.sudoku_stats import InstrumentedSolver
+
+class BitmaskSolver(InstrumentedSolver):
+    """
+    A class used to solve boards by backtracking over digit bitmasks
+
+    Every row, column and square keeps a bitmask of the digits it already
+    holds. The masks are updated incrementally as digits are placed and
+    removed, so checking a trial digit is a single bitwise test instead of a
+    scan of the whole board.
+
+    ...
+    Attributes
+    ----------
+    name : str
+        The name the engine is registered under
+
+    Methods
+    -------
+    solve(board)
+        Solves the board without modifying it
+    """
+
+    name = "bitmask"
+
+    def solve(self, board):
+        """Solves the board without modifying it
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution
+        """
+
+        units, stats, tracer = self.units, self.stats, self.tracer
+        size = units.row_col_len
+        stats.reset()
+
+        with stats.phase("setup"):
+            cells = units.flatten(board)
+            row_mask = [0] * size
+            col_mask = [0] * size
+            square_mask = [0] * size
+
+            # Loads the givens, rejecting boards that already repeat a digit
+            for cell, num in enumerate(cells):
+                if num == 0:
+                    continue
+                bit = 1 << (num - 1)
+                row, col, square = units.row_of[cell], units.col_of[cell], units.square_of[cell]
+                stats.validations += 1
+                if (row_mask[row] | col_mask[col] | square_mask[square]) & bit:
+                    return None
+                row_mask[row] |= bit
+                col_mask[col] |= bit
+                square_mask[square] |= bit
+
+            empties = [(cell, units.row_of[cell], units.col_of[cell], units.square_of[cell])
+                       for cell in range(units.cell_count) if cells[cell] == 0]
+            all_digits = units.all_digits
+
+        def search(index):
+            if index == len(empties):
+                return True
+            if index > stats.max_depth:
+                stats.max_depth = index
+
+            cell, row, col, square = empties[index]
+            stats.validations += 1
+            candidates = all_digits & ~(row_mask[row] | col_mask[col] | square_mask[square])
+
+            while candidates:
+                bit = candidates & -candidates
+                candidates ^= bit
+                stats.nodes += 1
+                if tracer is not None:
+                    tracer("place", cell, bit.bit_length(), index)
+
+                row_mask[row] |= bit
+                col_mask[col] |= bit
+                square_mask[square] |= bit
+
+                if search(index + 1):
+                    cells[cell] = bit.bit_length()
+                    return True
+
+                row_mask[row] ^= bit
+                col_mask[col] ^= bit
+                square_mask[square] ^= bit
+                stats.backtracks += 1
+                if tracer is not None:
+                    tracer("undo", cell, 0, index)
+
+            return False
+
+        with stats.phase("search"):
+            solved = search(0)
+        if not solved:
+            return None
+        return units.unflatten(cells)
@@ -1,363 +1,173 @@
-from PyQt6.QtCore import pyqtSignal, QObject
-from time import sleep
+from threading import Lock
+from PyQt6.QtCore import pyqtSignal, QObject, QTimer
+from model.sudoku_core import SudokuCore
 
-class SudokuBoard(QObject):
+class SudokuSignals(QObject):
     """
-    A class used to represent a SudokuBoard
+    A class used to hold the Qt signals of a SudokuBoard
 
     ...
     Attributes
     ----------
-    board : list
-        A collection of lists of integers
-    square_size : int
-        The width/length of 1 square
-    row_col_len : int
-        The size of a row/column
-        
+    boardChanged : pyqtSignal
+        Emitted with a list of (square_row, square_col, pos, value, conflict)
+        tuples, one per tile changed since the last change set
+    """
+
+    # Signal to emit when data changes
+    boardChanged = pyqtSignal(list)
+
+class SudokuBoard(SudokuCore):
+    """
+    A class used to represent a SudokuBoard wired up to the Qt view
+
+    The solving and validation logic lives in SudokuCore, and the model is
+    the only owner of the board: the view just displays it. This adapter
+    records every changed tile, and whose conflict highlight may have
+    changed, and sends them to the view as one change set through
+    boardChanged, so the view applies a whole change set in one repaint.
+
+    The solver runs at full speed (or at the chosen number of steps a
+    second) in its worker thread and only records the latest value of every
+    changed tile. A timer on the GUI thread flushes the recorded changes at
+    a fixed frame rate, so the view repaints at most once a frame however
+    many steps the search takes. Edits, loads and clears are flushed by the
+    controller as soon as they are made.
+
+    ...
+    Attributes
+    ----------
+    signals : SudokuSignals
+        The QObject owning the Qt signals
+    boardChanged : pyqtSignal
+        Emitted with a list of (square_row, square_col, pos, value, conflict)
+        tuples, one per tile changed since the last change set
+    pending : dict
+        The latest value of every tile changed since the last change set
+    pending_conflicts : set
+        The tiles whose conflict state may have changed since the last
+        change set
+    pending_lock : Lock
+        Guards pending and pending_conflicts between the worker and GUI threads
+    frame_timer : QTimer
+        Flushes pending changes to the view once a frame
+
     Methods
     -------
-    get_board()
-        Returns the board
-    
-    set_board(board)
-        Sets the board
-        
-    advance(row, col)
-        Advances the row and column along the board
-    
-    decrement(row, col)
-        Decrements the row and column along the board
-        
-    validate_nums(row=-1, column=-1)
-        Validates if all the numbers in the row/column are unique
-        
-    check_row(row)
-        Checks the row for having unique values
-    
-    check_column(column)
-        Checks the column for having unique values
-    
-    check_square(square)
-        Validates if all the numbers in the square are unique
-    
-    def check_board()
-        Validates that the board is a correct Sudoku board
-    
-    is_solved()
-        Validates that the board is completely solved
-    
-    translate_tile_to_view(row, column)
-        Translates the row, column pair in the model to the correct location in the view
-    
-    solve_board(row=0, col=0)
-        Solves the board using backtracking
-                
+    set_value(row, col, value)
+        Changes one tile and records it, with its conflicting peers, for the
+        next change set
+
     update_view(row, column, value)
-        Displays updates in the model to the view
-        
-    __str__()
-        String representation of the SudokuBoard
-    """
-    
-    # Signal to emit when data changes
-    elementChanged = pyqtSignal(int, int, int, int)
-    
-    def __init__(self, unsolved_board=[[0,0,0,0,0,0,0,0,0],
-                                       [0,0,0,0,0,0,0,0,0],
-                                       [0,0,0,0,0,0,0,0,0],
-                                       [0,0,0,0,0,0,0,0,0],
-                                       [0,0,0,0,0,0,0,0,0],
-                                       [0,0,0,0,0,0,0,0,0],
-                                       [0,0,0,0,0,0,0,0,0],
-                                       [0,0,0,0,0,0,0,0,0],
-                                       [0,0,0,0,0,0,0,0,0]]):
-        """
-        Parameters
-        ----------
-        board : list, optional
-            A collection of lists of integers
-        """
-        
-        super().__init__()
+        Records an update in the model for the next change set
 
-        self.board = unsolved_board
-        self.square_size = 3
-        self.row_col_len = 9
-        
-    def get_board(self):
-        """Returns the board
+    refresh_view()
+        Records every tile for the next change set
 
-        Returns:
-            A list of lists of integers
-        """
-        
-        return self.board
-    
-    def set_board(self, board):
-        """Sets the board
-        """
-        
-        self.board = board
-        
-    def advance(self, row, col):
-        """Advances the row and column along the board
+    flush_view()
+        Sends the recorded updates to the view as one change set
 
-        Returns:
-            The advanced row and column
-        """
-        
-        # Used first if in statement to continuously check the last position on the board
-        if row == 8 and col == 8:
-            col = 8
-            row = 8
-        elif col == 8:
-            col = 0
-            row += 1
-        else:
-            col += 1
-            
-        return row, col
-    
-    def decrement(self, row, col):
-        """Decrements the row and column along the board
+    start_animation()
+        Starts sending recorded updates to the view every frame
 
-        Returns:
-            The decremented row and column
+    stop_animation()
+        Stops the frame timer after displaying the last updates
+    """
+
+    def __init__(self, unsolved_board=None, speed=20, frame_rate=30, square_size=3):
         """
-        
-        if col == 0 and row != 0:
-            col = 8
-            row -= 1
-        else:
-            col -= 1
-            
-        return row, col
-        
-    def validate_nums(self, row=-1, column=-1):
-        """Validates if all the numbers in the row/column are unique
-        
         Parameters
         ----------
-        row : integer, optional
-            The row to check for validation, default -1 
-        column : integer, optional
-            The column to check for validation, default -1 
-
-        Returns:
-            A boolean for whether or not the numbers in the row/column are unique
+        unsolved_board : list, optional
+            A collection of lists of integers, defaults to an empty board
+        speed : float, optional
+            Steps a second for the stepwise search, default 20
+        frame_rate : int, optional
+            View updates a second while solving, default 30
+        square_size : int, optional
+            The size of one square of an empty board (2 - 5), default 3
         """
-        
-        check = [0,0,0,0,0,0,0,0,0]
-        
-        for i in range(self.row_col_len):
-            # Checks for which row/column should be validated
-            if row == -1:
-                num = self.board[i][column - 1]
-            else:
-                num = self.board[row - 1][i]
-            
-            # Ensures every number in the check array is unique
-            # Boolean returned upon successful or unsuccessful validation
-            if num == 0:
-                continue
-            elif num != check[num - 1]:
-                check[num - 1] = num
-            else:
-                return False
-        return True
-        
-    def check_row(self, row):
-        """Checks the row for having unique values
 
-        Returns:
-            The boolean of whether the row is all unique
-        """
-        
-        return self.validate_nums(row=row)
-    
-    def check_column(self, column):
-        """Checks the column for having unique values
+        self.pending = {}
+        self.pending_conflicts = set()
+        self.pending_lock = Lock()
+        super().__init__(unsolved_board, speed=speed, square_size=square_size)
 
-        Returns:
-            The boolean of whether the column is all unique
-        """
-        
-        return self.validate_nums(column=column)
-    
-    def check_square(self, square):
-        """Validates if all the numbers in the square are unique
-        
-        Parameters
-        ----------
-        square : integer
-            The numbered square (1 - 9) to check
+        self.signals = SudokuSignals()
+        self.boardChanged = self.signals.boardChanged
 
-        Returns:
-            A boolean for whether or not the numbers in the square are unique
-        """
-        
-        check = [0,0,0,0,0,0,0,0,0]
-        
-        for i in range(self.square_size):
-            # Calculates the row to use:
-            #   i : The current index
-            #   square : The square we are checking
-            #   square_size : The length/width of a Sudoku square (3)
-            row = i + (((square - 1) // self.square_size) * self.square_size)
-            
-            for j in range(self.square_size):
-                # Calculates the row to use:
-                #   j : The current index
-                #   square : The square we are checking
-                #   square_size : The length/width of a Sudoku square (3)
-                column = j + self.square_size * (((square - 1) % self.square_size))
-                
-                num = self.board[row][column]
-                
-                # Checks to see if a number exists in the check array
-                # Continues or assigns a number if empty
-                # Returns False if otherwise
-                if num == 0:
-                    continue
-                elif num != check[num - 1]:
-                    check[num - 1] = num
-                else:
-                    return False
-            
-        return True
-    
-    def check_board(self):
-        """Validates that the board is a correct Sudoku board
+        self.frame_timer = QTimer(self.signals)
+        self.frame_timer.setInterval(1000 // frame_rate)
+        self.frame_timer.timeout.connect(self.flush_view)
 
-        Returns:
-            A boolean for whether or not the board is valid
-        """
-        
-        for i in range(self.row_col_len):
-            check = self.check_row(i) and self.check_column(i) and self.check_square(i)
-            if not check:
-                return False
-        return True
-    
-    def is_solved(self):
-        """Validates that the board is completely solved
+    def set_value(self, row, col, value):
+        """Changes one tile and records it, with its conflicting peers, for the
+        next change set
 
         Returns:
-            A boolean for whether or not the board is solved
+            A set of (row, col) pairs whose conflict state may have changed
         """
-        
-        for i in range(self.row_col_len):
-            if 0 in self.board[i]:
-                return False
-        return True
-    
-    def translate_tile_to_view(self, row, column):
-        """Translates the row, column pair in the model to the correct location in the view
 
-         Parameters
-        ----------
-        row : int
-            The model's row 
-        column : int
-            The model's column 
-            
-        Returns:
-            The square's row/column within the view and the tile's position in the list
-        """
-        
-        # Retrives the row/col position in the 2D list in the view
-        square_row, square_col = row // self.square_size, column // self.square_size
-        
-        # Gets the position of the tile in the square
-        pos = self.square_size * (row % self.square_size) + (column % self.square_size)
-        
-        return square_row, square_col, pos
-    
-    def solve_board(self, row=0, col=0):
-        """Solves the board using backtracking
-        
-        Parameters
-        ----------
-        row : integer, optional
-            The current row being checked
-        column : integer, optional
-            The current column being checked
-        """
-        
-        # Checks if the board is not solved
-        if not self.is_solved():
-            # Checks if the row, col pair has an existing number
-            if self.board[row][col] == 0:
-                # Checks numbers 1 - 9 in each square
-                for num in range(1, 10):
-                    # Updates the board so a human can visualize it
-                    self.board[row][col] = num
-                    self.update_view(row, col, num)
-                    sleep(0.05)
-                
-                    # If the board is valid, advance the row, 
-                    # solve through backtracking, and 
-                    # check if the board is solved
-                    if self.check_board():
-                        row, col = self.advance(row, col)
-                        self.solve_board(row, col)
-                        row, col = self.decrement(row, col)
-                        
-                        if self.is_solved():
-                            break
-                
-                # If the board is not solved, set the row, col to 0
-                if not self.is_solved():
-                    self.board[row][col] = 0
-                    self.update_view(row, col, 0)
-              
-            # Performed if there's a non-zero number exists in the board   
-            else:
-                row, col = self.advance(row, col)
-                self.solve_board(row, col)
-                
+        changed = super().set_value(row, col, value)
+        with self.pending_lock:
+            self.pending_conflicts |= changed
+        return changed
+
     def update_view(self, row, column, value):
-        """Displays updates in the model to the view
+        """Records an update in the model for the next change set
 
          Parameters
         ----------
         row : int
-            The model's row 
+            The model's row
         column : int
-            The model's column 
+            The model's column
         value : int
             The value to be displayed
         """
-        
-        square_row, square_col, pos = self.translate_tile_to_view(row, column)
-        self.elementChanged.emit(square_row, square_col, pos, value)
-            
-    def __str__(self):
-        """String representation of the SudokuBoard
+
+        with self.pending_lock:
+            self.pending[row, column] = value
+
+    def refresh_view(self):
+        """Records every tile for the next change set, to redisplay the board
+        after the view showed something else, such as a replayed trace
+        """
+
+        with self.pending_lock:
+            for row in range(self.row_col_len):
+                for column in range(self.row_col_len):
+                    self.pending[row, column] = self.board[row][column]
+
+    def flush_view(self):
+        """Sends the recorded updates to the view as one change set
         """
-        
-        built_string = ""
-        
-        # For loop that builds the rows of the board
-        # Adds dashes ( - ) to separate each 1/3rd of the board
-        for i in range(len(self.board)):
-            if i % self.square_size == 0:
-                built_string += " - - - - - - - - - - \n"
-            
-            built_string += " | "
-            
-            # For loop that tracks each column
-            for j in range(self.row_col_len):
-                built_string += f"{self.board[i][j]}"
-                
-                # Adds pipe ( | ) to separate each square
-                if (j + 1) % self.square_size == 0:
-                    built_string += " | "
-            
-            # Drops to the next line       
-            built_string += "\n"
-            
-        built_string += " - - - - - - - - - - \n"
-            
-        return f"FORMATTED BOARD: \n{built_string}"
\ No newline at end of file
+
+        with self.pending_lock:
+            pending, self.pending = self.pending, {}
+            conflicts, self.pending_conflicts = self.pending_conflicts, set()
+
+        # Tiles whose highlight may change keep the value they have on the board
+        for row, column in conflicts:
+            pending.setdefault((row, column), self.board[row][column])
+        if not pending:
+            return
+
+        changes = []
+        for (row, column), value in pending.items():
+            square_row, square_col, pos = self.translate_tile_to_view(row, column)
+            changes.append((square_row, square_col, pos, value, self.conflicts.is_conflicting(row, column)))
+        self.boardChanged.emit(changes)
+
+    def start_animation(self):
+        """Starts sending recorded updates to the view every frame
+        """
+
+        self.frame_timer.start()
+
+    def stop_animation(self):
+        """Stops the frame timer after displaying the last updates
+        """
+
+        self.frame_timer.stop()
+        self.flush_view()
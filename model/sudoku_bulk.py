@@ -0,0 +1,100 @@
+import numpy as np
+from model.sudoku_compact import CompactBoard
+
+def as_boards(boards, square_size=3):
+    """Converts boards to a (N, size, size) array of small integers
+
+    Parameters
+    ----------
+    boards : array_like
+        A (N, size, size) collection of boards, or a list of CompactBoards
+    square_size : int, optional
+        The width/length of 1 square, default 3
+
+    Returns:
+        A numpy array of uint8, where values below 0 or above size are
+        replaced by size + 1 so they stay invalid instead of wrapping around
+    """
+
+    size = square_size * square_size
+    if isinstance(boards, (list, tuple)) and boards and isinstance(boards[0], CompactBoard):
+        boards = np.frombuffer(b"".join(board.cells for board in boards), dtype=np.uint8).reshape(-1, size, size)
+    boards = np.asarray(boards)
+    if boards.dtype != np.uint8:
+        boards = np.where((boards < 0) | (boards > size), size + 1, boards).astype(np.uint8)
+    if boards.ndim != 3 or boards.shape[1:] != (size, size):
+        raise ValueError(f"Expected an (N, {size}, {size}) array of boards, got {boards.shape}")
+    return boards
+
+def board_units(boards, square_size=3):
+    """Gathers every row, column and square of every board
+
+    Parameters
+    ----------
+    boards : array_like
+        A (N, size, size) collection of boards
+    square_size : int, optional
+        The width/length of 1 square, default 3
+
+    Returns:
+        A (N, 3 * size, size) array holding the rows, then the columns, then
+        the squares (in row-major order) of every board
+    """
+
+    boards = as_boards(boards, square_size)
+    count, size = boards.shape[0], square_size * square_size
+
+    squares = (boards.reshape(count, square_size, square_size, square_size, square_size)
+               .transpose(0, 1, 3, 2, 4)
+               .reshape(count, size, size))
+    return np.concatenate((boards, boards.transpose(0, 2, 1), squares), axis=1)
+
+def unit_conflicts(boards, square_size=3):
+    """Finds the units of every board that repeat a digit
+
+    Parameters
+    ----------
+    boards : array_like
+        A (N, size, size) collection of boards
+    square_size : int, optional
+        The width/length of 1 square, default 3
+
+    Returns:
+        A (N, 3 * size) boolean array, True for every row, column and square
+        (in the order of board_units) holding the same digit twice
+    """
+
+    units = np.sort(board_units(boards, square_size), axis=-1)
+    repeated = (units[..., 1:] == units[..., :-1]) & (units[..., 1:] != 0)
+    return repeated.any(axis=-1)
+
+def validate_boards(boards, square_size=3, complete=False, givens=None):
+    """Validates many boards at once
+
+    Parameters
+    ----------
+    boards : array_like
+        A (N, size, size) collection of boards
+    square_size : int, optional
+        The width/length of 1 square, default 3
+    complete : bool, optional
+        Whether every cell must be filled, as for solutions, default False
+    givens : array_like, optional
+        The (N, size, size) puzzles the boards must agree with wherever the
+        puzzle has a digit, e.g. to check solver outputs or submissions
+
+    Returns:
+        A (N,) boolean array, True for every valid board
+    """
+
+    boards = as_boards(boards, square_size)
+    size = square_size * square_size
+
+    valid = ~unit_conflicts(boards, square_size).any(axis=1)
+    valid &= (boards <= size).all(axis=(1, 2))
+    if complete:
+        valid &= (boards != 0).all(axis=(1, 2))
+    if givens is not None:
+        givens = as_boards(givens, square_size)
+        valid &= ((givens == 0) | (givens == boards)).all(axis=(1, 2))
+    return valid
@@ -0,0 +1,349 @@
+from collections import OrderedDict
+
+# Stored in the cache for puzzles that have no solution
+UNSOLVABLE = object()
+
+class BoardTransform:
+    """
+    A class used to represent a symmetry of the Sudoku board
+
+    A transform optionally transposes the board, then reorders its rows and
+    columns (bands, stacks and lines within them) and finally relabels the
+    digits. Every such transform maps puzzles to equivalent puzzles and
+    solutions to solutions.
+
+    ...
+    Attributes
+    ----------
+    transpose : bool
+        Whether the board is transposed first
+    rows : list
+        The source row of every row of the transformed board
+    cols : list
+        The source column of every column of the transformed board
+    digits : list
+        The new label of every digit (index 0 keeps empty cells empty)
+
+    Methods
+    -------
+    apply(board)
+        Transforms a board
+
+    invert(board)
+        Maps a transformed board back to the original orientation and labels
+    """
+
+    def __init__(self, transpose, rows, cols, digits):
+        """
+        Parameters
+        ----------
+        transpose : bool
+            Whether the board is transposed first
+        rows : list
+            The source row of every row of the transformed board
+        cols : list
+            The source column of every column of the transformed board
+        digits : list
+            The new label of every digit
+        """
+
+        self.transpose = transpose
+        self.rows = rows
+        self.cols = cols
+        self.digits = digits
+
+    def apply(self, board):
+        """Transforms a board
+
+        Returns:
+            A new list of lists of integers
+        """
+
+        if self.transpose:
+            board = [list(col) for col in zip(*board)]
+        digits = self.digits
+        return [[digits[board[row][col]] for col in self.cols] for row in self.rows]
+
+    def invert(self, board):
+        """Maps a transformed board back to the original orientation and labels
+
+        Returns:
+            A new list of lists of integers
+        """
+
+        labels = [0] * len(self.digits)
+        for digit, label in enumerate(self.digits):
+            labels[label] = digit
+
+        size = len(board)
+        original = [[0] * size for _ in range(size)]
+        for i, row in enumerate(self.rows):
+            for j, col in enumerate(self.cols):
+                original[row][col] = labels[board[i][j]]
+
+        if self.transpose:
+            original = [list(col) for col in zip(*original)]
+        return original
+
+def line_order(board, square_size, col_counts):
+    """Orders the bands of a board and the rows within each band
+
+    Rows are sorted by a signature that does not change under row/column
+    permutations or digit relabeling: their clue count and the clue counts
+    of the columns their clues sit in. Bands are sorted by the signatures of
+    their rows. Ties keep their current order.
+
+    Returns:
+        The source row of every row of the reordered board
+    """
+
+    def signature(row):
+        return (sum(1 for num in board[row] if num),
+                sorted(col_counts[col] for col, num in enumerate(board[row]) if num))
+
+    bands = []
+    for band in range(square_size):
+        rows = sorted(range(band * square_size, (band + 1) * square_size), key=signature)
+        bands.append((sorted(signature(row) for row in rows), rows))
+    bands.sort(key=lambda band: band[0])
+
+    return [row for _, rows in bands for row in rows]
+
+def canonical_transform(board, square_size=3):
+    """Finds the transform taking a board to its canonical form
+
+    Equivalent puzzles usually share a canonical form. When invariant
+    signatures tie, equivalent puzzles may end up under different forms,
+    which only costs cache hits: equal forms always mean equivalent puzzles.
+
+    Parameters
+    ----------
+    board : list
+        A collection of lists of integers
+    square_size : int, optional
+        The width/length of 1 square, default 3
+
+    Returns:
+        The BoardTransform and the canonical board as a tuple key
+    """
+
+    best = None
+    for transpose in (False, True):
+        oriented = [list(col) for col in zip(*board)] if transpose else board
+        row_counts = [sum(1 for num in row if num) for row in oriented]
+        col_counts = [sum(1 for num in col if num) for col in zip(*oriented)]
+        rows = line_order(oriented, square_size, col_counts)
+        cols = line_order([list(col) for col in zip(*oriented)], square_size, row_counts)
+
+        # Relabels digits in order of first appearance
+        digits = [0] * (len(board) + 1)
+        next_label = 1
+        for row in rows:
+            for col in cols:
+                num = oriented[row][col]
+                if num and not digits[num]:
+                    digits[num] = next_label
+                    next_label += 1
+        for num in range(1, len(digits)):
+            if not digits[num]:
+                digits[num] = next_label
+                next_label += 1
+
+        transform = BoardTransform(transpose, rows, cols, digits)
+        key = tuple(num for row in transform.apply(board) for num in row)
+        if best is None or key < best[1]:
+            best = (transform, key)
+
+    return best
+
+class SolutionCache:
+    """
+    A class used to cache solutions by the canonical form of their puzzle
+
+    Puzzles that only differ by digit relabeling, row/column swaps within
+    bands and stacks, band/stack swaps or transposition share one entry. A
+    hit maps the stored solution back through the inverse transform. The
+    least recently used entry is evicted once the cache is full.
+
+    Repeats of a puzzle already seen skip canonicalization through a second
+    map from the exact puzzle to its canonical key and transform. It does not
+    count towards maxsize, and its entries are dropped with the solution
+    they point to.
+
+    ...
+    Attributes
+    ----------
+    maxsize : int
+        The maximum number of cached puzzles
+    square_size : int
+        The width/length of 1 square
+    entries : OrderedDict
+        Solutions by canonical puzzle, least recently used first
+    exact : dict
+        The canonical key and transform of every exact puzzle seen whose
+        solution is still cached
+    aliases : dict
+        The exact puzzles pointing to every canonical key
+    hits : int
+        The number of lookups answered from the cache
+    misses : int
+        The number of lookups that had to be solved
+
+    Methods
+    -------
+    solve(board, solver)
+        Solves a board through the cache
+
+    store(key, solution)
+        Stores a solution, evicting the least recently used entry if full
+
+    copy_solution(solution)
+        Copies a cached solution so callers cannot modify the cache
+
+    clear()
+        Empties the cache
+    """
+
+    def __init__(self, maxsize=1024, square_size=3):
+        """
+        Parameters
+        ----------
+        maxsize : int, optional
+            The maximum number of cached puzzles, default 1024
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        """
+
+        self.maxsize = maxsize
+        self.square_size = square_size
+        self.entries = OrderedDict()
+        self.exact = {}
+        self.aliases = {}
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, board, solver):
+        """Solves a board through the cache
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+        solver : object
+            A solving engine used on a cache miss
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution
+        """
+
+        # Repeats of the exact same puzzle skip canonicalization altogether
+        exact = tuple(num for row in board for num in row)
+        if exact in self.exact:
+            transform, key = self.exact[exact]
+        else:
+            transform, key = canonical_transform(board, self.square_size)
+
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            solution = self.entries[key]
+        else:
+            self.misses += 1
+            solution = solver.solve(transform.apply(board))
+            self.store(key, UNSOLVABLE if solution is None else solution)
+
+        if key in self.entries and exact not in self.exact:
+            self.exact[exact] = (transform, key)
+            self.aliases.setdefault(key, []).append(exact)
+
+        if solution is not None and solution is not UNSOLVABLE:
+            solution = transform.invert(solution)
+        return self.copy_solution(solution)
+
+    def store(self, key, solution):
+        """Stores a solution, evicting the least recently used entry if full
+        """
+
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            evicted, _ = self.entries.popitem(last=False)
+            for exact in self.aliases.pop(evicted, ()):
+                del self.exact[exact]
+
+    def copy_solution(self, solution):
+        """Copies a cached solution so callers cannot modify the cache
+
+        Returns:
+            A new list of lists of integers, or None if the entry is unsolvable
+        """
+
+        if solution is None or solution is UNSOLVABLE:
+            return None
+        return [row[:] for row in solution]
+
+    def clear(self):
+        """Empties the cache
+        """
+
+        self.entries.clear()
+        self.exact.clear()
+        self.aliases.clear()
+
+class CachedSolver:
+    """
+    A class used to put a SolutionCache in front of a solving engine
+
+    ...
+    Attributes
+    ----------
+    solver : object
+        The wrapped solving engine
+    cache : SolutionCache
+        The cache consulted before solving
+
+    Methods
+    -------
+    solve(board)
+        Solves a board through the cache
+    """
+
+    def __init__(self, solver, cache):
+        """
+        Parameters
+        ----------
+        solver : object
+            The wrapped solving engine
+        cache : SolutionCache
+            The cache consulted before solving
+        """
+
+        self.solver = solver
+        self.cache = cache
+
+    @property
+    def name(self):
+        return self.solver.name
+
+    @property
+    def nodes(self):
+        return self.solver.nodes
+
+    @property
+    def stats(self):
+        return self.solver.stats
+
+    def solve(self, board):
+        """Solves a board through the cache
+
+        The wrapped engine's stats are cleared first, so a cache hit reports
+        no search work.
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution
+        """
+
+        self.solver.stats.reset()
+        return self.cache.solve(board, self.solver)
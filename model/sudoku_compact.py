@@ -0,0 +1,203 @@
+from model.sudoku_format import format_puzzle, square_size_for, value_of
+
+class CompactBoard:
+    """
+    A class used to represent a board as one byte per cell
+
+    The cells are kept row by row in a single bytes-like buffer, about 200
+    bytes for a 9x9 board instead of well over a kilobyte for a list of
+    lists. A bytearray gives a mutable board; bytes, or a slice of a memory
+    mapped file, gives a read-only one without copying.
+
+    Indexing a board gives a memoryview of a row, so board[row][col] reads
+    and writes exactly like a list of lists and every model method and
+    engine accepts a CompactBoard unchanged. Rows and columns are views of
+    the buffer, not copies.
+
+    Equal boards hash equally, using the bytes of their cells. A mutable
+    board must not be changed while it is a dictionary key or set member.
+
+    ...
+    Attributes
+    ----------
+    cells : bytes-like
+        The value of every cell, row by row, 0 for empty
+    square_size : int
+        The width/length of 1 square
+    row_col_len : int
+        The size of a row/column
+    readonly : bool
+        Whether the cells cannot be changed, e.g. for a record of a corpus
+
+    Methods
+    -------
+    empty(square_size=3)
+        Creates an empty, mutable board
+
+    from_lists(board)
+        Packs a list of lists of integers into a mutable board
+
+    from_text(text)
+        Packs a puzzle written on one line into a mutable board
+
+    to_lists()
+        Unpacks the board into a list of lists of integers
+
+    copy()
+        Returns a mutable copy of the board
+
+    row(row)
+        Returns a view of a row
+
+    column(column)
+        Returns a view of a column
+
+    square(square)
+        Returns views of the rows of a square, top to bottom
+    """
+
+    __slots__ = ("cells", "square_size", "row_col_len")
+
+    def __init__(self, cells, square_size=None):
+        """
+        Parameters
+        ----------
+        cells : bytes-like
+            The value of every cell, row by row, used without copying
+        square_size : int, optional
+            The width/length of 1 square, inferred from the number of cells
+            by default
+        """
+
+        if square_size is None:
+            square_size = square_size_for(len(cells))
+        elif len(cells) != square_size ** 4:
+            raise ValueError(f"Expected {square_size ** 4} cells, got {len(cells)}")
+
+        self.cells = cells
+        self.square_size = square_size
+        self.row_col_len = square_size * square_size
+
+    @property
+    def readonly(self):
+        return memoryview(self.cells).readonly
+
+    @classmethod
+    def empty(cls, square_size=3):
+        """Creates an empty, mutable board
+
+        Returns:
+            A CompactBoard
+        """
+
+        return cls(bytearray(square_size ** 4), square_size)
+
+    @classmethod
+    def from_lists(cls, board):
+        """Packs a list of lists of integers into a mutable board
+
+        Returns:
+            A CompactBoard
+        """
+
+        return cls(bytearray(num for row in board for num in row))
+
+    @classmethod
+    def from_text(cls, text):
+        """Packs a puzzle written on one line into a mutable board
+
+        Returns:
+            A CompactBoard
+        """
+
+        return cls(bytearray(value_of(char) for char in text.strip()))
+
+    def to_lists(self):
+        """Unpacks the board into a list of lists of integers
+
+        Returns:
+            A collection of lists of integers
+        """
+
+        size = self.row_col_len
+        return [list(self.cells[start:start + size]) for start in range(0, size * size, size)]
+
+    def copy(self):
+        """Returns a mutable copy of the board
+
+        Returns:
+            A CompactBoard
+        """
+
+        return CompactBoard(bytearray(self.cells), self.square_size)
+
+    def row(self, row):
+        """Returns a view of a row, counting from the end if negative
+
+        Returns:
+            A memoryview of row_col_len cells
+        """
+
+        if not -self.row_col_len <= row < self.row_col_len:
+            raise IndexError("board row out of range")
+        start = row % self.row_col_len * self.row_col_len
+        return memoryview(self.cells)[start:start + self.row_col_len]
+
+    def column(self, column):
+        """Returns a view of a column
+
+        Returns:
+            A strided memoryview of row_col_len cells
+        """
+
+        return memoryview(self.cells)[column::self.row_col_len]
+
+    def square(self, square):
+        """Returns views of the rows of a square, top to bottom
+
+        Parameters
+        ----------
+        square : int
+            The square, 0-based in row-major order
+
+        Returns:
+            A tuple of square_size memoryviews of square_size cells
+        """
+
+        size, length = self.square_size, self.row_col_len
+        top, left = square // size * size, square % size * size
+        cells = memoryview(self.cells)
+        return tuple(cells[row * length + left:row * length + left + size] for row in range(top, top + size))
+
+    def __getitem__(self, row):
+        return self.row(row)
+
+    def __len__(self):
+        return self.row_col_len
+
+    def __iter__(self):
+        return (self.row(row) for row in range(self.row_col_len))
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactBoard):
+            return NotImplemented
+        return self.cells == other.cells
+
+    def __hash__(self):
+        cells = self.cells
+        return hash(cells if isinstance(cells, bytes) else bytes(cells))
+
+    def __reduce__(self):
+        return CompactBoard, (bytearray(self.cells), self.square_size)
+
+    def __str__(self):
+        """String representation of the CompactBoard
+
+        Returns:
+            The board written on one line
+        """
+
+        return format_puzzle(self)
+
+    def __repr__(self):
+        return f"CompactBoard({str(self)!r})"
@@ -0,0 +1,143 @@
+from model.sudoku_units import get_units
+
+class ConflictIndex:
+    """
+    A class used to keep track of conflicting tiles as the board changes
+
+    Every row, column and square keeps a count of each digit in it. Setting
+    a tile only changes the counts of its three units, so the index is kept
+    up to date in constant time per edit instead of rescanning the board. A
+    tile conflicts while one of its units holds its digit more than once.
+
+    ...
+    Attributes
+    ----------
+    units : SudokuUnits
+        The precomputed unit tables for the board size
+    values : list
+        The value of every cell, row-major, 0 for empty
+    counts : list
+        The number of cells holding every digit, by unit (rows, then
+        columns, then squares) and digit
+    duplicates : int
+        The number of (unit, digit) pairs counted more than once
+
+    Methods
+    -------
+    load(board)
+        Rebuilds the index from a whole board
+
+    unit_ids(cell)
+        Returns the indices in counts of the row, column and square of a cell
+
+    set(row, col, value)
+        Changes one tile and finds the tiles whose conflict state may change
+
+    is_conflicting(row, col)
+        Checks whether a tile shares its digit with a peer
+
+    conflicts()
+        Lists every conflicting tile
+    """
+
+    def __init__(self, square_size=3):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        """
+
+        self.units = get_units(square_size)
+        self.load(None)
+
+    def load(self, board):
+        """Rebuilds the index from a whole board
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers, None for an empty board
+        """
+
+        units = self.units
+        self.values = [0] * units.cell_count
+        self.counts = [[0] * (units.row_col_len + 1) for _ in range(3 * units.row_col_len)]
+        self.duplicates = 0
+        if board is not None:
+            for cell, value in enumerate(units.flatten(board)):
+                if value:
+                    self.set(units.row_of[cell], units.col_of[cell], value)
+
+    def unit_ids(self, cell):
+        """Returns the indices in counts of the row, column and square of a cell
+        """
+
+        units = self.units
+        size = units.row_col_len
+        return units.row_of[cell], size + units.col_of[cell], 2 * size + units.square_of[cell]
+
+    def set(self, row, col, value):
+        """Changes one tile and finds the tiles whose conflict state may change
+
+        Parameters
+        ----------
+        row : int
+            The model's row
+        col : int
+            The model's column
+        value : int
+            The new value, 0 to clear the tile
+
+        Returns:
+            A set of (row, col) pairs: the tile itself and every peer holding
+            its old or new digit
+        """
+
+        units = self.units
+        cell = row * units.row_col_len + col
+        old = self.values[cell]
+        if old == value:
+            return {(row, col)}
+
+        for unit in self.unit_ids(cell):
+            counts = self.counts[unit]
+            if old:
+                counts[old] -= 1
+                if counts[old] == 1:
+                    self.duplicates -= 1
+            if value:
+                counts[value] += 1
+                if counts[value] == 2:
+                    self.duplicates += 1
+        self.values[cell] = value
+
+        changed = {(row, col)}
+        for peer in units.peers[cell]:
+            if self.values[peer] and self.values[peer] in (old, value):
+                changed.add((units.row_of[peer], units.col_of[peer]))
+        return changed
+
+    def is_conflicting(self, row, col):
+        """Checks whether a tile shares its digit with a peer
+
+        Returns:
+            A boolean for whether or not the tile conflicts
+        """
+
+        cell = row * self.units.row_col_len + col
+        value = self.values[cell]
+        return bool(value) and any(self.counts[unit][value] > 1 for unit in self.unit_ids(cell))
+
+    def conflicts(self):
+        """Lists every conflicting tile
+
+        Returns:
+            A list of (row, col) pairs in row-major order
+        """
+
+        if not self.duplicates:
+            return []
+        units = self.units
+        return [(units.row_of[cell], units.col_of[cell]) for cell in range(units.cell_count)
+                if self.is_conflicting(units.row_of[cell], units.col_of[cell])]
@@ -0,0 +1,867 @@
+from math import isqrt
+from time import monotonic, sleep
+from model.sudoku_engines import PORTFOLIO, get_engine
+from model.sudoku_cache import CachedSolver
+from model.sudoku_compact import CompactBoard
+from model.sudoku_conflicts import ConflictIndex
+from model.sudoku_iterative import CANCELLED, IterativeSolver, PAUSED, SOLVED, UNSOLVABLE
+from model.sudoku_parallel import CHECK_INTERVAL, ParallelSolver
+from model.sudoku_portfolio import PortfolioSolver
+from model.sudoku_trace import TraceRecorder
+from model.sudoku_format import symbol_for
+
+# Results of a uniqueness check
+UNIQUE = "unique"
+MULTIPLE = "multiple"
+NO_SOLUTION = "none"
+UNKNOWN = "unknown"
+
+class SearchStopped(Exception):
+    """Raised inside an engine's search by a StopCheck, with the status the
+    solve ends with
+    """
+
+class StopCheck:
+    """
+    A class used to stop a one-shot engine's search through its tracer
+
+    Engines other than the stepwise one run to the end once started, so
+    this tracer is chained in front of the core's own and raises
+    SearchStopped every CHECK_INTERVAL calls once the search was cancelled
+    or its deadline passed.
+
+    ...
+    Attributes
+    ----------
+    deadline : float
+        A time.monotonic() value after which the search gives up, None for
+        no limit
+    tracer : callable
+        The tracer every event is passed on to, None for none
+    cancelled : bool
+        Whether cancel() was called
+    steps_per_second : float
+        Unused: one-shot engines always run at full speed
+
+    Methods
+    -------
+    cancel()
+        Asks the search to stop at its next check
+    """
+
+    def __init__(self, deadline=None, tracer=None):
+        """
+        Parameters
+        ----------
+        deadline : float, optional
+            A time.monotonic() value after which the search gives up,
+            default no limit
+        tracer : callable, optional
+            The tracer every event is passed on to, default none
+        """
+
+        self.deadline = deadline
+        self.tracer = tracer
+        self.cancelled = False
+        self.steps_per_second = None
+        self.calls = 0
+
+    def __call__(self, event, cell, value, depth):
+        self.calls += 1
+        if not self.calls % CHECK_INTERVAL:
+            if self.cancelled:
+                raise SearchStopped(CANCELLED)
+            if self.deadline is not None and monotonic() > self.deadline:
+                raise SearchStopped(PAUSED)
+        if self.tracer is not None:
+            self.tracer(event, cell, value, depth)
+
+    def cancel(self):
+        """Asks the search to stop at its next check
+        """
+
+        self.cancelled = True
+
+class SudokuCore:
+    """
+    A class used to represent a headless SudokuBoard
+
+    The core holds the board and every solving/validation routine without
+    depending on PyQt6, so it can be used by batch jobs on machines with no
+    GUI toolkit installed. Changes to tiles are reported through an optional
+    listener callback instead of a Qt signal.
+
+    ...
+    Attributes
+    ----------
+    board : list
+        A collection of lists of integers
+    square_size : int
+        The width/length of 1 square
+    row_col_len : int
+        The size of a row/column
+    listener : callable
+        Called as listener(square_row, square_col, pos, value) on tile updates
+    delay : float
+        Seconds solve_board pauses after each trial digit
+    speed : float
+        Steps a second for the stepwise search, None for full speed
+    animate : bool
+        Whether the stepwise search reports every trial digit to the listener
+        or only the solution
+    cache : SolutionCache
+        Consulted by solve() before running an engine, None to always solve
+    search : IterativeSolver, ParallelSolver, PortfolioSolver or StopCheck
+        Cancels the search started by the last solve()
+    portfolio : PortfolioSolver
+        Kept running between portfolio solves, None until the first one
+    status : str
+        The status of the last solve(), e.g. "solved" or "cancelled"
+    stats : SolveStats
+        The search counters and timings of the last solve()
+    tracer : callable
+        Passed to the engine as tracer(event, cell, value, depth), None to
+        disable tracing
+    conflicts : ConflictIndex
+        The live index of conflicting tiles, kept up to date by set_board,
+        set_value and solve
+    record : bool
+        Whether single-process solves record a trace of their search
+    trace : SolveTrace
+        The search recorded by the last solve(), None if not recorded
+
+    Methods
+    -------
+    get_board()
+        Returns the board
+
+    set_board(board)
+        Sets the board
+
+    set_value(row, col, value)
+        Changes one tile, updates the conflict index and reports the change
+
+    load_board(board)
+        Copies a board onto the current one, reporting only the changed tiles
+
+    clear_board()
+        Empties every tile, reporting only the tiles that held a value
+
+    advance(row, col)
+        Advances the row and column along the board
+
+    decrement(row, col)
+        Decrements the row and column along the board
+
+    validate_nums(row=-1, column=-1)
+        Validates if all the numbers in the row/column are unique
+
+    check_row(row)
+        Checks the row for having unique values
+
+    check_column(column)
+        Checks the column for having unique values
+
+    check_square(square)
+        Validates if all the numbers in the square are unique
+
+    def check_board()
+        Validates that the board is a correct Sudoku board
+
+    is_solved()
+        Validates that the board is completely solved
+
+    translate_tile_to_view(row, column)
+        Translates the row, column pair in the model to the correct location in the view
+
+    solve_board(row=0, col=0)
+        Solves the board using backtracking
+
+    solve(engine="backtracking", deadline=None, workers=1)
+        Solves the board with the selected solving engine
+
+    solve_stepwise(solver, deadline=None)
+        Solves the board with a pausable IterativeSolver
+
+    solve_parallel(engine, workers, deadline=None)
+        Solves the board with a ParallelSolver
+
+    solve_portfolio(deadline=None)
+        Solves the board with whichever engine of a PortfolioSolver answers
+        first
+
+    fill_solution(solution)
+        Copies a solution onto the board, reporting every changed tile
+
+    cancel_solve()
+        Cancels a running search
+
+    count_solutions(limit=2, deadline=None)
+        Counts the solutions of the board up to limit without modifying it
+
+    uniqueness(time_budget=None)
+        Finds whether the board has a unique, multiple or no solution
+
+    set_speed(speed)
+        Changes the pace of the stepwise search, even while it runs
+
+    update_view(row, column, value)
+        Reports updates in the model to the listener
+
+    __str__()
+        String representation of the SudokuBoard
+    """
+
+    def __init__(self, unsolved_board=None, listener=None, delay=0, cache=None, speed=None, animate=True,
+                 square_size=3, record=False):
+        """
+        Parameters
+        ----------
+        unsolved_board : list, optional
+            A collection of lists of integers or a CompactBoard, copied if
+            read-only, defaults to an empty board
+        listener : callable, optional
+            Called as listener(square_row, square_col, pos, value) on tile updates
+        delay : float, optional
+            Seconds to pause after each trial digit, default 0
+        cache : SolutionCache, optional
+            Consulted by solve() before running an engine, default None
+        speed : float, optional
+            Steps a second for the stepwise search, default full speed
+        animate : bool, optional
+            Whether the stepwise search reports every trial digit, default True
+        square_size : int, optional
+            The width/length of 1 square (2 - 5) for an empty board, default
+            3; a given board's size is used otherwise
+        record : bool, optional
+            Whether single-process solves record a trace, default False
+        """
+
+        if unsolved_board is not None:
+            square_size = isqrt(len(unsolved_board))
+        if not 2 <= square_size <= 5 or (unsolved_board is not None
+                                         and square_size * square_size != len(unsolved_board)):
+            raise ValueError("Boards must be 4x4, 9x9, 16x16 or 25x25")
+
+        self.square_size = square_size
+        self.row_col_len = square_size * square_size
+
+        if unsolved_board is None:
+            unsolved_board = [[0] * self.row_col_len for _ in range(self.row_col_len)]
+        elif isinstance(unsolved_board, CompactBoard) and unsolved_board.readonly:
+            # Read-only views, such as corpus records, are copied to be edited
+            unsolved_board = unsolved_board.copy()
+
+        self.board = unsolved_board
+        self.listener = listener
+        self.delay = delay
+        self.cache = cache
+        self.speed = speed
+        self.animate = animate
+        self.search = None
+        self.portfolio = None
+        self.status = None
+        self.stats = None
+        self.tracer = None
+        self.conflicts = ConflictIndex(self.square_size)
+        self.conflicts.load(self.board)
+        self.record = record
+        self.trace = None
+
+    def get_board(self):
+        """Returns the board
+
+        Returns:
+            A list of lists of integers
+        """
+
+        return self.board
+
+    def set_board(self, board):
+        """Sets the board, which must keep the current board size; a read-only
+        CompactBoard is copied
+        """
+
+        if len(board) != self.row_col_len:
+            raise ValueError(f"Expected a {self.row_col_len}x{self.row_col_len} board")
+        if isinstance(board, CompactBoard) and board.readonly:
+            board = board.copy()
+        self.board = board
+        self.conflicts.load(board)
+
+    def set_value(self, row, col, value):
+        """Changes one tile, updates the conflict index and reports the change
+
+        Parameters
+        ----------
+        row : int
+            The model's row
+        col : int
+            The model's column
+        value : int
+            The new value, 0 to clear the tile
+
+        Returns:
+            A set of (row, col) pairs whose conflict state may have changed
+        """
+
+        if self.board[row][col] != value:
+            self.board[row][col] = value
+            self.update_view(row, col, value)
+        return self.conflicts.set(row, col, value)
+
+    def load_board(self, board):
+        """Copies a board onto the current one, reporting only the changed tiles
+
+        Unlike set_board, the model keeps its own board, so the listener sees
+        the difference between the two boards rather than a whole new one.
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers of the current board size
+
+        Returns:
+            A set of (row, col) pairs whose conflict state may have changed
+        """
+
+        if len(board) != self.row_col_len or any(len(row) != self.row_col_len for row in board):
+            raise ValueError(f"Expected a {self.row_col_len}x{self.row_col_len} board")
+
+        changed = set()
+        for row in range(self.row_col_len):
+            for col in range(self.row_col_len):
+                if self.board[row][col] != board[row][col]:
+                    changed |= self.set_value(row, col, board[row][col])
+        return changed
+
+    def clear_board(self):
+        """Empties every tile, reporting only the tiles that held a value
+
+        Returns:
+            A set of (row, col) pairs whose conflict state may have changed
+        """
+
+        return self.load_board([[0] * self.row_col_len for _ in range(self.row_col_len)])
+
+    def advance(self, row, col):
+        """Advances the row and column along the board
+
+        Returns:
+            The advanced row and column
+        """
+
+        last = self.row_col_len - 1
+
+        # Used first if in statement to continuously check the last position on the board
+        if row == last and col == last:
+            col = last
+            row = last
+        elif col == last:
+            col = 0
+            row += 1
+        else:
+            col += 1
+
+        return row, col
+
+    def decrement(self, row, col):
+        """Decrements the row and column along the board
+
+        Returns:
+            The decremented row and column
+        """
+
+        if col == 0 and row != 0:
+            col = self.row_col_len - 1
+            row -= 1
+        else:
+            col -= 1
+
+        return row, col
+
+    def validate_nums(self, row=-1, column=-1):
+        """Validates if all the numbers in the row/column are unique
+
+        Parameters
+        ----------
+        row : integer, optional
+            The row to check for validation, default -1
+        column : integer, optional
+            The column to check for validation, default -1
+
+        Returns:
+            A boolean for whether or not the numbers in the row/column are unique
+        """
+
+        check = [0] * self.row_col_len
+
+        for i in range(self.row_col_len):
+            # Checks for which row/column should be validated
+            if row == -1:
+                num = self.board[i][column - 1]
+            else:
+                num = self.board[row - 1][i]
+
+            # Ensures every number in the check array is unique
+            # Boolean returned upon successful or unsuccessful validation
+            if num == 0:
+                continue
+            elif num != check[num - 1]:
+                check[num - 1] = num
+            else:
+                return False
+        return True
+
+    def check_row(self, row):
+        """Checks the row for having unique values
+
+        Returns:
+            The boolean of whether the row is all unique
+        """
+
+        return self.validate_nums(row=row)
+
+    def check_column(self, column):
+        """Checks the column for having unique values
+
+        Returns:
+            The boolean of whether the column is all unique
+        """
+
+        return self.validate_nums(column=column)
+
+    def check_square(self, square):
+        """Validates if all the numbers in the square are unique
+
+        Parameters
+        ----------
+        square : integer
+            The numbered square (1 - row_col_len) to check
+
+        Returns:
+            A boolean for whether or not the numbers in the square are unique
+        """
+
+        check = [0] * self.row_col_len
+
+        for i in range(self.square_size):
+            # Calculates the row to use:
+            #   i : The current index
+            #   square : The square we are checking
+            #   square_size : The length/width of a Sudoku square
+            row = i + (((square - 1) // self.square_size) * self.square_size)
+
+            for j in range(self.square_size):
+                # Calculates the row to use:
+                #   j : The current index
+                #   square : The square we are checking
+                #   square_size : The length/width of a Sudoku square
+                column = j + self.square_size * (((square - 1) % self.square_size))
+
+                num = self.board[row][column]
+
+                # Checks to see if a number exists in the check array
+                # Continues or assigns a number if empty
+                # Returns False if otherwise
+                if num == 0:
+                    continue
+                elif num != check[num - 1]:
+                    check[num - 1] = num
+                else:
+                    return False
+
+        return True
+
+    def check_board(self):
+        """Validates that the board is a correct Sudoku board
+
+        Returns:
+            A boolean for whether or not the board is valid
+        """
+
+        for i in range(self.row_col_len):
+            check = self.check_row(i) and self.check_column(i) and self.check_square(i)
+            if not check:
+                return False
+        return True
+
+    def is_solved(self):
+        """Validates that the board is completely solved
+
+        Returns:
+            A boolean for whether or not the board is solved
+        """
+
+        for i in range(self.row_col_len):
+            if 0 in self.board[i]:
+                return False
+        return True
+
+    def translate_tile_to_view(self, row, column):
+        """Translates the row, column pair in the model to the correct location in the view
+
+         Parameters
+        ----------
+        row : int
+            The model's row
+        column : int
+            The model's column
+
+        Returns:
+            The square's row/column within the view and the tile's position in the list
+        """
+
+        # Retrives the row/col position in the 2D list in the view
+        square_row, square_col = row // self.square_size, column // self.square_size
+
+        # Gets the position of the tile in the square
+        pos = self.square_size * (row % self.square_size) + (column % self.square_size)
+
+        return square_row, square_col, pos
+
+    def solve_board(self, row=0, col=0):
+        """Solves the board using backtracking
+
+        Parameters
+        ----------
+        row : integer, optional
+            The current row being checked
+        column : integer, optional
+            The current column being checked
+        """
+
+        # Checks if the board is not solved
+        if not self.is_solved():
+            # Checks if the row, col pair has an existing number
+            if self.board[row][col] == 0:
+                # Checks every number in each square
+                for num in range(1, self.row_col_len + 1):
+                    # Updates the board so a human can visualize it
+                    self.board[row][col] = num
+                    self.update_view(row, col, num)
+                    if self.delay:
+                        sleep(self.delay)
+
+                    # If the board is valid, advance the row,
+                    # solve through backtracking, and
+                    # check if the board is solved
+                    if self.check_board():
+                        row, col = self.advance(row, col)
+                        self.solve_board(row, col)
+                        row, col = self.decrement(row, col)
+
+                        if self.is_solved():
+                            break
+
+                # If the board is not solved, set the row, col to 0
+                if not self.is_solved():
+                    self.board[row][col] = 0
+                    self.update_view(row, col, 0)
+
+            # Performed if there's a non-zero number exists in the board
+            else:
+                row, col = self.advance(row, col)
+                self.solve_board(row, col)
+
+    def solve(self, engine="backtracking", deadline=None, workers=1):
+        """Solves the board with the selected solving engine
+
+        The backtracking engine is a stepwise search that reports every trial
+        digit to the listener; every other engine solves a copy of the board,
+        through the cache if one is set, and only the filled in tiles are
+        reported to the listener. With more than one worker any engine
+        searches split subproblems on that many processes. The "portfolio"
+        engine races several engines on their own processes and ignores
+        workers. Every search can be cancelled with cancel_solve() and gives
+        up at the deadline, leaving the board as it was with the status
+        "cancelled" or "paused". When record is set, a single-process search
+        is recorded in trace.
+
+        Parameters
+        ----------
+        engine : str, optional
+            The name of the engine to use, default "backtracking"
+        deadline : float, optional
+            A time.monotonic() value after which the search gives up
+        workers : int, optional
+            The number of processes searching the board, default 1 and 0 for
+            one per CPU
+
+        Returns:
+            A boolean for whether or not the board was solved
+        """
+
+        self.trace = None
+        self.search = None
+        if engine == PORTFOLIO:
+            return self.solve_portfolio(deadline)
+        if workers != 1:
+            return self.solve_parallel(engine, workers, deadline)
+
+        solver = get_engine(engine, self.square_size)
+        solver.tracer = self.tracer
+        if self.record:
+            solver.tracer = recorder = TraceRecorder(self.board, self.square_size, self.tracer)
+        self.stats = solver.stats
+        try:
+            if isinstance(solver, IterativeSolver):
+                return self.solve_stepwise(solver, deadline)
+
+            # Checks for a cancel or the deadline between the engine's steps
+            solver.tracer = self.search = StopCheck(deadline, solver.tracer)
+
+            # A cached solution has no search to record
+            if self.cache is not None and not self.record:
+                solver = CachedSolver(solver, self.cache)
+
+            try:
+                solution = solver.solve(self.board)
+            except SearchStopped as stopped:
+                self.status = stopped.args[0]
+                return False
+            if solution is None:
+                self.status = UNSOLVABLE
+                return False
+
+            self.fill_solution(solution)
+            self.status = SOLVED
+            return True
+        finally:
+            if self.record:
+                self.trace = recorder.trace()
+
+    def solve_parallel(self, engine, workers, deadline=None):
+        """Solves the board with a ParallelSolver
+
+        Parameters
+        ----------
+        engine : str
+            The name of the engine solving the subproblems
+        workers : int
+            The number of worker processes, 0 for one per CPU
+        deadline : float, optional
+            A time.monotonic() value after which the search gives up
+
+        Returns:
+            A boolean for whether or not the board was solved
+        """
+
+        solver = ParallelSolver(engine, self.square_size, workers or None)
+        solver.deadline = deadline
+        self.search = solver
+        self.stats = solver.stats
+
+        solution = solver.solve(self.board)
+        self.status = solver.status
+        if solution is None:
+            return False
+
+        self.fill_solution(solution)
+        return True
+
+    def solve_portfolio(self, deadline=None):
+        """Solves the board with whichever engine of a PortfolioSolver answers
+        first
+
+        The portfolio's processes are started by the first call and reused
+        by the next ones.
+
+        Parameters
+        ----------
+        deadline : float, optional
+            A time.monotonic() value after which the search gives up
+
+        Returns:
+            A boolean for whether or not the board was solved
+        """
+
+        if self.portfolio is None:
+            self.portfolio = PortfolioSolver(self.square_size)
+        solver = self.portfolio
+        solver.deadline = deadline
+        self.search = solver
+        self.stats = solver.stats
+
+        solution = solver.solve(self.board)
+        self.status = solver.status
+        if solution is None:
+            return False
+
+        self.fill_solution(solution)
+        return True
+
+    def fill_solution(self, solution):
+        """Copies a solution onto the board, reporting every changed tile
+
+        Parameters
+        ----------
+        solution : list
+            The solved board as a collection of lists of integers
+        """
+
+        for row in range(self.row_col_len):
+            for col in range(self.row_col_len):
+                if self.board[row][col] != solution[row][col]:
+                    self.set_value(row, col, solution[row][col])
+
+    def solve_stepwise(self, solver, deadline=None):
+        """Solves the board with a pausable IterativeSolver
+
+        If the search does not finish, every trial digit is taken back so the
+        board is left as it was. When not animating, the listener only hears
+        about the solution.
+
+        Parameters
+        ----------
+        solver : IterativeSolver
+            The search to run
+        deadline : float, optional
+            A time.monotonic() value after which the search gives up
+
+        Returns:
+            A boolean for whether or not the board was solved
+        """
+
+        solver.listener = self.update_view if self.animate else None
+        solver.steps_per_second = self.speed
+        solver.load(self.board)
+        self.search = solver
+
+        self.status = solver.run(deadline=deadline)
+        solution = solver.solution()
+
+        for row in range(self.row_col_len):
+            for col in range(self.row_col_len):
+                if self.board[row][col] != 0:
+                    continue
+                if solution is not None:
+                    self.set_value(row, col, solution[row][col])
+                elif self.animate and solver.cells[row * self.row_col_len + col]:
+                    self.update_view(row, col, 0)
+        return solution is not None
+
+    def set_speed(self, speed):
+        """Changes the pace of the stepwise search, even while it runs
+
+        Parameters
+        ----------
+        speed : float
+            Steps a second, None for full speed
+        """
+
+        self.speed = speed
+        if self.search is not None:
+            self.search.steps_per_second = speed
+
+    def cancel_solve(self):
+        """Cancels a running search
+        """
+
+        if self.search is not None:
+            self.search.cancel()
+
+    def count_solutions(self, limit=2, deadline=None):
+        """Counts the solutions of the board up to limit without modifying it
+
+        The search stops as soon as limit solutions are found, so the check
+        stays bounded on a nearly empty 9x9 board. Larger boards can still
+        take minutes to prove unique, which the deadline guards against.
+
+        Parameters
+        ----------
+        limit : int, optional
+            The number of solutions to stop at, default 2
+        deadline : float, optional
+            A time.monotonic() value after which the search gives up,
+            default no limit
+
+        Returns:
+            The number of solutions found, at most limit
+
+        Raises:
+            TimeoutError if the deadline passes before the count is known
+        """
+
+        solver = get_engine("propagation", self.square_size)
+        solver.tracer = tracer = self.tracer
+        self.stats = solver.stats
+
+        # Checks the clock on every guess
+        if deadline is not None:
+            def check_deadline(event, cell, value, depth):
+                if event == "place" and monotonic() > deadline:
+                    raise TimeoutError("The search ran out of time")
+                if tracer is not None:
+                    tracer(event, cell, value, depth)
+
+            solver.tracer = check_deadline
+        return solver.count_solutions(self.board, limit)
+
+    def uniqueness(self, time_budget=None):
+        """Finds whether the board has a unique, multiple or no solution
+
+        Parameters
+        ----------
+        time_budget : float, optional
+            Seconds the check may take, default no limit
+
+        Returns:
+            UNIQUE, MULTIPLE or NO_SOLUTION, or UNKNOWN if the time budget ran
+            out first
+        """
+
+        deadline = None if time_budget is None else monotonic() + time_budget
+        try:
+            return (NO_SOLUTION, UNIQUE, MULTIPLE)[self.count_solutions(2, deadline)]
+        except TimeoutError:
+            return UNKNOWN
+
+    def update_view(self, row, column, value):
+        """Reports updates in the model to the listener
+
+         Parameters
+        ----------
+        row : int
+            The model's row
+        column : int
+            The model's column
+        value : int
+            The value to be displayed
+        """
+
+        if self.listener is None:
+            return
+
+        square_row, square_col, pos = self.translate_tile_to_view(row, column)
+        self.listener(square_row, square_col, pos, value)
+
+    def __str__(self):
+        """String representation of the SudokuBoard
+        """
+
+        built_string = ""
+        separator = " -" * (self.row_col_len + 1) + " \n"
+
+        # For loop that builds the rows of the board
+        # Adds dashes ( - ) to separate each band of squares
+        for i in range(len(self.board)):
+            if i % self.square_size == 0:
+                built_string += separator
+
+            built_string += " | "
+
+            # For loop that tracks each column
+            for j in range(self.row_col_len):
+                built_string += symbol_for(self.board[i][j]) or "0"
+
+                # Adds pipe ( | ) to separate each square
+                if (j + 1) % self.square_size == 0:
+                    built_string += " | "
+
+            # Drops to the next line
+            built_string += "\n"
+
+        built_string += separator
+
+        return f"FORMATTED BOARD: \n{built_string}"
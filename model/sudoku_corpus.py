@@ -0,0 +1,268 @@
+import copy
+import mmap
+import struct
+from model.sudoku_compact import CompactBoard
+
+# Corpus files start with this header: magic, format version, square size,
+# whether cells are packed two to a byte, puzzle count and the offset of the
+# first record
+MAGIC = b"SDKC"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBxQQ")
+
+# Lookup tables splitting a packed byte into its high and low cell
+HIGH_CELLS = bytes(byte >> 4 for byte in range(256))
+LOW_CELLS = bytes(byte & 15 for byte in range(256))
+
+def record_size(square_size, packed):
+    """Returns the number of bytes one puzzle takes in a corpus
+
+    Returns:
+        An integer
+    """
+
+    cells = square_size ** 4
+    return (cells + 1) // 2 if packed else cells
+
+def pack_cells(cells):
+    """Packs cell values below 16 two to a byte, the first in the high half
+
+    Parameters
+    ----------
+    cells : bytes
+        One value per cell
+
+    Returns:
+        The packed bytes, padded with an empty cell to a whole byte
+    """
+
+    if len(cells) % 2:
+        cells += b"\0"
+    return bytes(high << 4 | low for high, low in zip(cells[0::2], cells[1::2]))
+
+def unpack_cells(record, cell_count):
+    """Unpacks cells packed two to a byte by pack_cells
+
+    Parameters
+    ----------
+    record : bytes
+        The packed bytes
+    cell_count : int
+        The number of cells packed in the record
+
+    Returns:
+        A bytearray of one value per cell
+    """
+
+    cells = bytearray(2 * len(record))
+    cells[0::2] = record.translate(HIGH_CELLS)
+    cells[1::2] = record.translate(LOW_CELLS)
+    del cells[cell_count:]
+    return cells
+
+def is_corpus(path):
+    """Checks whether a file starts like a binary corpus
+
+    Returns:
+        A boolean for whether or not the file starts with MAGIC, False if it
+        cannot be read
+    """
+
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def write_corpus(path, boards, square_size=3, packed=None):
+    """Writes boards to a binary corpus file
+
+    Parameters
+    ----------
+    path : str
+        The file to write
+    boards : iterable
+        Boards as lists of lists of integers or CompactBoards, read lazily
+    square_size : int, optional
+        The width/length of 1 square of every board, default 3
+    packed : bool, optional
+        Whether cells are packed two to a byte, by default whenever every
+        value fits in 4 bits (4x4 and 9x9 boards)
+
+    Returns:
+        The number of boards written
+    """
+
+    row_col_len = square_size * square_size
+    cell_count = row_col_len * row_col_len
+    if packed is None:
+        packed = row_col_len < 16
+    elif packed and row_col_len >= 16:
+        raise ValueError("Only boards up to 9x9 can be packed two cells to a byte")
+
+    count = 0
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, square_size, packed, 0, HEADER.size))
+        for board in boards:
+            if isinstance(board, CompactBoard):
+                cells = bytes(board.cells)
+            else:
+                cells = bytes(num for row in board for num in row)
+            if len(cells) != cell_count or max(cells) > row_col_len:
+                raise ValueError(f"Board {count} is not a valid {row_col_len}x{row_col_len} board")
+            file.write(pack_cells(cells) if packed else cells)
+            count += 1
+
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, square_size, packed, count, HEADER.size))
+    return count
+
+class PuzzleCorpus:
+    """
+    A class used to read a binary corpus through a memory map
+
+    Every puzzle is a fixed-size record after the header, so any puzzle is
+    found by its index without reading the ones before it, and nothing is
+    parsed. Unpacked records are returned as read-only CompactBoards viewing
+    the mapped file without copying; packed records are unpacked with two
+    table lookups.
+
+    Slicing returns another PuzzleCorpus sharing the same mapping, which is
+    how a corpus is split into shards by record range. Closing any slice
+    closes them all.
+
+    ...
+    Attributes
+    ----------
+    path : str
+        The corpus file
+    square_size : int
+        The width/length of 1 square
+    packed : bool
+        Whether cells are packed two to a byte
+    cell_count : int
+        The number of cells of one puzzle
+    record_size : int
+        The number of bytes one puzzle takes
+    offset : int
+        The position of the first record in the file
+    start : int
+        The index of the first puzzle in this view of the corpus
+    stop : int
+        The index after the last puzzle in this view of the corpus
+
+    Methods
+    -------
+    shard(index, count)
+        Returns one of count equal record ranges of the corpus
+
+    close()
+        Closes the file, unmapping it once no board refers to it
+    """
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            The corpus file
+        """
+
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self.file.close()
+            raise ValueError(f"{path} is too short to be a corpus") from None
+        except OSError:
+            self.file.close()
+            raise
+        self.view = memoryview(self.map)
+
+        # Closes the file and the mapping if it is not a valid corpus
+        try:
+            if len(self.map) < HEADER.size:
+                raise ValueError(f"{path} is too short to be a corpus")
+            magic, version, square_size, packed, count, offset = HEADER.unpack_from(self.map)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} corpus")
+
+            if not 2 <= square_size <= 5:
+                raise ValueError(f"{path} has an invalid board size in its header")
+
+            self.square_size = square_size
+            self.packed = bool(packed)
+            self.cell_count = square_size ** 4
+            self.record_size = record_size(square_size, packed)
+            self.offset = offset
+            if offset + count * self.record_size > len(self.map):
+                raise ValueError(f"{path} is truncated")
+        except ValueError:
+            self.close()
+            raise
+
+        self.start, self.stop = 0, count
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Corpus slices cannot have a step")
+            view = copy.copy(self)
+            view.start, view.stop = self.start + start, self.start + max(start, stop)
+            return view
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("corpus index out of range")
+
+        begin = self.offset + (self.start + index) * self.record_size
+        record = self.view[begin:begin + self.record_size]
+        if self.packed:
+            return CompactBoard(unpack_cells(record.tobytes(), self.cell_count), self.square_size)
+        return CompactBoard(record, self.square_size)
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def shard(self, index, count):
+        """Returns one of count equal record ranges of the corpus
+
+        Parameters
+        ----------
+        index : int
+            The shard, from 0 to count - 1
+        count : int
+            The number of shards
+
+        Returns:
+            A PuzzleCorpus viewing the records of the shard
+        """
+
+        if not 0 <= index < count:
+            raise ValueError(f"Shard {index} does not exist in {count} shards")
+        return self[index * len(self) // count:(index + 1) * len(self) // count]
+
+    def close(self):
+        """Closes the file, unmapping it once no board refers to it
+        """
+
+        self.file.close()
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            # Boards still view the mapping, which is unmapped when they go
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
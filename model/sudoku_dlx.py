@@ -0,0 +1,198 @@
+from model.sudoku_stats import InstrumentedSolver
+
+class DancingLinksSolver(InstrumentedSolver):
+    """
+    A class used to solve boards as an exact cover problem with Dancing Links
+
+    Every (cell, digit) placement is a row of the exact cover matrix that
+    covers four columns: the cell itself and the digit in its row, column and
+    square. Algorithm X always branches on the column with the fewest
+    remaining rows, which keeps the search small even on boards built to
+    defeat row-major backtracking. The doubly linked lists are stored in flat
+    integer arrays rather than node objects.
+
+    ...
+    Attributes
+    ----------
+    name : str
+        The name the engine is registered under
+
+    Methods
+    -------
+    build_matrix()
+        Builds the linked exact cover matrix for an empty board
+
+    solve(board)
+        Solves the board without modifying it
+    """
+
+    name = "dlx"
+
+    def build_matrix(self):
+        """Builds the linked exact cover matrix for an empty board
+
+        Returns:
+            The left, right, up, down, column, row-id and size arrays plus the
+            first node of every matrix row
+        """
+
+        units = self.units
+        size = units.row_col_len
+        column_count = 4 * units.cell_count
+
+        # Node 0 is the root, nodes 1..column_count are the column headers
+        left = list(range(-1, column_count))
+        right = list(range(1, column_count + 2))
+        left[0], right[column_count] = column_count, 0
+        up = list(range(column_count + 1))
+        down = list(range(column_count + 1))
+        column = list(range(column_count + 1))
+        row_id = [-1] * (column_count + 1)
+        sizes = [0] * (column_count + 1)
+        row_start = []
+
+        for cell in range(units.cell_count):
+            row, col, square = units.row_of[cell], units.col_of[cell], units.square_of[cell]
+            for digit in range(size):
+                headers = (1 + cell,
+                           1 + units.cell_count + row * size + digit,
+                           1 + 2 * units.cell_count + col * size + digit,
+                           1 + 3 * units.cell_count + square * size + digit)
+                first = len(column)
+                row_start.append(first)
+
+                for offset, header in enumerate(headers):
+                    node = first + offset
+                    left.append(first + (offset - 1) % 4)
+                    right.append(first + (offset + 1) % 4)
+                    up.append(up[header])
+                    down.append(header)
+                    down[up[header]] = node
+                    up[header] = node
+                    column.append(header)
+                    row_id.append(cell * size + digit)
+                    sizes[header] += 1
+
+        return left, right, up, down, column, row_id, sizes, row_start
+
+    def solve(self, board):
+        """Solves the board without modifying it
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution
+        """
+
+        units, stats, tracer = self.units, self.stats, self.tracer
+        size = units.row_col_len
+        stats.reset()
+
+        with stats.phase("setup"):
+            cells = units.flatten(board)
+            left, right, up, down, column, row_id, sizes, row_start = self.build_matrix()
+
+        def cover(header):
+            right[left[header]] = right[header]
+            left[right[header]] = left[header]
+            i = down[header]
+            while i != header:
+                j = right[i]
+                while j != i:
+                    down[up[j]] = down[j]
+                    up[down[j]] = up[j]
+                    sizes[column[j]] -= 1
+                    j = right[j]
+                i = down[i]
+
+        def uncover(header):
+            i = up[header]
+            while i != header:
+                j = left[i]
+                while j != i:
+                    sizes[column[j]] += 1
+                    down[up[j]] = j
+                    up[down[j]] = j
+                    j = left[j]
+                i = up[i]
+            right[left[header]] = header
+            left[right[header]] = header
+
+        # Selects the rows of the givens up front
+        with stats.phase("setup"):
+            covered = set()
+            for cell, num in enumerate(cells):
+                if num == 0:
+                    continue
+                first = row_start[cell * size + num - 1]
+                headers = [column[first + offset] for offset in range(4)]
+                stats.validations += 1
+                if covered.intersection(headers):
+                    return None
+                covered.update(headers)
+                for header in headers:
+                    cover(header)
+
+        solution = []
+
+        def search():
+            if right[0] == 0:
+                return True
+            depth = len(solution)
+            if depth > stats.max_depth:
+                stats.max_depth = depth
+
+            # Chooses the column with the fewest remaining rows
+            best, header = right[0], right[right[0]]
+            while header != 0:
+                if sizes[header] < sizes[best]:
+                    best = header
+                header = right[header]
+            stats.validations += 1
+            if sizes[best] == 0:
+                return False
+
+            # A column with a single row left is a forced placement
+            forced = sizes[best] == 1
+            cover(best)
+            i = down[best]
+            while i != best:
+                if forced:
+                    stats.propagations += 1
+                else:
+                    stats.nodes += 1
+                solution.append(row_id[i])
+                if tracer is not None:
+                    tracer("force" if forced else "place", row_id[i] // size, row_id[i] % size + 1, depth)
+                j = right[i]
+                while j != i:
+                    cover(column[j])
+                    j = right[j]
+
+                if search():
+                    return True
+
+                j = left[i]
+                while j != i:
+                    uncover(column[j])
+                    j = left[j]
+                solution.pop()
+                stats.backtracks += 1
+                if tracer is not None:
+                    tracer("undo", row_id[i] // size, 0, depth)
+                i = down[i]
+            uncover(best)
+            return False
+
+        with stats.phase("search"):
+            solved = search()
+        if not solved:
+            return None
+
+        for placement in solution:
+            cells[placement // size] = placement % size + 1
+        return units.unflatten(cells)
@@ -0,0 +1,51 @@
+from model.sudoku_iterative import IterativeSolver
+from model.sudoku_bitmask import BitmaskSolver
+from model.sudoku_dlx import DancingLinksSolver
+from model.sudoku_propagation import PropagationSolver
+from model.sudoku_sat import SatSolver
+from model.sudoku_restart import RestartSolver
+
+# Solving engines selectable by name, the default first
+ENGINES = {
+    IterativeSolver.name: IterativeSolver,
+    BitmaskSolver.name: BitmaskSolver,
+    DancingLinksSolver.name: DancingLinksSolver,
+    PropagationSolver.name: PropagationSolver,
+    SatSolver.name: SatSolver,
+    RestartSolver.name: RestartSolver,
+}
+
+# Races several of the engines above in separate processes, see
+# model/sudoku_portfolio.py
+PORTFOLIO = "portfolio"
+
+def engine_names():
+    """Returns the names of every selectable solving engine
+
+    Returns:
+        A list of strings, starting with the default engine and ending with
+        the portfolio
+    """
+
+    return list(ENGINES) + [PORTFOLIO]
+
+def get_engine(name, square_size=3):
+    """Creates the solving engine registered under a name
+
+    Parameters
+    ----------
+    name : str
+        The name of the engine
+    square_size : int, optional
+        The width/length of 1 square, default 3
+
+    Returns:
+        An engine object with a solve(board) method
+    """
+
+    if name == PORTFOLIO:
+        from model.sudoku_portfolio import PortfolioSolver
+        return PortfolioSolver(square_size)
+    if name not in ENGINES:
+        raise ValueError(f"Unknown solving engine: {name}")
+    return ENGINES[name](square_size)
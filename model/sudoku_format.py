@@ -0,0 +1,97 @@
+from math import isqrt
+
+# Characters used for empty cells in the one-line puzzle format
+EMPTY_CHARS = ".0"
+
+# Characters used for the digits 1 - 25, so boards up to 25x25 fit one
+# character per cell
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+
+def symbol_for(value):
+    """Returns the character written for a cell value
+
+    Parameters
+    ----------
+    value : int
+        The value of the cell, 0 for empty
+
+    Returns:
+        A one-character string, "" for an empty cell
+    """
+
+    return SYMBOLS[value - 1] if value else ""
+
+def value_of(char):
+    """Returns the cell value written as a character
+
+    Parameters
+    ----------
+    char : str
+        A character from SYMBOLS (lowercase letters are accepted) or EMPTY_CHARS
+
+    Returns:
+        The value of the cell, 0 for empty
+    """
+
+    if char in EMPTY_CHARS:
+        return 0
+    value = SYMBOLS.find(char.upper()) + 1
+    if not value:
+        raise ValueError(f"Invalid cell character: {char!r}")
+    return value
+
+def square_size_for(cell_count):
+    """Finds the square size of a board from its number of cells
+
+    Returns:
+        The width/length of 1 square
+    """
+
+    square_size = isqrt(isqrt(cell_count))
+    if square_size ** 4 != cell_count or not 2 <= square_size <= 5:
+        raise ValueError(f"{cell_count} cells is not a 4x4 to 25x25 board")
+    return square_size
+
+def parse_puzzle(text, square_size=None):
+    """Parses a puzzle written on one line, row by row
+
+    Parameters
+    ----------
+    text : str
+        The cells of the puzzle, using "." or "0" for empty cells and
+        1-9 then A-P for the digits 1 - 25
+    square_size : int, optional
+        The width/length of 1 square, inferred from the length by default
+
+    Returns:
+        A list of lists of integers
+    """
+
+    if square_size is None:
+        square_size = square_size_for(len(text))
+
+    size = square_size * square_size
+    if len(text) != size * size:
+        raise ValueError(f"Expected {size * size} cells, got {len(text)}")
+
+    cells = [value_of(char) for char in text]
+    if max(cells) > size:
+        raise ValueError(f"Digit larger than {size} in a {size}x{size} puzzle")
+
+    return [cells[row * size:(row + 1) * size] for row in range(size)]
+
+def format_puzzle(board, empty="."):
+    """Writes a board on one line, row by row
+
+    Parameters
+    ----------
+    board : list
+        A collection of lists of integers
+    empty : str, optional
+        The character used for empty cells, default "."
+
+    Returns:
+        A string with one character per cell
+    """
+
+    return "".join(SYMBOLS[num - 1] if num else empty for row in board for num in row)
@@ -0,0 +1,256 @@
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from model.sudoku_format import format_puzzle
+from model.sudoku_propagation import PropagationSolver
+
+# Difficulty levels: easy puzzles are solved by naked and hidden singles
+# alone, hard puzzles need at least one guess
+DIFFICULTIES = ("easy", "hard")
+
+class SudokuGenerator:
+    """
+    A class used to generate random puzzles with a unique solution
+
+    A random solution is built by filling the squares on the diagonal, which
+    never share a unit, with shuffled digits and solving the rest. Clues are
+    then removed in a random order (in symmetric pairs by default) and every
+    removal is kept only if the puzzle still has exactly one solution,
+    checked by counting solutions up to 2 with the propagation engine.
+
+    ...
+    Attributes
+    ----------
+    square_size : int
+        The width/length of 1 square
+    units : SudokuUnits
+        The precomputed unit tables for the board size
+    rng : Random
+        The random number generator, seeded for reproducible puzzles
+    solver : PropagationSolver
+        The engine used to fill solutions and count solutions
+
+    Methods
+    -------
+    seed(seed)
+        Reseeds the random number generator
+
+    random_solution()
+        Builds a random solved board
+
+    dig(solution, clues=0, difficulty=None, symmetric=True)
+        Removes clues from a solution while the puzzle stays unique
+
+    grade(puzzle)
+        Finds the difficulty of a unique puzzle
+
+    generate(clues=None, difficulty=None, symmetric=True, attempts=100)
+        Generates a unique puzzle with a target clue count and difficulty
+    """
+
+    def __init__(self, square_size=3, seed=None):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        seed : int or str, optional
+            The seed of the random number generator, default unseeded
+        """
+
+        self.square_size = square_size
+        self.solver = PropagationSolver(square_size)
+        self.units = self.solver.units
+        self.rng = random.Random(seed)
+
+    def seed(self, seed):
+        """Reseeds the random number generator
+
+        Parameters
+        ----------
+        seed : int or str
+            The new seed
+        """
+
+        self.rng.seed(seed)
+
+    def random_solution(self):
+        """Builds a random solved board
+
+        Returns:
+            A collection of lists of integers
+        """
+
+        size, length = self.square_size, self.units.row_col_len
+        while True:
+            board = [[0] * length for _ in range(length)]
+            for square in range(size):
+                digits = self.rng.sample(range(1, length + 1), length)
+                for index, num in enumerate(digits):
+                    board[square * size + index // size][square * size + index % size] = num
+
+            solution = self.solver.solve(board)
+            if solution is not None:
+                return solution
+
+    def dig(self, solution, clues=0, difficulty=None, symmetric=True):
+        """Removes clues from a solution while the puzzle stays unique
+
+        Parameters
+        ----------
+        solution : list
+            A solved board, left unmodified
+        clues : int, optional
+            The number of clues to stop at, default 0 digs as far as possible
+        difficulty : str, optional
+            "easy" only keeps removals that leave the puzzle solvable by
+            singles, default None keeps every unique removal
+        symmetric : bool, optional
+            Whether clues are removed in pairs mirrored through the centre,
+            default True
+
+        Returns:
+            The puzzle as a collection of lists of integers
+        """
+
+        units = self.units
+        cells = units.flatten(solution)
+        last = units.cell_count - 1
+        remaining = units.cell_count
+
+        order = list(range(units.cell_count))
+        self.rng.shuffle(order)
+        for cell in order:
+            if remaining <= clues or not cells[cell]:
+                continue
+            removed = [cell, last - cell] if symmetric and cell != last - cell else [cell]
+            if remaining - len(removed) < clues:
+                removed = [cell]
+
+            kept = [cells[index] for index in removed]
+            for index in removed:
+                cells[index] = 0
+            puzzle = units.unflatten(cells)
+            if (self.solver.count_solutions(puzzle, 2) == 1
+                    and (difficulty != "easy" or self.solver.nodes == 0)):
+                remaining -= len(removed)
+            else:
+                for index, num in zip(removed, kept):
+                    cells[index] = num
+        return units.unflatten(cells)
+
+    def grade(self, puzzle):
+        """Finds the difficulty of a unique puzzle
+
+        Returns:
+            "easy" if naked and hidden singles solve the puzzle, otherwise "hard"
+        """
+
+        self.solver.count_solutions(puzzle, 2)
+        return "easy" if self.solver.nodes == 0 else "hard"
+
+    def generate(self, clues=None, difficulty=None, symmetric=True, attempts=100):
+        """Generates a unique puzzle with a target clue count and difficulty
+
+        Parameters
+        ----------
+        clues : int, optional
+            The exact number of clues, default None digs until no clue can be
+            removed
+        difficulty : str, optional
+            One of DIFFICULTIES, default None accepts any puzzle
+        symmetric : bool, optional
+            Whether the clues are symmetric through the centre, default True
+        attempts : int, optional
+            The number of solutions tried before giving up, default 100
+
+        Returns:
+            The puzzle as a collection of lists of integers
+        """
+
+        if difficulty is not None and difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty: {difficulty!r}")
+
+        for _ in range(attempts):
+            puzzle = self.dig(self.random_solution(), clues or 0, difficulty, symmetric)
+            if clues is not None and sum(1 for row in puzzle for num in row if num) != clues:
+                continue
+            if difficulty is not None and self.grade(puzzle) != difficulty:
+                continue
+            return puzzle
+        raise ValueError(f"No puzzle with {clues} clues and difficulty {difficulty} found "
+                         f"in {attempts} attempts")
+
+def generate_range(square_size, seed, start, stop, options):
+    """Generates the puzzles numbered start to stop inside a worker process
+
+    Every puzzle is generated from its own seed, derived from the batch seed
+    and the puzzle's number, so a batch is reproducible whatever the number
+    of workers or the chunk size.
+
+    Parameters
+    ----------
+    square_size : int
+        The width/length of 1 square
+    seed : int or str
+        The seed of the batch
+    start : int
+        The number of the first puzzle
+    stop : int
+        The number after the last puzzle
+    options : dict
+        Keyword arguments for SudokuGenerator.generate
+
+    Returns:
+        A list of puzzles written on one line
+    """
+
+    generator = SudokuGenerator(square_size)
+    puzzles = []
+    for number in range(start, stop):
+        generator.seed(f"{seed}:{number}")
+        puzzles.append(format_puzzle(generator.generate(**options)))
+    return puzzles
+
+def generate_many(count, square_size=3, seed=None, workers=1, chunksize=16, **options):
+    """Lazily generates a batch of puzzles, optionally across worker processes
+
+    Parameters
+    ----------
+    count : int
+        The number of puzzles
+    square_size : int, optional
+        The width/length of 1 square, default 3
+    seed : int or str, optional
+        The seed of the batch, default a random seed
+    workers : int, optional
+        The number of worker processes, default 1 generates in this process
+        and 0 uses one per CPU
+    chunksize : int, optional
+        The number of puzzles a worker generates at once, default 16
+    **options
+        Keyword arguments for SudokuGenerator.generate
+
+    Yields:
+        Puzzles written on one line, in order
+    """
+
+    if seed is None:
+        seed = random.randrange(2 ** 63)
+    ranges = ((start, min(start + chunksize, count)) for start in range(0, count, chunksize))
+
+    if workers == 1:
+        for start, stop in ranges:
+            yield from generate_range(square_size, seed, start, stop, options)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for start, stop in ranges:
+            pending.append(pool.submit(generate_range, square_size, seed, start, stop, options))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
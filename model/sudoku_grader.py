@@ -0,0 +1,676 @@
+from itertools import combinations
+from math import isqrt
+from model.sudoku_format import parse_puzzle, symbol_for
+from model.sudoku_iterative import SOLVED, UNSOLVABLE
+from model.sudoku_pool import chunked, get_corpus, run_tasks
+from model.sudoku_units import get_units
+
+# Human solving techniques, easiest first; a puzzle's grade is the hardest
+# one it needs
+TECHNIQUES = ("naked single", "hidden single", "locked candidates", "naked pair", "hidden pair",
+              "naked triple", "hidden triple", "x-wing", "swordfish")
+
+# The grade of a puzzle the techniques cannot finish
+GUESS = "guess"
+
+# Status of a grading that ran out of techniques before solving the puzzle
+STUCK = "stuck"
+
+# Graders already created in this process, by square size
+_graders = {}
+
+def cell_name(cell, row_col_len=9):
+    """Names a cell by its row and column, counting from 1
+
+    Returns:
+        A string such as "R3C7"
+    """
+
+    return f"R{cell // row_col_len + 1}C{cell % row_col_len + 1}"
+
+def digits_of(mask):
+    """Lists the digits in a candidate bitmask
+
+    Returns:
+        A list of integers, smallest first
+    """
+
+    digits = []
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        digits.append(bit.bit_length())
+    return digits
+
+class Hint:
+    """
+    A class used to describe one logical step
+
+    A step either places digits or removes candidates. The cells forming
+    the pattern, such as the two cells of a naked pair, are kept so a view
+    can point them out.
+
+    ...
+    Attributes
+    ----------
+    technique : str
+        One of TECHNIQUES
+    placements : list
+        (cell, digit) pairs placed by the step
+    eliminations : list
+        (cell, digit) pairs of the candidates removed by the step
+    cells : tuple
+        The cells forming the pattern
+    where : str
+        The units the pattern lies in, e.g. "row 3"
+    row_col_len : int
+        The size of a row/column, used to name cells
+
+    Methods
+    -------
+    __str__()
+        String representation of the Hint
+    """
+
+    def __init__(self, technique, row_col_len=9, placements=(), eliminations=(), cells=(), where=""):
+        """
+        Parameters
+        ----------
+        technique : str
+            One of TECHNIQUES
+        row_col_len : int, optional
+            The size of a row/column, default 9
+        placements : list, optional
+            (cell, digit) pairs placed by the step
+        eliminations : list, optional
+            (cell, digit) pairs of the candidates removed by the step
+        cells : tuple, optional
+            The cells forming the pattern
+        where : str, optional
+            The units the pattern lies in
+        """
+
+        self.technique = technique
+        self.row_col_len = row_col_len
+        self.placements = list(placements)
+        self.eliminations = list(eliminations)
+        self.cells = tuple(cells)
+        self.where = where
+
+    def __str__(self):
+        """String representation of the Hint
+
+        Returns:
+            A sentence such as "Hidden single in row 3: R3C7 is 5"
+        """
+
+        name = self.technique.capitalize()
+        where = f" in {self.where}" if self.where else ""
+        if self.placements:
+            placed = ", ".join(f"{cell_name(cell, self.row_col_len)} is {symbol_for(digit)}"
+                               for cell, digit in self.placements)
+            return f"{name}{where}: {placed}"
+
+        removed = {}
+        for cell, digit in self.eliminations:
+            removed.setdefault(cell, []).append(symbol_for(digit))
+        pattern = " ".join(cell_name(cell, self.row_col_len) for cell in self.cells)
+        eliminated = ", ".join(f"{'/'.join(digits)} from {cell_name(cell, self.row_col_len)}"
+                               for cell, digits in removed.items())
+        return f"{name} {pattern}{where}: removes {eliminated}"
+
+    def __repr__(self):
+        return f"Hint({str(self)!r})"
+
+class TechniqueGrader:
+    """
+    A class used to solve and grade puzzles with human techniques only
+
+    The grid is kept as one candidate bitmask per cell, and placing a digit
+    clears its bit from the precomputed peers of the cell. Every round the
+    easiest technique that makes progress is applied: all naked singles at
+    once, then all hidden singles at once, then the first locked candidates,
+    pair, triple, X-Wing or Swordfish found. The grade is the hardest
+    technique used, and every placement or elimination pattern is a step.
+
+    ...
+    Attributes
+    ----------
+    units : SudokuUnits
+        The precomputed unit tables for the board size
+    unit_names : tuple
+        The name of every unit, e.g. "row 3"
+    intersections : tuple
+        For every square and every row or column crossing it: the shared
+        cells, the rest of the square, the rest of the line and their names
+    finders : tuple
+        (technique, method, size) of every technique past the singles,
+        easiest first
+
+    Methods
+    -------
+    load(board)
+        Builds the candidate grid of a board
+
+    next_hints(values, candidates)
+        Finds the easiest technique that makes progress
+
+    next_hint(board)
+        Finds the next logical step on a board
+
+    apply(hint, values, candidates)
+        Applies a step to the grid
+
+    place(values, candidates, cell, digit)
+        Places a digit and removes it from the candidates of its peers
+
+    contradiction(values, candidates)
+        Checks whether the grid can no longer be solved
+
+    grade(board)
+        Solves a board with human techniques and grades it
+
+    naked_singles(values, candidates)
+        Finds every empty cell with one candidate left
+
+    hidden_singles(values, candidates)
+        Finds every digit with one place left in a unit
+
+    locked_candidates(values, candidates)
+        Finds a digit confined to where a square and a line cross
+
+    naked_subset(values, candidates, size)
+        Finds size cells of a unit holding only size candidates
+
+    hidden_subset(values, candidates, size)
+        Finds size digits confined to size cells of a unit
+
+    fish(values, candidates, size)
+        Finds a digit confined to size columns across size rows, or the
+        other way round
+    """
+
+    def __init__(self, square_size=3):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        """
+
+        units = self.units = get_units(square_size)
+        length = units.row_col_len
+        self.unit_names = tuple([f"row {index + 1}" for index in range(length)]
+                                + [f"column {index + 1}" for index in range(length)]
+                                + [f"square {index + 1}" for index in range(length)])
+
+        intersections = []
+        for square in range(length):
+            square_cells = units.units[2 * length + square]
+            for line in sorted({units.row_of[cell] for cell in square_cells}
+                               | {length + units.col_of[cell] for cell in square_cells}):
+                line_cells = units.units[line]
+                shared = tuple(cell for cell in square_cells if cell in line_cells)
+                intersections.append((shared,
+                                      tuple(cell for cell in square_cells if cell not in shared),
+                                      tuple(cell for cell in line_cells if cell not in shared),
+                                      f"{self.unit_names[2 * length + square]} and {self.unit_names[line]}"))
+        self.intersections = tuple(intersections)
+
+        self.finders = (("locked candidates", self.locked_candidates, 0),
+                        ("naked pair", self.naked_subset, 2),
+                        ("hidden pair", self.hidden_subset, 2),
+                        ("naked triple", self.naked_subset, 3),
+                        ("hidden triple", self.hidden_subset, 3),
+                        ("x-wing", self.fish, 2),
+                        ("swordfish", self.fish, 3))
+
+    def load(self, board):
+        """Builds the candidate grid of a board
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers, or a CompactBoard
+
+        Returns:
+            The digit of every cell (0 for empty) and the candidate bitmask of
+            every cell (0 when filled), or None if two givens conflict
+        """
+
+        units = self.units
+        length = units.row_col_len
+        values = units.flatten(board)
+        masks = [0] * (3 * length)
+        for cell, digit in enumerate(values):
+            if not digit:
+                continue
+            bit = 1 << (digit - 1)
+            slots = (units.row_of[cell], length + units.col_of[cell], 2 * length + units.square_of[cell])
+            for slot in slots:
+                if masks[slot] & bit:
+                    return None
+                masks[slot] |= bit
+
+        all_digits, row_of, col_of, square_of = units.all_digits, units.row_of, units.col_of, units.square_of
+        candidates = [0 if digit else all_digits & ~(masks[row_of[cell]] | masks[length + col_of[cell]]
+                                                      | masks[2 * length + square_of[cell]])
+                      for cell, digit in enumerate(values)]
+        return values, candidates
+
+    def next_hints(self, values, candidates):
+        """Finds the easiest technique that makes progress
+
+        Returns:
+            Every naked or every hidden single, or the first step of a harder
+            technique, as a list of Hints; empty if no technique applies
+        """
+
+        hints = self.naked_singles(values, candidates) or self.hidden_singles(values, candidates)
+        if hints:
+            return hints
+        for _, finder, size in self.finders:
+            hint = finder(values, candidates, size) if size else finder(values, candidates)
+            if hint is not None:
+                return [hint]
+        return []
+
+    def next_hint(self, board):
+        """Finds the next logical step on a board
+
+        Returns:
+            A Hint, or None if the board is solved, conflicting or needs a
+            guess
+        """
+
+        state = self.load(board)
+        if state is None or self.contradiction(*state):
+            return None
+        hints = self.next_hints(*state)
+        return hints[0] if hints else None
+
+    def apply(self, hint, values, candidates):
+        """Applies a step to the grid
+
+        Returns:
+            A boolean for whether or not the step still changed the grid
+        """
+
+        changed = False
+        for cell, digit in hint.placements:
+            if candidates[cell] >> (digit - 1) & 1:
+                self.place(values, candidates, cell, digit)
+                changed = True
+        for cell, digit in hint.eliminations:
+            bit = 1 << (digit - 1)
+            if candidates[cell] & bit:
+                candidates[cell] ^= bit
+                changed = True
+        return changed
+
+    def place(self, values, candidates, cell, digit):
+        """Places a digit and removes it from the candidates of its peers
+        """
+
+        values[cell] = digit
+        candidates[cell] = 0
+        keep = ~(1 << (digit - 1))
+        for peer in self.units.peers[cell]:
+            candidates[peer] &= keep
+
+    def contradiction(self, values, candidates):
+        """Checks whether the grid can no longer be solved
+
+        Returns:
+            A boolean for whether or not an empty cell has no candidate left or
+            a digit has no place left in a unit
+        """
+
+        for value, mask in zip(values, candidates):
+            if not value and not mask:
+                return True
+
+        all_digits = self.units.all_digits
+        for unit in self.units.units:
+            seen = 0
+            for cell in unit:
+                seen |= candidates[cell] | (1 << values[cell] >> 1)
+            if seen != all_digits:
+                return True
+        return False
+
+    def grade(self, board):
+        """Solves a board with human techniques and grades it
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers, or a CompactBoard
+
+        Returns:
+            A dictionary of the "status" ("solved", "stuck" when a guess is
+            needed, or "unsolvable"), the hardest "technique" needed (GUESS
+            when stuck, None if nothing was needed or the board is
+            unsolvable), the number of "steps" and the "counts" of every
+            technique used
+        """
+
+        result = {"status": UNSOLVABLE, "technique": None, "steps": 0, "counts": {}}
+        state = self.load(board)
+        if state is None:
+            return result
+
+        values, candidates = state
+        counts = result["counts"]
+        hardest = -1
+        empty = values.count(0)
+        while empty:
+            # A contradiction leaves a cell or digit that no technique fills,
+            # so the grid is only checked once progress stops
+            hints = self.next_hints(values, candidates)
+            if not hints:
+                if not self.contradiction(values, candidates):
+                    result.update(status=STUCK, technique=GUESS)
+                return result
+
+            technique = hints[0].technique
+            for hint in hints:
+                if self.apply(hint, values, candidates):
+                    counts[technique] = counts.get(technique, 0) + 1
+                    result["steps"] += 1
+                    empty -= len(hint.placements)
+            hardest = max(hardest, TECHNIQUES.index(technique))
+
+        if self.contradiction(values, candidates):
+            return result
+        result.update(status=SOLVED, technique=TECHNIQUES[hardest] if hardest >= 0 else None)
+        return result
+
+    def naked_singles(self, values, candidates):
+        """Finds every empty cell with one candidate left
+
+        Returns:
+            A list of Hints
+        """
+
+        length = self.units.row_col_len
+        return [Hint("naked single", length, [(cell, mask.bit_length())], cells=(cell,))
+                for cell, mask in enumerate(candidates) if mask and not mask & (mask - 1)]
+
+    def hidden_singles(self, values, candidates):
+        """Finds every digit with one place left in a unit
+
+        Returns:
+            A list of Hints
+        """
+
+        length = self.units.row_col_len
+        hints = []
+        for index, unit in enumerate(self.units.units):
+            once, more = 0, 0
+            for cell in unit:
+                more |= once & candidates[cell]
+                once |= candidates[cell]
+            hidden = once & ~more
+            if not hidden:
+                continue
+            for cell in unit:
+                if candidates[cell] & hidden:
+                    digit = (candidates[cell] & hidden).bit_length()
+                    hints.append(Hint("hidden single", length, [(cell, digit)], cells=(cell,),
+                                      where=self.unit_names[index]))
+        return hints
+
+    def locked_candidates(self, values, candidates):
+        """Finds a digit confined to where a square and a line cross
+
+        If a digit of a square can only go where it meets a line, the digit
+        is removed from the rest of the line, and the other way round.
+
+        Returns:
+            A Hint, or None if there is no such digit
+        """
+
+        for shared, square_rest, line_rest, where in self.intersections:
+            inside = 0
+            for cell in shared:
+                inside |= candidates[cell]
+            if not inside:
+                continue
+            in_square = in_line = 0
+            for cell in square_rest:
+                in_square |= candidates[cell]
+            for cell in line_rest:
+                in_line |= candidates[cell]
+
+            # Pointing: the square's digit must go on the line; claiming: the
+            # line's digit must go in the square
+            for locked, others in ((inside & ~in_square, line_rest), (inside & ~in_line, square_rest)):
+                if not locked:
+                    continue
+                eliminations = [(cell, digit) for cell in others if candidates[cell] & locked
+                                for digit in digits_of(candidates[cell] & locked)]
+                if eliminations:
+                    cells = tuple(cell for cell in shared if candidates[cell] & locked)
+                    return Hint("locked candidates", self.units.row_col_len, eliminations=eliminations,
+                                cells=cells, where=where)
+        return None
+
+    def naked_subset(self, values, candidates, size):
+        """Finds size cells of a unit holding only size candidates
+
+        Returns:
+            A Hint, or None if there is no such subset
+        """
+
+        technique = "naked pair" if size == 2 else "naked triple"
+        for index, unit in enumerate(self.units.units):
+            cells = [cell for cell in unit if 2 <= candidates[cell].bit_count() <= size]
+            if len(cells) < size:
+                continue
+            for subset in combinations(cells, size):
+                union = 0
+                for cell in subset:
+                    union |= candidates[cell]
+                if union.bit_count() != size:
+                    continue
+                eliminations = [(cell, digit) for cell in unit if cell not in subset and candidates[cell] & union
+                                for digit in digits_of(candidates[cell] & union)]
+                if eliminations:
+                    return Hint(technique, self.units.row_col_len, eliminations=eliminations, cells=subset,
+                                where=self.unit_names[index])
+        return None
+
+    def hidden_subset(self, values, candidates, size):
+        """Finds size digits confined to size cells of a unit
+
+        Returns:
+            A Hint, or None if there is no such subset
+        """
+
+        technique = "hidden pair" if size == 2 else "hidden triple"
+        length = self.units.row_col_len
+        for index, unit in enumerate(self.units.units):
+            # The positions in the unit of every digit, as a bitmask
+            places = [0] * length
+            for position, cell in enumerate(unit):
+                mask = candidates[cell]
+                while mask:
+                    bit = mask & -mask
+                    mask ^= bit
+                    places[bit.bit_length() - 1] |= 1 << position
+            digits = [digit for digit in range(length) if 2 <= places[digit].bit_count() <= size]
+            if len(digits) < size:
+                continue
+            for subset in combinations(digits, size):
+                union = 0
+                for digit in subset:
+                    union |= places[digit]
+                if union.bit_count() != size:
+                    continue
+                keep = sum(1 << digit for digit in subset)
+                cells = tuple(unit[position] for position in range(length) if union >> position & 1)
+                eliminations = [(cell, digit) for cell in cells for digit in digits_of(candidates[cell] & ~keep)]
+                if eliminations:
+                    return Hint(technique, length, eliminations=eliminations, cells=cells,
+                                where=self.unit_names[index])
+        return None
+
+    def fish(self, values, candidates, size):
+        """Finds a digit confined to size columns across size rows, or the
+        other way round
+
+        The digit then has to fill those columns within those rows, so it is
+        removed from the rest of the columns. Size 2 is an X-Wing and size 3
+        a Swordfish.
+
+        Returns:
+            A Hint, or None if there is no such pattern
+        """
+
+        technique = "x-wing" if size == 2 else "swordfish"
+        units = self.units
+        length = units.row_col_len
+        for bit in (1 << digit for digit in range(length)):
+            for base, cover in ((0, length), (length, 0)):
+                # The positions of the digit along every base line
+                places = []
+                for line in range(length):
+                    mask = 0
+                    for position, cell in enumerate(units.units[base + line]):
+                        if candidates[cell] & bit:
+                            mask |= 1 << position
+                    places.append(mask)
+                lines = [line for line in range(length) if 2 <= places[line].bit_count() <= size]
+                if len(lines) < size:
+                    continue
+                for subset in combinations(lines, size):
+                    union = 0
+                    for line in subset:
+                        union |= places[line]
+                    if union.bit_count() != size:
+                        continue
+                    base_cells = {cell for line in subset for cell in units.units[base + line]}
+                    eliminations = [(cell, bit.bit_length()) for position in range(length) if union >> position & 1
+                                    for cell in units.units[cover + position]
+                                    if cell not in base_cells and candidates[cell] & bit]
+                    if eliminations:
+                        cells = tuple(sorted(cell for cell in base_cells if candidates[cell] & bit))
+                        names = " and ".join(self.unit_names[base + line] for line in subset)
+                        return Hint(technique, length, eliminations=eliminations, cells=cells,
+                                    where=f"{names} for {symbol_for(bit.bit_length())}")
+        return None
+
+def get_grader(square_size=3):
+    """Returns this process's grader for a board size, creating it on first use
+
+    Returns:
+        A TechniqueGrader
+    """
+
+    if square_size not in _graders:
+        _graders[square_size] = TechniqueGrader(square_size)
+    return _graders[square_size]
+
+def grade_text(number, text):
+    """Parses and grades one puzzle line
+
+    Returns:
+        The line number, puzzle text and grade dictionary, or the ValueError
+        raised while parsing the puzzle
+    """
+
+    try:
+        board = parse_puzzle(text)
+    except ValueError as error:
+        return number, text, error
+    return number, text, get_grader(isqrt(len(board))).grade(board)
+
+def grade_chunk(chunk):
+    """Grades a chunk of puzzle lines inside a worker process
+
+    Parameters
+    ----------
+    chunk : list
+        Pairs of line number and puzzle text
+
+    Returns:
+        A list of grade_text results
+    """
+
+    return [grade_text(number, text) for number, text in chunk]
+
+def grade_records(path, start, stop):
+    """Grades a range of records of a binary corpus inside a worker process
+
+    Returns:
+        A list of the record index, puzzle text and grade dictionary of every
+        record
+    """
+
+    corpus = get_corpus(path)
+    grader = get_grader(corpus.square_size)
+    results = []
+    for index in range(start, stop):
+        board = corpus[index]
+        results.append((index, str(board), grader.grade(board)))
+    return results
+
+def grade_many(puzzles, workers=1, chunksize=256, ordered=True):
+    """Grades puzzle lines, optionally across a pool of worker processes
+
+    Parameters
+    ----------
+    puzzles : iterable
+        Pairs of line number and puzzle text
+    workers : int, optional
+        The number of worker processes, default 1 grades in this process and
+        0 uses one per CPU
+    chunksize : int, optional
+        The number of puzzles sent to a worker at once, default 256
+    ordered : bool, optional
+        Whether results keep the input order, default True
+
+    Yields:
+        The grade_text result of every puzzle
+    """
+
+    if workers == 1:
+        for number, text in puzzles:
+            yield grade_text(number, text)
+        return
+    tasks = ((grade_chunk, chunk) for chunk in chunked(puzzles, chunksize))
+    yield from run_tasks(tasks, workers or None, ordered)
+
+def grade_corpus(path, workers=1, chunksize=1024, ordered=True, start=0, stop=None):
+    """Grades a range of records of a binary corpus
+
+    Parameters
+    ----------
+    path : str
+        The corpus file
+    workers : int, optional
+        The number of worker processes, default 1 grades in this process and
+        0 uses one per CPU
+    chunksize : int, optional
+        The number of records a worker grades at once, default 1024
+    ordered : bool, optional
+        Whether results keep the record order, default True
+    start : int, optional
+        The index of the first record, default 0
+    stop : int, optional
+        The index after the last record, default the end of the corpus
+
+    Yields:
+        The grade_records result of every record
+    """
+
+    if stop is None:
+        stop = len(get_corpus(path))
+    ranges = ((first, min(first + chunksize, stop)) for first in range(start, stop, chunksize))
+
+    if workers == 1:
+        for first, last in ranges:
+            yield from grade_records(path, first, last)
+        return
+    yield from run_tasks(((grade_records, path, first, last) for first, last in ranges), workers or None, ordered)
@@ -0,0 +1,353 @@
+from time import monotonic, sleep
+from model.sudoku_stats import InstrumentedSolver
+
+# Search statuses
+RUNNING = "running"
+PAUSED = "paused"
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+class IterativeSolver(InstrumentedSolver):
+    """
+    A class used to solve boards by backtracking with an explicit search stack
+
+    Empty cells are filled in row-major order like SudokuCore.solve_board,
+    but the search keeps its own stack of untried digit bitmasks instead of
+    recursing. One call to step() makes one placement or one undo, so the
+    search can be stepped, paused and resumed, stopped at a deadline,
+    cancelled from another thread and serialized to a plain dictionary.
+
+    ...
+    Attributes
+    ----------
+    name : str
+        The name the engine is registered under
+    status : str
+        One of RUNNING, PAUSED, SOLVED, UNSOLVABLE or CANCELLED
+    listener : callable
+        Called as listener(row, col, value) on every placement and undo
+    steps_per_second : float
+        Paces run() to at most this many steps a second, None for full speed
+    cells : list
+        The current digit of every cell in row-major order
+    empties : list
+        The cells that were empty when the board was loaded
+    stack : list
+        The untried digit bitmask of every filled empty cell
+    descend : bool
+        Whether the next step opens a frame for the next empty cell
+
+    Methods
+    -------
+    solve(board)
+        Solves the board without modifying it
+
+    load(board)
+        Starts a new search on a board
+
+    restore(cells, empties, stack, descend, nodes, status)
+        Sets the search state and rebuilds the unit bitmasks from the cells
+
+    notify(event, cell, value)
+        Reports a placement or undo to the listener and tracer
+
+    toggle(cell, bit)
+        Adds or removes a digit bit in the masks of a cell's units
+
+    step()
+        Makes one placement or undo
+
+    run(max_steps=None, deadline=None)
+        Steps until the search ends, pauses or passes a deadline
+
+    run_steps(max_steps, deadline)
+        Steps until the search ends, pauses or passes a deadline
+
+    pace(due)
+        Sleeps until a step is due, in short naps so stops stay responsive
+
+    pause()
+        Asks a running search to stop after its current step
+
+    cancel()
+        Stops the search for good
+
+    solution()
+        Returns the solved board
+
+    to_state()
+        Serializes the search
+
+    from_state(state)
+        Restores a search serialized with to_state
+    """
+
+    name = "backtracking"
+
+    def __init__(self, square_size=3):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        """
+
+        super().__init__(square_size)
+        self.status = UNSOLVABLE
+        self.listener = None
+        self.steps_per_second = None
+        self.cells = []
+        self.empties = []
+        self.stack = []
+        self.descend = True
+        self.masks = []
+        self.stop_requested = None
+
+    def solve(self, board):
+        """Solves the board without modifying it
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution
+        """
+
+        self.load(board)
+        self.run()
+        return self.solution()
+
+    def load(self, board):
+        """Starts a new search on a board
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+        """
+
+        cells = self.units.flatten(board)
+        self.restore(cells, [cell for cell, num in enumerate(cells) if num == 0], [], True, 0, RUNNING)
+
+    def restore(self, cells, empties, stack, descend, nodes, status):
+        """Sets the search state and rebuilds the unit bitmasks from the cells
+        """
+
+        units = self.units
+        self.cells, self.empties, self.stack = cells, empties, stack
+        self.descend, self.status = descend, status
+        self.stats.reset()
+        self.stats.nodes = nodes
+        self.stop_requested = None
+
+        # Row, column and square masks share one list, offset by unit kind
+        size = units.row_col_len
+        self.masks = [0] * (3 * size)
+        for cell, num in enumerate(cells):
+            if num == 0:
+                continue
+            bit = 1 << (num - 1)
+            slots = (units.row_of[cell], size + units.col_of[cell], 2 * size + units.square_of[cell])
+            if any(self.masks[slot] & bit for slot in slots):
+                self.status = UNSOLVABLE
+                return
+            for slot in slots:
+                self.masks[slot] |= bit
+
+    def notify(self, event, cell, value):
+        """Reports a placement or undo to the listener and tracer
+        """
+
+        if self.listener is not None:
+            self.listener(self.units.row_of[cell], self.units.col_of[cell], value)
+        if self.tracer is not None:
+            self.tracer(event, cell, value, len(self.stack) - 1)
+
+    def toggle(self, cell, bit):
+        """Adds or removes a digit bit in the masks of a cell's units
+        """
+
+        units, masks = self.units, self.masks
+        size = units.row_col_len
+        masks[units.row_of[cell]] ^= bit
+        masks[size + units.col_of[cell]] ^= bit
+        masks[2 * size + units.square_of[cell]] ^= bit
+
+    def step(self):
+        """Makes one placement or undo
+
+        Returns:
+            A boolean for whether or not the search can continue
+        """
+
+        if self.status not in (RUNNING, PAUSED):
+            return False
+        self.status = RUNNING
+
+        units, masks, stack, stats = self.units, self.masks, self.stack, self.stats
+        size = units.row_col_len
+
+        # Opens a frame holding every digit allowed in the next empty cell
+        if self.descend:
+            if len(stack) == len(self.empties):
+                self.status = SOLVED
+                return False
+            cell = self.empties[len(stack)]
+            used = (masks[units.row_of[cell]] | masks[size + units.col_of[cell]]
+                    | masks[2 * size + units.square_of[cell]])
+            stack.append(units.all_digits & ~used)
+            stats.validations += 1
+            if len(stack) > stats.max_depth:
+                stats.max_depth = len(stack)
+            self.descend = False
+
+        # Takes back the digit currently tried in the top frame
+        cell = self.empties[len(stack) - 1]
+        if self.cells[cell]:
+            self.toggle(cell, 1 << (self.cells[cell] - 1))
+            self.cells[cell] = 0
+
+        remaining = stack[-1]
+        if not remaining:
+            self.notify("undo", cell, 0)
+            stack.pop()
+            stats.backtracks += 1
+            if not stack:
+                self.status = UNSOLVABLE
+                return False
+            return True
+
+        bit = remaining & -remaining
+        stack[-1] = remaining ^ bit
+        self.toggle(cell, bit)
+        self.cells[cell] = bit.bit_length()
+        stats.nodes += 1
+        self.descend = True
+        self.notify("place", cell, self.cells[cell])
+        return True
+
+    def run(self, max_steps=None, deadline=None):
+        """Steps until the search ends, pauses or passes a deadline
+
+        Parameters
+        ----------
+        max_steps : int, optional
+            The most steps to take before pausing, default unlimited
+        deadline : float, optional
+            A time.monotonic() value after which the search pauses
+
+        Returns:
+            The status of the search
+        """
+
+        with self.stats.phase("search"):
+            return self.run_steps(max_steps, deadline)
+
+    def run_steps(self, max_steps, deadline):
+        """Steps until the search ends, pauses or passes a deadline
+
+        Returns:
+            The status of the search
+        """
+
+        steps = 0
+        rate, base_time, base_steps = None, 0, 0
+        while self.step():
+            steps += 1
+
+            if self.steps_per_second:
+                # Measures the pace from the last speed change
+                if self.steps_per_second != rate:
+                    rate, base_time, base_steps = self.steps_per_second, monotonic(), steps
+                self.pace(base_time + (steps - base_steps) / rate)
+
+            if self.stop_requested is not None:
+                self.status = self.stop_requested
+                self.stop_requested = None
+                break
+            if max_steps is not None and steps >= max_steps:
+                self.status = PAUSED
+                break
+            # Reads the clock only every so often to keep steps cheap
+            if deadline is not None and (self.steps_per_second or steps % 256 == 0) and monotonic() >= deadline:
+                self.status = PAUSED
+                break
+        return self.status
+
+    def pace(self, due):
+        """Sleeps until a step is due, in short naps so stops stay responsive
+
+        Nothing is slept until the search is a few milliseconds ahead, so
+        fast speeds do not cost one sleep per step.
+
+        Parameters
+        ----------
+        due : float
+            The time.monotonic() value at which the next step is due
+        """
+
+        ahead = due - monotonic()
+        while ahead > 0.005 and self.stop_requested is None:
+            sleep(min(ahead, 0.05))
+            ahead = due - monotonic()
+
+    def pause(self):
+        """Asks a running search to stop after its current step
+        """
+
+        if self.status == RUNNING:
+            self.stop_requested = PAUSED
+
+    def cancel(self):
+        """Stops the search for good
+        """
+
+        if self.status in (RUNNING, PAUSED):
+            self.stop_requested = CANCELLED
+            self.status = CANCELLED
+
+    def solution(self):
+        """Returns the solved board
+
+        Returns:
+            A list of lists of integers, or None if the search has not solved
+            the board
+        """
+
+        if self.status != SOLVED:
+            return None
+        return self.units.unflatten(self.cells)
+
+    def to_state(self):
+        """Serializes the search
+
+        Returns:
+            A dictionary of plain lists and numbers, e.g. for json.dump
+        """
+
+        return {"square_size": self.units.square_size, "cells": list(self.cells),
+                "empties": list(self.empties), "stack": list(self.stack),
+                "descend": self.descend, "nodes": self.stats.nodes, "status": self.status}
+
+    @classmethod
+    def from_state(cls, state):
+        """Restores a search serialized with to_state
+
+        Parameters
+        ----------
+        state : dict
+            A dictionary returned by to_state
+
+        Returns:
+            An IterativeSolver ready to continue the search
+        """
+
+        solver = cls(state["square_size"])
+        solver.restore(list(state["cells"]), list(state["empties"]), list(state["stack"]),
+                       state["descend"], state["nodes"], state["status"])
+        return solver
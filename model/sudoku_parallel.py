@@ -0,0 +1,282 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Event
+from time import monotonic
+from model.sudoku_engines import get_engine
+from model.sudoku_iterative import CANCELLED, PAUSED, RUNNING, SOLVED, UNSOLVABLE
+from model.sudoku_propagation import PropagationSolver
+
+# Set in every worker process by init_worker, tells running searches to stop
+_stop_event = None
+
+# Tracer calls a worker makes between two checks of the stop event
+CHECK_INTERVAL = 256
+_calls = 0
+
+class SearchCancelled(Exception):
+    """Raised inside a worker's search once another worker has finished
+    """
+
+def init_worker(stop_event):
+    """Stores the shared stop event in a new worker process
+    """
+
+    global _stop_event
+    _stop_event = stop_event
+
+def check_stop(event, cell, value, depth):
+    """A tracer that aborts the search once the stop event is set
+
+    Raises:
+        SearchCancelled every CHECK_INTERVAL calls while the event is set
+    """
+
+    global _calls
+    _calls += 1
+    if not _calls % CHECK_INTERVAL and _stop_event.is_set():
+        raise SearchCancelled
+
+def solve_subproblem(engine, square_size, board):
+    """Solves one subproblem inside a worker process
+
+    Parameters
+    ----------
+    engine : str
+        The name of the solving engine
+    square_size : int
+        The width/length of 1 square
+    board : list
+        The subproblem as a collection of lists of integers
+
+    Returns:
+        The solved board (None if unsolvable or stopped) and the engine's
+        stats dictionary (None if stopped)
+    """
+
+    if _stop_event.is_set():
+        return None, None
+
+    solver = get_engine(engine, square_size)
+    solver.tracer = check_stop
+    try:
+        solution = solver.solve(board)
+    except SearchCancelled:
+        return None, None
+    return solution, solver.stats.as_dict()
+
+class ParallelSolver:
+    """
+    A class used to search a single puzzle on several processes
+
+    The top of the search tree is expanded with constraint propagation until
+    there are split_factor subproblems per worker. Every subproblem is a
+    board with one more guess filled in, which any engine can solve on its
+    own. The pool hands the next subproblem to whichever worker is idle,
+    and having several per worker balances the uneven subtrees. As soon as
+    one worker finds a solution a shared event is set, and the other
+    searches stop at their next check.
+
+    ...
+    Attributes
+    ----------
+    engine : str
+        The name of the engine solving the subproblems
+    square_size : int
+        The width/length of 1 square
+    workers : int
+        The number of worker processes
+    split_factor : int
+        The number of subproblems made per worker
+    splitter : PropagationSolver
+        Expands the top of the search tree
+    deadline : float
+        A time.monotonic() value after which the search gives up, None for
+        no limit
+    status : str
+        The status of the last solve, e.g. "solved" or "cancelled"
+    stop_event : Event
+        Set to stop every worker of the running solve
+    split_depth : int
+        The number of guesses filled into every subproblem of the last split
+    stats : SolveStats
+        The counters of the split plus those of every finished subproblem
+
+    Methods
+    -------
+    solve(board)
+        Solves the board across the worker processes
+
+    split(board, count)
+        Expands the search tree until there are count subproblems
+
+    merge_stats(stats)
+        Adds the stats of a finished subproblem
+
+    cancel()
+        Stops a running solve
+    """
+
+    def __init__(self, engine="propagation", square_size=3, workers=None, split_factor=4):
+        """
+        Parameters
+        ----------
+        engine : str, optional
+            The name of the engine solving the subproblems, default "propagation"
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        workers : int, optional
+            The number of worker processes, defaults to the number of CPUs
+        split_factor : int, optional
+            The number of subproblems made per worker, default 4
+        """
+
+        get_engine(engine, square_size)
+        self.engine = engine
+        self.square_size = square_size
+        self.workers = workers or os.cpu_count() or 1
+        self.split_factor = split_factor
+        self.splitter = PropagationSolver(square_size)
+        self.deadline = None
+        self.status = None
+        self.stop_event = None
+        self.split_depth = 0
+
+    @property
+    def name(self):
+        return self.engine
+
+    @property
+    def stats(self):
+        return self.splitter.stats
+
+    @property
+    def nodes(self):
+        return self.stats.nodes
+
+    def solve(self, board):
+        """Solves the board across the worker processes
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers, left unmodified
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution or the solve was stopped
+        """
+
+        stats = self.stats
+        stats.reset()
+        self.status = RUNNING
+        self.stop_event = Event()
+
+        with stats.phase("split"):
+            subproblems, solution = self.split(board, self.workers * self.split_factor)
+        if solution is not None or not subproblems:
+            self.status = SOLVED if solution is not None else UNSOLVABLE
+            return solution
+
+        with stats.phase("search"), ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                                        initargs=(self.stop_event,)) as pool:
+            pending = {pool.submit(solve_subproblem, self.engine, self.square_size, subproblem)
+                       for subproblem in subproblems}
+            try:
+                while pending and solution is None and self.status == RUNNING:
+                    timeout = None if self.deadline is None else max(0, self.deadline - monotonic())
+                    done, pending = wait(pending, timeout, FIRST_COMPLETED)
+                    if not done:
+                        self.status = PAUSED
+                    for future in done:
+                        result, subproblem_stats = future.result()
+                        if subproblem_stats is not None:
+                            self.merge_stats(subproblem_stats)
+                        if result is not None and solution is None:
+                            solution = result
+            finally:
+                self.stop_event.set()
+                for future in pending:
+                    future.cancel()
+
+        if solution is not None:
+            self.status = SOLVED
+        elif self.status == RUNNING:
+            self.status = UNSOLVABLE
+        return solution
+
+    def split(self, board, count):
+        """Expands the search tree until there are count subproblems
+
+        The shallowest open state is expanded first, so subproblems are of
+        similar size. Every branch is propagated, and dead ends are dropped.
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+        count : int
+            The number of subproblems wanted
+
+        Returns:
+            A list of subproblem boards and the solved board, where the list is
+            empty if the split already solved the board (or found it
+            unsolvable) and the solution is None otherwise
+        """
+
+        splitter, units = self.splitter, self.splitter.units
+        state = splitter.initial_state(board)
+        if state is None:
+            return [], None
+
+        frontier = deque([state + (0,)])
+        while frontier and len(frontier) < count:
+            values, candidates, depth = frontier.popleft()
+            cell = splitter.choose_cell(values, candidates)
+            if cell == -1:
+                return [], units.unflatten([bit.bit_length() for bit in values])
+
+            remaining = candidates[cell]
+            while remaining:
+                bit = remaining & -remaining
+                remaining ^= bit
+                splitter.stats.nodes += 1
+
+                trial_values, trial_candidates, queue = values[:], candidates[:], []
+                if (splitter.assign(trial_values, trial_candidates, cell, bit, queue)
+                        and splitter.propagate(trial_values, trial_candidates, queue, depth + 1)):
+                    frontier.append((trial_values, trial_candidates, depth + 1))
+                else:
+                    splitter.stats.backtracks += 1
+
+        # Every branch was a dead end
+        if not frontier:
+            return [], None
+
+        self.split_depth = splitter.stats.max_depth = max(depth for _, _, depth in frontier)
+        return [units.unflatten([bit.bit_length() for bit in values]) for values, _, _ in frontier], None
+
+    def merge_stats(self, stats):
+        """Adds the stats of a finished subproblem
+
+        Parameters
+        ----------
+        stats : dict
+            The SolveStats.as_dict() of a worker's engine
+        """
+
+        total = self.stats
+        total.nodes += stats["nodes"]
+        total.backtracks += stats["backtracks"]
+        total.propagations += stats["propagations"]
+        total.validations += stats["validations"]
+        total.max_depth = max(total.max_depth, self.split_depth + stats["max_depth"])
+
+    def cancel(self):
+        """Stops a running solve
+        """
+
+        if self.status == RUNNING:
+            self.status = CANCELLED
+        if self.stop_event is not None:
+            self.stop_event.set()
@@ -0,0 +1,286 @@
+import os
+from collections import deque
+from multiprocessing.util import Finalize
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from itertools import islice
+from math import isqrt
+from model.sudoku_cache import CachedSolver, SolutionCache
+from model.sudoku_corpus import PuzzleCorpus
+from model.sudoku_engines import get_engine
+from model.sudoku_format import parse_puzzle
+
+# Solving engines already created in this process, by name, square size
+# and cache size
+_solvers = {}
+
+# Binary corpora already mapped in this process, by path
+_corpora = {}
+
+def make_solver(engine, square_size=3, cache_size=0):
+    """Creates a solving engine, optionally behind a solution cache
+
+    Parameters
+    ----------
+    engine : str
+        The name of the solving engine
+    square_size : int, optional
+        The width/length of 1 square, default 3
+    cache_size : int, optional
+        The number of solutions to cache, default 0 disables the cache
+
+    Returns:
+        An engine object with a solve(board) method
+    """
+
+    solver = get_engine(engine, square_size)
+    if cache_size:
+        solver = CachedSolver(solver, SolutionCache(cache_size, square_size))
+    return solver
+
+def get_solver(engine, square_size=3, cache_size=0):
+    """Returns this process's solving engine, creating it on first use
+
+    Returns:
+        An engine object with a solve(board) method
+    """
+
+    key = (engine, square_size, cache_size)
+    if key not in _solvers:
+        _solvers[key] = solver = make_solver(engine, square_size, cache_size)
+
+        # Engines running their own processes, such as the portfolio, are
+        # closed on exit; worker processes skip atexit but run this hook
+        engine_solver = solver.solver if isinstance(solver, CachedSolver) else solver
+        if hasattr(engine_solver, "close"):
+            Finalize(engine_solver, engine_solver.close, exitpriority=10)
+    return _solvers[key]
+
+def solve_text(engine, number, text, cache_size=0, stats=False):
+    """Parses and solves one puzzle line
+
+    The board size is inferred from the length of the line, so one input can
+    mix puzzles of different sizes.
+
+    Parameters
+    ----------
+    engine : str
+        The name of the solving engine
+    number : int
+        The line number of the puzzle
+    text : str
+        The puzzle written on one line
+    cache_size : int, optional
+        The number of solutions cached per board size, default 0
+    stats : bool, optional
+        Whether to return the engine's SolveStats as a dictionary, default False
+
+    Returns:
+        The line number, puzzle text, solved board and stats dictionary (or
+        None), where the board is None if unsolvable or the ValueError raised
+        while parsing the puzzle
+    """
+
+    try:
+        board = parse_puzzle(text)
+    except ValueError as error:
+        return number, text, error, None
+    solver = get_solver(engine, isqrt(len(board)), cache_size)
+    solution = solver.solve(board)
+    return number, text, solution, solver.stats.as_dict() if stats else None
+
+def solve_chunk(engine, chunk, cache_size=0, stats=False):
+    """Solves a chunk of puzzle lines inside a worker process
+
+    Parameters
+    ----------
+    engine : str
+        The name of the solving engine
+    chunk : list
+        Pairs of line number and puzzle text
+    cache_size : int, optional
+        The number of solutions each worker caches, default 0
+    stats : bool, optional
+        Whether to return the stats of every solve, default False
+
+    Returns:
+        A list of solve_text results
+    """
+
+    return [solve_text(engine, number, text, cache_size, stats) for number, text in chunk]
+
+def get_corpus(path):
+    """Returns this process's mapping of a binary corpus, opening it on first use
+
+    Returns:
+        A PuzzleCorpus
+    """
+
+    if path not in _corpora:
+        _corpora[path] = PuzzleCorpus(path)
+    return _corpora[path]
+
+def solve_records(engine, path, start, stop, cache_size=0, stats=False):
+    """Solves a range of records of a binary corpus inside a worker process
+
+    Only the path and range travel to the worker, which reads the puzzles
+    straight from its own mapping of the file.
+
+    Parameters
+    ----------
+    engine : str
+        The name of the solving engine
+    path : str
+        The corpus file
+    start : int
+        The index of the first record
+    stop : int
+        The index after the last record
+    cache_size : int, optional
+        The number of solutions each worker caches, default 0
+    stats : bool, optional
+        Whether to return the stats of every solve, default False
+
+    Returns:
+        A list of the record index, puzzle text, solved board (None if
+        unsolvable) and stats dictionary (or None) of every record
+    """
+
+    corpus = get_corpus(path)
+    solver = get_solver(engine, corpus.square_size, cache_size)
+    results = []
+    for index in range(start, stop):
+        board = corpus[index]
+        solution = solver.solve(board)
+        results.append((index, str(board), solution, solver.stats.as_dict() if stats else None))
+    return results
+
+def chunked(iterable, size):
+    """Lazily groups an iterable into lists of a fixed size
+
+    Yields:
+        Lists of at most size items
+    """
+
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+def solve_many(puzzles, engine="propagation", workers=None, chunksize=64, ordered=True, cache_size=0,
+               stats=False):
+    """Solves puzzle lines across a pool of worker processes
+
+    Puzzles are sent to the workers in chunks to cut inter-process overhead,
+    and only a couple of chunks per worker are in flight at any time, so the
+    input is read lazily and memory stays flat however large it is.
+
+    Parameters
+    ----------
+    puzzles : iterable
+        Pairs of line number and puzzle text
+    engine : str, optional
+        The name of the solving engine, default "propagation"
+    workers : int, optional
+        The number of worker processes, defaults to the number of CPUs
+    chunksize : int, optional
+        The number of puzzles sent to a worker at once, default 64
+    ordered : bool, optional
+        Whether results keep the input order, default True; unordered results
+        are yielded as soon as any chunk finishes
+    cache_size : int, optional
+        The number of solutions each worker caches, default 0
+    stats : bool, optional
+        Whether to return the stats of every solve, default False
+
+    Yields:
+        The solve_text result of every puzzle
+    """
+
+    tasks = ((solve_chunk, engine, chunk, cache_size, stats) for chunk in chunked(puzzles, chunksize))
+    yield from run_tasks(tasks, workers, ordered)
+
+def solve_corpus(path, engine="propagation", workers=None, chunksize=256, ordered=True, cache_size=0,
+                 stats=False, start=0, stop=None):
+    """Solves a range of records of a binary corpus across worker processes
+
+    Parameters
+    ----------
+    path : str
+        The corpus file
+    engine : str, optional
+        The name of the solving engine, default "propagation"
+    workers : int, optional
+        The number of worker processes, defaults to the number of CPUs, 1
+        solves in this process
+    chunksize : int, optional
+        The number of records a worker solves at once, default 256
+    ordered : bool, optional
+        Whether results keep the record order, default True
+    cache_size : int, optional
+        The number of solutions each worker caches, default 0
+    stats : bool, optional
+        Whether to return the stats of every solve, default False
+    start : int, optional
+        The index of the first record, default 0
+    stop : int, optional
+        The index after the last record, default the end of the corpus
+
+    Yields:
+        The solve_records result of every record
+    """
+
+    if stop is None:
+        stop = len(get_corpus(path))
+    ranges = ((first, min(first + chunksize, stop)) for first in range(start, stop, chunksize))
+
+    if workers == 1:
+        for first, last in ranges:
+            yield from solve_records(engine, path, first, last, cache_size, stats)
+        return
+
+    tasks = ((solve_records, engine, path, first, last, cache_size, stats) for first, last in ranges)
+    yield from run_tasks(tasks, workers, ordered)
+
+def run_tasks(tasks, workers=None, ordered=True):
+    """Runs tasks returning lists of results on a pool of worker processes
+
+    Only a couple of tasks per worker are in flight at any time, so the
+    tasks are created lazily and memory stays flat however many there are.
+
+    Parameters
+    ----------
+    tasks : iterable
+        Tuples of a function and its arguments
+    workers : int, optional
+        The number of worker processes, defaults to the number of CPUs
+    ordered : bool, optional
+        Whether results keep the task order, default True; unordered results
+        are yielded as soon as any task finishes
+
+    Yields:
+        Every result of every task
+    """
+
+    workers = workers or os.cpu_count() or 1
+    backlog = 2 * workers
+
+    with ProcessPoolExecutor(workers) as pool:
+        if ordered:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(*task))
+                if len(pending) >= backlog:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            pending = set()
+            for task in tasks:
+                pending.add(pool.submit(*task))
+                if len(pending) >= backlog:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            for future in as_completed(pending):
+                yield from future.result()
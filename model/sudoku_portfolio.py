@@ -0,0 +1,354 @@
+import inspect
+import multiprocessing
+import queue
+import weakref
+from math import isqrt
+from time import monotonic
+from model.sudoku_engines import ENGINES, get_engine
+from model.sudoku_iterative import CANCELLED, FAILED, PAUSED, RUNNING, SOLVED, UNSOLVABLE
+from model.sudoku_stats import SolveStats
+
+# The strategies raced by default: row-major backtracking, propagation with
+# MRV, clause learning and randomized restarts with two seeds
+DEFAULT_STRATEGIES = ("bitmask", "propagation", "sat", "restart:1", "restart:2")
+
+# Tracer calls a strategy makes between two checks for a newer job
+CHECK_INTERVAL = 256
+
+# Seconds a solve waits for an answer before checking the strategies are alive
+POLL_INTERVAL = 0.5
+
+class JobCancelled(Exception):
+    """Raised inside a strategy's search once its job is no longer current
+    """
+
+def parse_strategy(strategy):
+    """Splits a strategy into its engine name and seed
+
+    Parameters
+    ----------
+    strategy : str
+        An engine name, optionally followed by ":seed" for engines with a seed
+
+    Returns:
+        The engine name and the seed as an int, None if not given
+    """
+
+    name, _, seed = strategy.partition(":")
+    if name not in ENGINES:
+        raise ValueError(f"Unknown solving engine: {name}")
+    if seed and "seed" not in inspect.signature(ENGINES[name]).parameters:
+        raise ValueError(f"The {name} engine takes no seed")
+    try:
+        return name, int(seed) if seed else None
+    except ValueError:
+        raise ValueError(f"Invalid seed in strategy {strategy!r}") from None
+
+def run_strategy(index, strategy, tasks, results, current):
+    """Runs one strategy in a worker process until told to stop
+
+    Every task is a job number and a board. The job is searched only while
+    it is the current one, and its result is sent back with its number.
+
+    Parameters
+    ----------
+    index : int
+        The position of the strategy in the portfolio
+    strategy : str
+        The engine name and optional seed
+    tasks : SimpleQueue
+        Jobs to search, None to stop
+    results : Queue
+        Receives (job, index, solution, stats dictionary, error) for every
+        job finished, where error describes the exception the search raised,
+        None if it did not
+    current : Value
+        The number of the job the portfolio is waiting for, 0 for none
+    """
+
+    name, seed = parse_strategy(strategy)
+    solvers = {}
+    calls = 0
+    job = 0
+
+    def check_job(event, cell, value, depth):
+        nonlocal calls
+        calls += 1
+        if not calls % CHECK_INTERVAL and current.value != job:
+            raise JobCancelled
+
+    while (task := tasks.get()) is not None:
+        job, board = task
+        if current.value != job:
+            continue
+
+        square_size = isqrt(len(board))
+        if square_size not in solvers:
+            solvers[square_size] = solver = get_engine(name, square_size)
+            solver.tracer = check_job
+            if seed is not None:
+                solver.seed = seed
+        solver = solvers[square_size]
+
+        try:
+            solution = solver.solve(board)
+        except JobCancelled:
+            continue
+        except Exception as error:
+            results.put((job, index, None, None, f"{type(error).__name__}: {error}"))
+            continue
+        results.put((job, index, solution, solver.stats.as_dict(), None))
+
+def stop_processes(tasks, processes):
+    """Stops the processes of a portfolio, terminating those that do not exit
+
+    Parameters
+    ----------
+    tasks : list
+        The task queue of every process
+    processes : list
+        The strategy processes
+    """
+
+    for strategy_tasks in tasks:
+        strategy_tasks.put(None)
+    for process in processes:
+        process.join(1)
+        if process.is_alive():
+            process.terminate()
+
+class PortfolioSolver:
+    """
+    A class used to race several solving strategies on separate processes
+
+    Engines are slow on different puzzles: row-major backtracking is fast
+    until a puzzle is built to defeat it, and propagation can be trapped by
+    one bad early guess that a randomized restart escapes. A portfolio
+    keeps one process per strategy running between solves. Every board is
+    sent to all of them, the first answer wins, and the others are told to
+    stop through a shared job number they check every CHECK_INTERVAL tracer
+    calls. All engines are complete, so an unsolvable answer is as final as
+    a solution, and a solve takes as long as the best strategy for the
+    puzzle plus the cost of passing the board around. A strategy that
+    raises or whose process dies drops out of the race, and the solve fails
+    once no strategy is left.
+
+    The processes are started by the first solve and stopped by close(),
+    with the portfolio used as a context manager, once the portfolio is
+    garbage collected or at interpreter exit.
+
+    ...
+    Attributes
+    ----------
+    strategies : tuple
+        Engine names, optionally followed by ":seed"
+    square_size : int
+        The width/length of 1 square, for the engine interface; boards of
+        any size are solved
+    deadline : float
+        A time.monotonic() value after which a solve gives up, None for no
+        limit
+    status : str
+        The status of the last solve, e.g. "solved" or "cancelled"
+    errors : dict
+        The error of every strategy that failed the last solve
+    winner : str
+        The strategy that answered the last solve, None if none did
+    wins : dict
+        The number of solves answered by every strategy
+    stats : SolveStats
+        The counters and timings of the winning strategy
+    tracer : callable
+        Unused: the searches run in other processes
+
+    Methods
+    -------
+    start()
+        Starts one process per strategy
+
+    solve(board)
+        Solves the board with whichever strategy answers first
+
+    check_strategies()
+        Fails the running solve once no strategy can answer it
+
+    cancel()
+        Stops a running solve
+
+    close()
+        Stops the strategy processes
+    """
+
+    name = "portfolio"
+
+    def __init__(self, square_size=3, strategies=DEFAULT_STRATEGIES):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        strategies : tuple, optional
+            Engine names, optionally followed by ":seed", default
+            DEFAULT_STRATEGIES
+        """
+
+        if not strategies:
+            raise ValueError("A portfolio needs at least one strategy")
+        for strategy in strategies:
+            parse_strategy(strategy)
+        self.strategies = tuple(strategies)
+        self.square_size = square_size
+        self.deadline = None
+        self.status = None
+        self.errors = {}
+        self.winner = None
+        self.wins = dict.fromkeys(self.strategies, 0)
+        self.stats = SolveStats()
+        self.tracer = None
+
+        self.processes = []
+        self.tasks = []
+        self.results = None
+        self.current = None
+        self.job = 0
+        self.finalizer = None
+
+    @property
+    def nodes(self):
+        return self.stats.nodes
+
+    def start(self):
+        """Starts one process per strategy
+        """
+
+        if self.processes:
+            return
+        self.results = multiprocessing.Queue()
+        self.current = multiprocessing.Value("q", 0, lock=False)
+        for index, strategy in enumerate(self.strategies):
+            tasks = multiprocessing.SimpleQueue()
+            process = multiprocessing.Process(target=run_strategy, daemon=True,
+                                              args=(index, strategy, tasks, self.results, self.current))
+            process.start()
+            self.tasks.append(tasks)
+            self.processes.append(process)
+
+        # Holds the lists, not the portfolio, so it can still be collected
+        self.finalizer = weakref.finalize(self, stop_processes, self.tasks, self.processes)
+
+    def solve(self, board):
+        """Solves the board with whichever strategy answers first
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers, left unmodified
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution or the solve was stopped
+
+        Raises:
+            RuntimeError if every strategy raised or its process died
+        """
+
+        self.start()
+        self.stats.reset()
+        self.status = RUNNING
+        self.errors = {}
+        self.winner = None
+
+        self.job += 1
+        job = self.job
+        self.current.value = job
+        for tasks in self.tasks:
+            tasks.put((job, board))
+
+        try:
+            while self.status == RUNNING:
+                timeout = POLL_INTERVAL
+                if self.deadline is not None:
+                    timeout = min(timeout, max(0, self.deadline - monotonic()))
+                try:
+                    answer = self.results.get(timeout=timeout)
+                except queue.Empty:
+                    if self.deadline is not None and monotonic() >= self.deadline:
+                        self.status = PAUSED
+                    else:
+                        self.check_strategies()
+                    continue
+                if answer is None or answer[0] != job:
+                    continue
+
+                _, index, solution, stats, error = answer
+                if error is not None:
+                    self.errors[self.strategies[index]] = error
+                    self.check_strategies()
+                    continue
+
+                self.winner = self.strategies[index]
+                self.wins[self.winner] += 1
+                self.load_stats(stats)
+                self.status = SOLVED if solution is not None else UNSOLVABLE
+                return solution
+        finally:
+            self.current.value = 0
+        return None
+
+    def check_strategies(self):
+        """Fails the running solve once no strategy can answer it
+
+        Raises:
+            RuntimeError if every strategy raised or its process died
+        """
+
+        for strategy, process in zip(self.strategies, self.processes):
+            if strategy not in self.errors and not process.is_alive():
+                self.errors[strategy] = f"process exited with code {process.exitcode}"
+        if len(self.errors) < len(self.strategies):
+            return
+
+        self.status = FAILED
+        errors = "; ".join(f"{strategy}: {error}" for strategy, error in self.errors.items())
+        raise RuntimeError(f"Every strategy failed ({errors})")
+
+    def load_stats(self, stats):
+        """Copies the stats of the winning strategy
+
+        Parameters
+        ----------
+        stats : dict
+            The SolveStats.as_dict() of the winning engine
+        """
+
+        total = self.stats
+        total.nodes = stats["nodes"]
+        total.backtracks = stats["backtracks"]
+        total.propagations = stats["propagations"]
+        total.validations = stats["validations"]
+        total.max_depth = stats["max_depth"]
+        total.timings = {name: ms / 1000 for name, ms in stats["timings_ms"].items()}
+
+    def cancel(self):
+        """Stops a running solve
+        """
+
+        if self.status == RUNNING:
+            self.status = CANCELLED
+            self.results.put(None)
+
+    def close(self):
+        """Stops the strategy processes
+        """
+
+        if self.current is not None:
+            self.current.value = 0
+        if self.finalizer is not None:
+            self.finalizer()
+        self.processes, self.tasks = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,337 @@
+from model.sudoku_stats import InstrumentedSolver
+
+class PropagationSolver(InstrumentedSolver):
+    """
+    A class used to solve boards with constraint propagation and MRV search
+
+    Every cell keeps a bitmask of its remaining candidates. Forced cells are
+    filled before any guess is made: naked singles (a cell with one candidate
+    left) and hidden singles (a digit with one place left in a unit). When
+    propagation stalls the search branches on the empty cell with the fewest
+    candidates, so most puzzles are solved without guessing at all.
+
+    ...
+    Attributes
+    ----------
+    name : str
+        The name the engine is registered under
+
+    Methods
+    -------
+    solve(board)
+        Solves the board without modifying it
+
+    count_solutions(board, limit=2)
+        Counts the solutions of the board, stopping once limit are found
+
+    initial_state(board)
+        Builds the propagated values and candidates for a board
+
+    assign(values, candidates, cell, bit, queue)
+        Places a digit and removes it from the candidates of its peers
+
+    propagate(values, candidates, queue, depth=0)
+        Fills naked and hidden singles until nothing else is forced
+
+    choose_cell(values, candidates)
+        Finds the empty cell with the fewest candidates
+
+    search(values, candidates, depth=0)
+        Branches on the most constrained cell until the board is solved
+
+    count(values, candidates, limit, depth=0)
+        Branches on every candidate of the most constrained cell, counting
+        solutions up to limit
+    """
+
+    name = "propagation"
+
+    def solve(self, board):
+        """Solves the board without modifying it
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution
+        """
+
+        stats = self.stats
+        stats.reset()
+
+        with stats.phase("setup"):
+            state = self.initial_state(board)
+        if state is None:
+            return None
+
+        with stats.phase("search"):
+            values = self.search(*state)
+        if values is None:
+            return None
+        return self.units.unflatten([bit.bit_length() for bit in values])
+
+    def count_solutions(self, board, limit=2):
+        """Counts the solutions of the board, stopping once limit are found
+
+        A limit of 2 is enough to tell a unique puzzle from one with several
+        solutions, and keeps the check bounded however open the board is.
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers, left unmodified
+        limit : int, optional
+            The number of solutions to stop at, default 2
+
+        Returns:
+            The number of solutions found, at most limit
+        """
+
+        stats = self.stats
+        stats.reset()
+
+        with stats.phase("setup"):
+            state = self.initial_state(board)
+        if state is None:
+            return 0
+
+        with stats.phase("search"):
+            return self.count(*state, limit)
+
+    def initial_state(self, board):
+        """Builds the propagated values and candidates for a board
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+
+        Returns:
+            The values and candidates lists (digit bitmasks, 0 for an empty
+            value), or None if the givens contradict each other
+        """
+
+        units = self.units
+        values = [0] * units.cell_count
+        candidates = [units.all_digits] * units.cell_count
+        queue = []
+
+        for cell, num in enumerate(units.flatten(board)):
+            if num == 0:
+                continue
+            bit = 1 << (num - 1)
+            if not candidates[cell] & bit or not self.assign(values, candidates, cell, bit, queue):
+                return None
+
+        if not self.propagate(values, candidates, queue):
+            return None
+        return values, candidates
+
+    def assign(self, values, candidates, cell, bit, queue):
+        """Places a digit and removes it from the candidates of its peers
+
+        Parameters
+        ----------
+        values : list
+            The placed digit bitmask of every cell
+        candidates : list
+            The candidate bitmask of every cell
+        cell : int
+            The cell to place the digit in
+        bit : int
+            The bitmask of the digit
+        queue : list
+            Collects the peers left with a single candidate
+
+        Returns:
+            A boolean for whether or not the placement left the board consistent
+        """
+
+        values[cell] = bit
+        candidates[cell] = bit
+        self.stats.validations += 1
+
+        for peer in self.units.peers[cell]:
+            remaining = candidates[peer]
+            if remaining & bit:
+                if values[peer]:
+                    return False
+                remaining ^= bit
+                if not remaining:
+                    return False
+                candidates[peer] = remaining
+                if not remaining & (remaining - 1):
+                    queue.append(peer)
+        return True
+
+    def propagate(self, values, candidates, queue, depth=0):
+        """Fills naked and hidden singles until nothing else is forced
+
+        Parameters
+        ----------
+        values : list
+            The placed digit bitmask of every cell
+        candidates : list
+            The candidate bitmask of every cell
+        queue : list
+            Cells known to have a single candidate left
+        depth : int, optional
+            The number of guesses leading to this state, default 0
+
+        Returns:
+            A boolean for whether or not the board is still consistent
+        """
+
+        all_digits, stats, tracer = self.units.all_digits, self.stats, self.tracer
+
+        while True:
+            # Naked singles
+            while queue:
+                cell = queue.pop()
+                if values[cell]:
+                    continue
+                stats.propagations += 1
+                if tracer is not None:
+                    tracer("force", cell, candidates[cell].bit_length(), depth)
+                if not self.assign(values, candidates, cell, candidates[cell], queue):
+                    return False
+
+            # Hidden singles, found by tracking digits seen once and more than once
+            forced = False
+            for unit in self.units.units:
+                stats.validations += 1
+                once, more = 0, 0
+                for cell in unit:
+                    more |= once & candidates[cell]
+                    once |= candidates[cell]
+                if once != all_digits:
+                    return False
+
+                hidden = once & ~more
+                if not hidden:
+                    continue
+                for cell in unit:
+                    if values[cell] or not candidates[cell] & hidden:
+                        continue
+                    bit = candidates[cell] & hidden
+                    if bit & (bit - 1):
+                        return False
+                    candidates[cell] = bit
+                    queue.append(cell)
+                    forced = True
+
+            if not forced:
+                return True
+
+    def choose_cell(self, values, candidates):
+        """Finds the empty cell with the fewest candidates
+
+        Returns:
+            The index of the cell, or -1 if every cell is filled
+        """
+
+        best, best_count = -1, self.units.row_col_len + 1
+        for cell, value in enumerate(values):
+            if value:
+                continue
+            count = candidates[cell].bit_count()
+            if count < best_count:
+                best, best_count = cell, count
+                if count == 2:
+                    break
+        return best
+
+    def search(self, values, candidates, depth=0):
+        """Branches on the most constrained cell until the board is solved
+
+        Parameters
+        ----------
+        values : list
+            The placed digit bitmask of every cell
+        candidates : list
+            The candidate bitmask of every cell
+        depth : int, optional
+            The number of guesses leading to this state, default 0
+
+        Returns:
+            The solved values list, or None if there is no solution
+        """
+
+        stats, tracer = self.stats, self.tracer
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+
+        cell = self.choose_cell(values, candidates)
+        if cell == -1:
+            return values
+
+        remaining = candidates[cell]
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            stats.nodes += 1
+            if tracer is not None:
+                tracer("place", cell, bit.bit_length(), depth)
+
+            trial_values, trial_candidates, queue = values[:], candidates[:], []
+            if (self.assign(trial_values, trial_candidates, cell, bit, queue)
+                    and self.propagate(trial_values, trial_candidates, queue, depth + 1)):
+                solved = self.search(trial_values, trial_candidates, depth + 1)
+                if solved is not None:
+                    return solved
+
+            stats.backtracks += 1
+            if tracer is not None:
+                tracer("undo", cell, 0, depth)
+        return None
+
+    def count(self, values, candidates, limit, depth=0):
+        """Branches on every candidate of the most constrained cell, counting
+        solutions up to limit
+
+        Parameters
+        ----------
+        values : list
+            The placed digit bitmask of every cell
+        candidates : list
+            The candidate bitmask of every cell
+        limit : int
+            The number of solutions to stop at
+        depth : int, optional
+            The number of guesses leading to this state, default 0
+
+        Returns:
+            The number of solutions found below this state, at most limit
+        """
+
+        stats, tracer = self.stats, self.tracer
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+
+        cell = self.choose_cell(values, candidates)
+        if cell == -1:
+            return 1
+
+        found = 0
+        remaining = candidates[cell]
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            stats.nodes += 1
+            if tracer is not None:
+                tracer("place", cell, bit.bit_length(), depth)
+
+            trial_values, trial_candidates, queue = values[:], candidates[:], []
+            if (self.assign(trial_values, trial_candidates, cell, bit, queue)
+                    and self.propagate(trial_values, trial_candidates, queue, depth + 1)):
+                found += self.count(trial_values, trial_candidates, limit - found, depth + 1)
+                if found >= limit:
+                    return found
+
+            stats.backtracks += 1
+            if tracer is not None:
+                tracer("undo", cell, 0, depth)
+        return found
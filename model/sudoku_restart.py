@@ -0,0 +1,180 @@
+import random
+from model.sudoku_propagation import PropagationSolver
+from model.sudoku_sat import luby
+
+# Backtracks allowed before the first restart; later runs follow the Luby
+# sequence
+RESTART_BASE = 32
+
+class RestartSearch(Exception):
+    """Raised inside the search once a run has used up its backtracks
+    """
+
+class RestartSolver(PropagationSolver):
+    """
+    A class used to solve boards with randomized propagation search and restarts
+
+    The search propagates like PropagationSolver but breaks ties at random:
+    the cell is drawn from those with the fewest candidates and its digits
+    are tried in a random order. A run that backtracks more than its budget
+    is abandoned and the search starts again from the givens with a new
+    draw, so one unlucky early guess cannot trap it in a huge subtree. The
+    budgets follow the Luby sequence, which keeps the search complete.
+
+    Runs are repeatable: the random generator is seeded from seed at the
+    start of every solve, and engines with different seeds search
+    differently, which is what makes several of them worth racing.
+
+    ...
+    Attributes
+    ----------
+    seed : int
+        Seeds the random choices of every solve, None to draw a fresh seed
+    random : Random
+        The random generator of the running solve
+    limit : int
+        The backtrack count at which the running search restarts
+    restarts : int
+        The number of restarts during the last solve
+
+    Methods
+    -------
+    solve(board)
+        Solves the board without modifying it
+
+    choose_cell(values, candidates)
+        Draws one of the empty cells with the fewest candidates
+
+    search(values, candidates, depth=0)
+        Branches on a drawn cell until the board is solved or the run's
+        backtracks are used up
+    """
+
+    name = "restart"
+
+    def __init__(self, square_size=3, seed=0):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        seed : int, optional
+            Seeds the random choices of every solve, default 0
+        """
+
+        super().__init__(square_size)
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.limit = None
+        self.restarts = 0
+
+    def solve(self, board):
+        """Solves the board without modifying it
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution
+        """
+
+        stats = self.stats
+        stats.reset()
+        self.random = random.Random(self.seed)
+        self.restarts = 0
+
+        with stats.phase("setup"):
+            state = self.initial_state(board)
+        if state is None:
+            return None
+
+        with stats.phase("search"):
+            while True:
+                self.limit = stats.backtracks + RESTART_BASE * luby(self.restarts)
+                try:
+                    values = self.search(*state)
+                    break
+                except RestartSearch:
+                    self.restarts += 1
+        if values is None:
+            return None
+        return self.units.unflatten([bit.bit_length() for bit in values])
+
+    def choose_cell(self, values, candidates):
+        """Draws one of the empty cells with the fewest candidates
+
+        Returns:
+            The index of the cell, or -1 if every cell is filled
+        """
+
+        best, best_count = [], self.units.row_col_len + 1
+        for cell, value in enumerate(values):
+            if value:
+                continue
+            count = candidates[cell].bit_count()
+            if count < best_count:
+                best, best_count = [cell], count
+            elif count == best_count:
+                best.append(cell)
+        return self.random.choice(best) if best else -1
+
+    def search(self, values, candidates, depth=0):
+        """Branches on a drawn cell until the board is solved or the run's
+        backtracks are used up
+
+        Every guess on the path is taken back before a restart, so the
+        counters and the tracer see the same undos as for a dead end.
+
+        Parameters
+        ----------
+        values : list
+            The placed digit bitmask of every cell
+        candidates : list
+            The candidate bitmask of every cell
+        depth : int, optional
+            The number of guesses leading to this state, default 0
+
+        Returns:
+            The solved values list, or None if there is no solution
+
+        Raises:
+            RestartSearch once the run has backtracked limit times
+        """
+
+        stats, tracer = self.stats, self.tracer
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+
+        cell = self.choose_cell(values, candidates)
+        if cell == -1:
+            return values
+
+        bits = [1 << digit for digit in range(self.units.row_col_len) if candidates[cell] >> digit & 1]
+        self.random.shuffle(bits)
+        for bit in bits:
+            stats.nodes += 1
+            if tracer is not None:
+                tracer("place", cell, bit.bit_length(), depth)
+
+            trial_values, trial_candidates, queue = values[:], candidates[:], []
+            if (self.assign(trial_values, trial_candidates, cell, bit, queue)
+                    and self.propagate(trial_values, trial_candidates, queue, depth + 1)):
+                try:
+                    solved = self.search(trial_values, trial_candidates, depth + 1)
+                except RestartSearch:
+                    stats.backtracks += 1
+                    if tracer is not None:
+                        tracer("undo", cell, 0, depth)
+                    raise
+                if solved is not None:
+                    return solved
+
+            stats.backtracks += 1
+            if tracer is not None:
+                tracer("undo", cell, 0, depth)
+            if stats.backtracks >= self.limit:
+                raise RestartSearch
+        return None
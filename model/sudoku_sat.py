@@ -0,0 +1,479 @@
+import heapq
+from model.sudoku_stats import InstrumentedSolver
+
+# Conflicts before the first restart; later restarts follow the Luby sequence
+RESTART_BASE = 64
+
+# Variable activity decay per conflict, and the point at which activities
+# are scaled back down to stay within floating point range
+ACTIVITY_DECAY = 0.95
+ACTIVITY_LIMIT = 1e100
+
+def luby(index):
+    """Returns an element of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ...
+
+    Parameters
+    ----------
+    index : int
+        The position in the sequence, from 0
+
+    Returns:
+        A power of two
+    """
+
+    size, power = 1, 0
+    while size < index + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        power -= 1
+        index %= size
+    return 1 << power
+
+class SatSolver(InstrumentedSolver):
+    """
+    A class used to solve boards as a SAT problem with clause learning
+
+    The board is encoded in CNF with one variable per (cell, digit), numbered
+    cell * size + digit as in DIMACS. The givens are applied before encoding,
+    so only the candidates left in empty cells get clauses: every cell holds
+    at least and at most one digit, and every digit missing from a unit goes
+    in at least and at most one of its cells.
+
+    The search is conflict-driven clause learning. Unit propagation watches
+    two literals of every long clause and keeps binary clauses as implication
+    lists. Every conflict is analysed back to its first unique implication
+    point and learned as a new clause, and the search jumps back to the
+    level where that clause forces a digit instead of undoing one guess at a
+    time. Decisions take the most active variable, bumped for every conflict
+    it takes part in, and the search restarts on the Luby sequence keeping
+    everything it has learned.
+
+    Guesses are reported to the tracer as "place", forced digits as "force"
+    and every guess taken back by a backjump or restart as "undo".
+
+    ...
+    Attributes
+    ----------
+    name : str
+        The name the engine is registered under
+    learned : int
+        The number of clauses learned during the last solve
+    restarts : int
+        The number of restarts during the last solve
+
+    Methods
+    -------
+    solve(board)
+        Solves the board without modifying it
+
+    encode(board)
+        Encodes the empty cells of a board as CNF clauses
+
+    to_dimacs(board)
+        Writes the whole board as a DIMACS CNF problem
+
+    decode(true_vars)
+        Builds the board described by a set of true variables
+
+    search(clauses, variable_count)
+        Runs clause learning search until the clauses are satisfied
+    """
+
+    name = "sat"
+
+    def __init__(self, square_size=3):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        """
+
+        super().__init__(square_size)
+        self.learned = 0
+        self.restarts = 0
+
+    def variable(self, cell, digit):
+        """Returns the DIMACS variable of a digit in a cell
+        """
+
+        return cell * self.units.row_col_len + digit
+
+    def solve(self, board):
+        """Solves the board without modifying it
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+
+        Returns:
+            The solved board as a list of lists of integers, or None if the
+            board has no solution
+        """
+
+        stats = self.stats
+        stats.reset()
+        self.learned = self.restarts = 0
+
+        with stats.phase("setup"):
+            cells = self.units.flatten(board)
+            clauses = self.encode(cells)
+        if clauses is None:
+            return None
+
+        with stats.phase("search"):
+            true_vars = self.search(clauses, self.units.cell_count * self.units.row_col_len + 1)
+        if true_vars is None:
+            return None
+
+        solution = self.decode(true_vars)
+        for cell, num in enumerate(cells):
+            if num:
+                solution[cell] = num
+        return self.units.unflatten(solution)
+
+    def encode(self, board):
+        """Encodes the empty cells of a board as CNF clauses
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers, or a flat list of cells
+
+        Returns:
+            A list of clauses, each a list of signed DIMACS variables, or None
+            if the givens contradict each other
+        """
+
+        units = self.units
+        size = units.row_col_len
+        cells = board if len(board) == units.cell_count else units.flatten(board)
+
+        candidates = [units.all_digits] * units.cell_count
+        for cell, num in enumerate(cells):
+            if num:
+                bit = 1 << (num - 1)
+                if not candidates[cell] & bit:
+                    return None
+                candidates[cell] = 0
+                for peer in units.peers[cell]:
+                    if cells[peer] == num:
+                        return None
+                    candidates[peer] &= ~bit
+
+        clauses = []
+        for cell, remaining in enumerate(candidates):
+            if cells[cell]:
+                continue
+            if not remaining:
+                return None
+            options = [self.variable(cell, digit) for digit in range(1, size + 1) if remaining >> (digit - 1) & 1]
+            clauses.append(options)
+            clauses.extend([-first, -second] for index, first in enumerate(options) for second in options[index + 1:])
+
+        for unit in units.units:
+            placed = 0
+            for cell in unit:
+                if cells[cell]:
+                    placed |= 1 << (cells[cell] - 1)
+            for digit in range(1, size + 1):
+                if placed >> (digit - 1) & 1:
+                    continue
+                options = [self.variable(cell, digit) for cell in unit if candidates[cell] >> (digit - 1) & 1]
+                if not options:
+                    return None
+                clauses.append(options)
+                clauses.extend([-first, -second] for index, first in enumerate(options)
+                               for second in options[index + 1:])
+        return clauses
+
+    def to_dimacs(self, board):
+        """Writes the whole board as a DIMACS CNF problem
+
+        The givens are added as unit clauses, so a model found by any SAT
+        solver can be read back with decode. Contradicting givens are written
+        as an unsatisfiable problem.
+
+        Parameters
+        ----------
+        board : list
+            A collection of lists of integers
+
+        Returns:
+            The problem as a string
+        """
+
+        units = self.units
+        cells = units.flatten(board)
+        variable_count = units.cell_count * units.row_col_len
+        clauses = self.encode(cells)
+        if clauses is None:
+            clauses = [[1], [-1]]
+        else:
+            clauses += [[self.variable(cell, num)] for cell, num in enumerate(cells) if num]
+
+        lines = [f"c {units.row_col_len}x{units.row_col_len} sudoku, variable = cell * {units.row_col_len} + digit",
+                 f"p cnf {variable_count} {len(clauses)}"]
+        lines.extend(" ".join(map(str, clause)) + " 0" for clause in clauses)
+        return "\n".join(lines) + "\n"
+
+    def decode(self, true_vars):
+        """Builds the board described by a set of true variables
+
+        Parameters
+        ----------
+        true_vars : iterable
+            The positive DIMACS variables of a model, others are ignored
+
+        Returns:
+            A flat list of one value per cell, 0 where no digit is true
+        """
+
+        size = self.units.row_col_len
+        cells = [0] * self.units.cell_count
+        for var in true_vars:
+            if 0 < var <= len(cells) * size:
+                cell, digit = divmod(var - 1, size)
+                cells[cell] = digit + 1
+        return cells
+
+    def search(self, clauses, variable_count):
+        """Runs clause learning search until the clauses are satisfied
+
+        Literals are stored as 2 * variable for true and 2 * variable + 1 for
+        false, so the negation of a literal is literal ^ 1 and its value can
+        be looked up in one flat list.
+
+        Parameters
+        ----------
+        clauses : list
+            Lists of signed DIMACS variables, as returned by encode
+        variable_count : int
+            One more than the largest variable
+
+        Returns:
+            A list of the true variables, or None if the clauses cannot be
+            satisfied
+        """
+
+        stats, tracer = self.stats, self.tracer
+        size = self.units.row_col_len
+
+        value = [0] * (2 * variable_count)   # 1 true, -1 false, 0 unassigned
+        level = [0] * variable_count
+        reason = [None] * variable_count
+        activity = [0.0] * variable_count
+        seen = [False] * variable_count
+        watches = [[] for _ in range(2 * variable_count)]
+        binary = [[] for _ in range(2 * variable_count)]
+        trail, trail_lim, learnts = [], [], []
+        units_found = []
+
+        # Variables of cells with fewer candidates start slightly more active
+        variables = set()
+        for clause in clauses:
+            lits = [2 * var if var > 0 else -2 * var + 1 for var in clause]
+            variables.update(lit >> 1 for lit in lits)
+            if len(lits) == 1:
+                units_found.append(lits[0])
+            elif len(lits) == 2:
+                binary[lits[0]].append(lits[1])
+                binary[lits[1]].append(lits[0])
+            else:
+                watches[lits[0]].append(lits)
+                watches[lits[1]].append(lits)
+            if clause[0] > 0 and len(clause) > 1 and (clause[0] - 1) // size == (clause[-1] - 1) // size:
+                for var in clause:
+                    activity[var] = max(activity[var], 1e-3 / len(clause))
+        heap = [(-activity[var], var) for var in variables]
+        heapq.heapify(heap)
+
+        def enqueue(lit, why):
+            var = lit >> 1
+            value[lit], value[lit ^ 1] = 1, -1
+            level[var] = len(trail_lim)
+            reason[var] = why
+            trail.append(lit)
+            if why is not None:
+                stats.propagations += 1
+                if tracer is not None and not lit & 1:
+                    cell, digit = divmod(var - 1, size)
+                    tracer("force", cell, digit + 1, len(trail_lim))
+
+        def backjump(target):
+            while len(trail_lim) > target:
+                start = trail_lim.pop()
+                stats.backtracks += 1
+                if tracer is not None:
+                    tracer("undo", ((trail[start] >> 1) - 1) // size, 0, len(trail_lim))
+                for lit in trail[start:]:
+                    var = lit >> 1
+                    value[lit] = value[lit ^ 1] = 0
+                    reason[var] = None
+                    heapq.heappush(heap, (-activity[var], var))
+                del trail[start:]
+
+        def propagate(head):
+            while head < len(trail):
+                false_lit = trail[head] ^ 1
+                head += 1
+                for other in binary[false_lit]:
+                    if value[other] == 1:
+                        continue
+                    if value[other] == -1:
+                        return [other, false_lit], head
+                    enqueue(other, [other, false_lit])
+
+                watching = watches[false_lit]
+                watches[false_lit] = kept = []
+                for index, clause in enumerate(watching):
+                    if not clause:
+                        continue
+                    if clause[0] == false_lit:
+                        clause[0], clause[1] = clause[1], false_lit
+                    first = clause[0]
+                    if value[first] == 1:
+                        kept.append(clause)
+                        continue
+                    for position in range(2, len(clause)):
+                        lit = clause[position]
+                        if value[lit] != -1:
+                            clause[1], clause[position] = lit, false_lit
+                            watches[lit].append(clause)
+                            break
+                    else:
+                        kept.append(clause)
+                        if value[first] == -1:
+                            kept.extend(watching[index + 1:])
+                            return clause, head
+                        enqueue(first, clause)
+            return None, head
+
+        def analyze(conflict):
+            current = len(trail_lim)
+            learnt = [0]
+            pending = 0
+            lit = None
+            index = len(trail) - 1
+            clause = conflict
+            while True:
+                for other in (clause if lit is None else clause[1:]):
+                    var = other >> 1
+                    if not seen[var] and level[var]:
+                        seen[var] = True
+                        bump(var)
+                        if level[var] >= current:
+                            pending += 1
+                        else:
+                            learnt.append(other)
+                while not seen[trail[index] >> 1]:
+                    index -= 1
+                lit = trail[index]
+                index -= 1
+                seen[lit >> 1] = False
+                pending -= 1
+                if not pending:
+                    break
+                clause = reason[lit >> 1]
+            learnt[0] = lit ^ 1
+
+            # Drop literals implied by the rest of the clause
+            minimized = [learnt[0]]
+            for other in learnt[1:]:
+                why = reason[other >> 1]
+                if why is None or not all(seen[r >> 1] or not level[r >> 1] for r in why[1:]):
+                    minimized.append(other)
+            for other in learnt:
+                seen[other >> 1] = False
+
+            target = 0
+            if len(minimized) > 1:
+                deepest = max(range(1, len(minimized)), key=lambda position: level[minimized[position] >> 1])
+                minimized[1], minimized[deepest] = minimized[deepest], minimized[1]
+                target = level[minimized[1] >> 1]
+            return minimized, target
+
+        increment = [1.0]
+
+        def bump(var):
+            activity[var] += increment[0]
+            if activity[var] > ACTIVITY_LIMIT:
+                for other in range(variable_count):
+                    activity[other] *= 1 / ACTIVITY_LIMIT
+                increment[0] /= ACTIVITY_LIMIT
+                heap[:] = [(-activity[other], other) for _, other in heap]
+                heapq.heapify(heap)
+
+        def reduce_learnts():
+            locked = [clause for clause in learnts if reason[clause[0] >> 1] is clause]
+            free = sorted((clause for clause in learnts if reason[clause[0] >> 1] is not clause), key=len)
+            for clause in free[len(free) // 2:]:
+                clause.clear()
+            learnts[:] = locked + free[:len(free) // 2]
+
+        for lit in units_found:
+            if value[lit] == -1:
+                return None
+            if not value[lit]:
+                enqueue(lit, [lit])
+
+        head = 0
+        max_learnts = len(clauses) // 3 + 100
+        restart_limit = RESTART_BASE * luby(0)
+        conflicts = 0
+        while True:
+            conflict, head = propagate(head)
+            if conflict is not None:
+                stats.validations += 1
+                conflicts += 1
+                if not trail_lim:
+                    return None
+                learnt, target = analyze(conflict)
+                backjump(target)
+                head = len(trail)
+                self.learned += 1
+                if len(learnt) == 1:
+                    enqueue(learnt[0], [learnt[0]])
+                else:
+                    if len(learnt) == 2:
+                        binary[learnt[0]].append(learnt[1])
+                        binary[learnt[1]].append(learnt[0])
+                    else:
+                        watches[learnt[0]].append(learnt)
+                        watches[learnt[1]].append(learnt)
+                        learnts.append(learnt)
+                    enqueue(learnt[0], learnt)
+                increment[0] /= ACTIVITY_DECAY
+                continue
+
+            if conflicts >= restart_limit:
+                self.restarts += 1
+                conflicts = 0
+                restart_limit = RESTART_BASE * luby(self.restarts)
+                backjump(0)
+                head = len(trail)
+                heap[:] = [(-activity[var], var) for var in variables if not value[2 * var]]
+                heapq.heapify(heap)
+            if len(learnts) >= max_learnts + len(trail):
+                reduce_learnts()
+                max_learnts = max_learnts * 11 // 10
+
+            # Guess the most active unassigned variable true
+            while heap:
+                score, var = heap[0]
+                if not value[2 * var] and -score == activity[var]:
+                    break
+                heapq.heappop(heap)
+            else:
+                return [lit >> 1 for lit in trail if not lit & 1]
+
+            stats.nodes += 1
+            if tracer is not None:
+                cell, digit = divmod(var - 1, size)
+                tracer("place", cell, digit + 1, len(trail_lim))
+            trail_lim.append(len(trail))
+            stats.max_depth = max(stats.max_depth, len(trail_lim))
+            enqueue(2 * var, None)
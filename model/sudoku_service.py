@@ -0,0 +1,447 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import isqrt
+from time import monotonic
+from model.sudoku_cache import CachedSolver
+from model.sudoku_engines import ENGINES
+from model.sudoku_format import format_puzzle, parse_puzzle
+from model.sudoku_parallel import CHECK_INTERVAL
+from model.sudoku_pool import get_solver
+
+# Returned by a worker for a request whose deadline passed
+TIMEOUT = "timeout"
+
+class DeadlinePassed(Exception):
+    """Raised inside a worker's search once its request has timed out
+    """
+
+def warm_up(engine):
+    """Creates a worker's solving engine ahead of the first request
+    """
+
+    get_solver(engine)
+
+def solve_request(engine, text, deadline, cache_size=0):
+    """Solves one request inside a worker process, giving up at its deadline
+
+    Parameters
+    ----------
+    engine : str
+        The name of the solving engine
+    text : str
+        The puzzle written on one line
+    deadline : float
+        The time.monotonic() value at which the request times out
+    cache_size : int, optional
+        The number of solutions each worker caches, default 0
+
+    Returns:
+        The solved board, None if unsolvable, the ValueError raised while
+        parsing the puzzle, or TIMEOUT
+    """
+
+    if monotonic() > deadline:
+        return TIMEOUT
+    try:
+        board = parse_puzzle(text)
+    except ValueError as error:
+        return error
+
+    solver = get_solver(engine, isqrt(len(board)), cache_size)
+    engine_solver = solver.solver if isinstance(solver, CachedSolver) else solver
+    calls = 0
+
+    def check_deadline(event, cell, value, depth):
+        nonlocal calls
+        calls += 1
+        if not calls % CHECK_INTERVAL and monotonic() > deadline:
+            raise DeadlinePassed
+
+    engine_solver.tracer = check_deadline
+    try:
+        return solver.solve(board)
+    except DeadlinePassed:
+        return TIMEOUT
+    finally:
+        engine_solver.tracer = None
+
+def solve_requests(engine, requests, cache_size=0):
+    """Solves a batch of requests inside a worker process
+
+    Parameters
+    ----------
+    engine : str
+        The name of the solving engine
+    requests : list
+        Pairs of puzzle text and deadline
+    cache_size : int, optional
+        The number of solutions each worker caches, default 0
+
+    Returns:
+        A list of solve_request results
+    """
+
+    return [solve_request(engine, text, deadline, cache_size) for text, deadline in requests]
+
+class SolveService:
+    """
+    A class used to serve solve requests over JSON lines with asyncio
+
+    Every request is one JSON object on one line, answered by one JSON line
+    carrying the same "id". Requests may be pipelined and answers can come
+    back out of order. {"puzzle": "..."} solves a puzzle, optionally with an
+    "engine" and a "timeout" in seconds, and is answered with a "status" of
+    "solved" (with the "solution"), "unsolvable", "invalid" or "timeout".
+    {"op": "health"} is answered at once with the service counters.
+
+    Requests wait in a bounded queue. A batcher takes up to batch_size of
+    them, waiting at most batch_delay for more, and solves them in one task
+    on a pool of worker processes, so concurrent clients share the
+    inter-process overhead. At most two batches per worker are in flight;
+    beyond that the queue fills up and connections stop being read, which
+    pushes back on the clients. Every request carries its deadline to the
+    worker, whose search gives up once it passes, so slow puzzles cannot
+    hold on to the workers after their clients were answered.
+
+    ...
+    Attributes
+    ----------
+    engine : str
+        The engine used when a request names none
+    workers : int
+        The number of worker processes
+    batch_size : int
+        The largest number of requests solved in one batch
+    batch_delay : float
+        Seconds the batcher waits for a batch to fill up
+    timeout : float
+        Seconds a request may take when it sets no timeout of its own
+    cache_size : int
+        The number of solutions each worker caches
+    queue : Queue
+        Requests waiting for a batch
+    counters : dict
+        Request, result, batch and latency totals since the start
+
+    Methods
+    -------
+    start()
+        Starts the worker pool and the batcher
+
+    stop()
+        Stops the batcher and the worker pool
+
+    handle_request(request)
+        Answers one decoded request
+
+    enqueue(request)
+        Checks a request and queues its puzzle for the next batch
+
+    complete(answer, future, timeout)
+        Waits for a queued puzzle to be solved and finishes its answer
+
+    handle_connection(reader, writer)
+        Answers every request sent over one connection
+
+    health()
+        Returns the service counters
+
+    batcher()
+        Groups queued requests into batches until stopped
+
+    run_batch(engine, batch)
+        Solves a batch on the worker pool and answers its requests
+
+    serve(host="127.0.0.1", port=8765, path=None)
+        Serves requests on a TCP port or a Unix socket until cancelled
+    """
+
+    def __init__(self, engine="propagation", workers=None, batch_size=32, batch_delay=0.002, queue_size=1024,
+                 timeout=10.0, cache_size=0):
+        """
+        Parameters
+        ----------
+        engine : str, optional
+            The engine used when a request names none, default "propagation"
+        workers : int, optional
+            The number of worker processes, defaults to the number of CPUs
+        batch_size : int, optional
+            The largest number of requests solved in one batch, default 32
+        batch_delay : float, optional
+            Seconds the batcher waits for a batch to fill up, default 0.002
+        queue_size : int, optional
+            The number of requests that may wait for a batch, default 1024
+        timeout : float, optional
+            Seconds a request may take when it sets no timeout, default 10
+        cache_size : int, optional
+            The number of solutions each worker caches, default 0
+        """
+
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown solving engine: {engine}")
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.cache_size = cache_size
+
+        self.queue = None
+        self.pool = None
+        self.slots = None
+        self.batcher_task = None
+        self.started = None
+        self.counters = dict.fromkeys(("requests", "solved", "unsolvable", "invalid", "timeouts", "errors",
+                                       "batches", "batched"), 0)
+        self.counters["latency"] = 0.0
+
+    async def start(self):
+        """Starts the worker pool and the batcher
+        """
+
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.queue_size)
+        self.slots = asyncio.Semaphore(2 * self.workers)
+        self.pool = ProcessPoolExecutor(self.workers)
+        await asyncio.gather(*(loop.run_in_executor(self.pool, warm_up, self.engine)
+                               for _ in range(self.workers)))
+        self.batcher_task = asyncio.create_task(self.batcher())
+        self.started = monotonic()
+
+    async def stop(self):
+        """Stops the batcher and the worker pool
+        """
+
+        if self.batcher_task is not None:
+            self.batcher_task.cancel()
+            try:
+                await self.batcher_task
+            except asyncio.CancelledError:
+                pass
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def handle_request(self, request):
+        """Answers one decoded request
+
+        Parameters
+        ----------
+        request : dict
+            The decoded JSON request
+
+        Returns:
+            The answer as a dictionary
+        """
+
+        answer, future, timeout = await self.enqueue(request)
+        if future is None:
+            return answer
+        return await self.complete(answer, future, timeout)
+
+    async def enqueue(self, request):
+        """Checks a request and queues its puzzle for the next batch
+
+        Waits while the queue is full.
+
+        Parameters
+        ----------
+        request : dict
+            The decoded JSON request
+
+        Returns:
+            The answer so far, the future of the solution (None if the request
+            is already answered) and the request's timeout
+        """
+
+        answer = {"id": request.get("id") if isinstance(request, dict) else None}
+        if not isinstance(request, dict) or request.get("op", "solve") not in ("solve", "health"):
+            self.counters["errors"] += 1
+            return dict(answer, status="error", error="Expected a puzzle or a health request"), None, None
+        if request.get("op") == "health":
+            return dict(answer, status="ok", **self.health()), None, None
+
+        engine = request.get("engine", self.engine)
+        puzzle = request.get("puzzle")
+        timeout = request.get("timeout", self.timeout)
+        if (not isinstance(engine, str) or engine not in ENGINES or not isinstance(puzzle, str)
+                or isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout > 0):
+            self.counters["errors"] += 1
+            error = "Expected a puzzle string, a known engine and a positive timeout in seconds"
+            return dict(answer, status="error", error=error), None, None
+
+        self.counters["requests"] += 1
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((engine, puzzle, future, monotonic() + timeout))
+        return answer, future, timeout
+
+    async def complete(self, answer, future, timeout):
+        """Waits for a queued puzzle to be solved and finishes its answer
+
+        Parameters
+        ----------
+        answer : dict
+            The answer returned by enqueue
+        future : Future
+            The future of the solution
+        timeout : float
+            Seconds to wait for the solution
+
+        Returns:
+            The answer as a dictionary
+        """
+
+        # The worker gives up at the deadline too, but the client is answered
+        # on time even while the worker is between two deadline checks
+        start = monotonic()
+        try:
+            solution = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            solution = TIMEOUT
+        finally:
+            self.counters["latency"] += monotonic() - start
+
+        if solution == TIMEOUT:
+            self.counters["timeouts"] += 1
+            return dict(answer, status="timeout")
+        if isinstance(solution, ValueError):
+            self.counters["invalid"] += 1
+            return dict(answer, status="invalid", error=str(solution))
+        if solution is None:
+            self.counters["unsolvable"] += 1
+            return dict(answer, status="unsolvable")
+        self.counters["solved"] += 1
+        return dict(answer, status="solved", solution=format_puzzle(solution))
+
+    async def handle_connection(self, reader, writer):
+        """Answers every request sent over one connection
+
+        The next line is only read once the previous request has a place in
+        the queue, so a full queue stops the connection being read.
+
+        Parameters
+        ----------
+        reader : StreamReader
+            The incoming lines
+        writer : StreamWriter
+            The outgoing answers
+        """
+
+        async def reply(answer, future, timeout):
+            if future is not None:
+                answer = await self.complete(answer, future, timeout)
+            writer.write((json.dumps(answer) + "\n").encode())
+            await writer.drain()
+
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    request = None
+                task = asyncio.create_task(reply(*await self.enqueue(request)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    def health(self):
+        """Returns the service counters
+
+        Returns:
+            A dictionary of the counters, queue depth, uptime, mean batch size
+            and mean milliseconds from queueing a request to answering it
+        """
+
+        counters = dict(self.counters)
+        answered = counters["solved"] + counters["unsolvable"] + counters["invalid"] + counters["timeouts"]
+        counters["latency_ms"] = round(1000 * counters.pop("latency") / max(1, answered), 3)
+        counters["mean_batch"] = round(counters["batched"] / max(1, counters["batches"]), 2)
+        counters["queued"] = self.queue.qsize() if self.queue else 0
+        counters["workers"] = self.workers
+        counters["uptime"] = round(monotonic() - self.started, 3) if self.started else 0
+        return counters
+
+    async def batcher(self):
+        """Groups queued requests into batches until stopped
+        """
+
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests that timed out while queued are dropped
+            by_engine = {}
+            for engine, puzzle, future, deadline in batch:
+                if not future.done():
+                    by_engine.setdefault(engine, []).append((puzzle, deadline, future))
+            for engine, requests in by_engine.items():
+                await self.slots.acquire()
+                asyncio.create_task(self.run_batch(engine, requests))
+
+    async def run_batch(self, engine, batch):
+        """Solves a batch on the worker pool and answers its requests
+
+        Parameters
+        ----------
+        engine : str
+            The name of the solving engine
+        batch : list
+            The puzzle text, deadline and future awaiting the solution of
+            every request
+        """
+
+        try:
+            self.counters["batches"] += 1
+            self.counters["batched"] += len(batch)
+            requests = [(puzzle, deadline) for puzzle, deadline, _ in batch]
+            loop = asyncio.get_running_loop()
+            try:
+                results = await loop.run_in_executor(self.pool, solve_requests, engine, requests, self.cache_size)
+            except Exception as error:
+                results = [ValueError(f"Solve failed: {error}")] * len(batch)
+            for (_, _, future), solution in zip(batch, results):
+                if not future.done():
+                    future.set_result(solution)
+        finally:
+            self.slots.release()
+
+    async def serve(self, host="127.0.0.1", port=8765, path=None):
+        """Serves requests on a TCP port or a Unix socket until cancelled
+
+        Parameters
+        ----------
+        host : str, optional
+            The address to listen on, default "127.0.0.1"
+        port : int, optional
+            The TCP port to listen on, default 8765
+        path : str, optional
+            A Unix socket to listen on instead of a TCP port
+        """
+
+        await self.start()
+        try:
+            if path is not None:
+                server = await asyncio.start_unix_server(self.handle_connection, path)
+            else:
+                server = await asyncio.start_server(self.handle_connection, host, port)
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
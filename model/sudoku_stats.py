@@ -0,0 +1,125 @@
+from contextlib import contextmanager
+from time import perf_counter
+from model.sudoku_units import get_units
+
+class SolveStats:
+    """
+    A class used to collect the search counters and timings of one solve
+
+    ...
+    Attributes
+    ----------
+    nodes : int
+        The number of trial placements (guesses) made
+    backtracks : int
+        The number of placements taken back after a dead end
+    propagations : int
+        The number of digits forced without guessing
+    validations : int
+        The number of placement or unit checks performed
+    max_depth : int
+        The deepest level the search reached
+    timings : dict
+        Wall time in seconds by solve phase, e.g. "setup" and "search"
+
+    Methods
+    -------
+    reset()
+        Clears every counter and timing
+
+    phase(name)
+        Times a phase of the solve, as a context manager
+
+    as_dict()
+        Returns the counters and timings as a dictionary
+
+    __str__()
+        String representation of the SolveStats
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clears every counter and timing
+        """
+
+        self.nodes = 0
+        self.backtracks = 0
+        self.propagations = 0
+        self.validations = 0
+        self.max_depth = 0
+        self.timings = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Times a phase of the solve, as a context manager
+
+        Parameters
+        ----------
+        name : str
+            The name of the phase; repeated phases add up
+        """
+
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0) + perf_counter() - start
+
+    def as_dict(self):
+        """Returns the counters and timings as a dictionary
+
+        Returns:
+            A dictionary of plain numbers, timings in milliseconds
+        """
+
+        return {"nodes": self.nodes, "backtracks": self.backtracks, "propagations": self.propagations,
+                "validations": self.validations, "max_depth": self.max_depth,
+                "timings_ms": {name: round(1000 * seconds, 3) for name, seconds in self.timings.items()}}
+
+    def __str__(self):
+        """String representation of the SolveStats
+        """
+
+        timings = ", ".join(f"{name} {1000 * seconds:.1f} ms" for name, seconds in self.timings.items())
+        return (f"{self.nodes} nodes, {self.backtracks} backtracks, {self.propagations} propagations, "
+                f"{self.validations} validations, depth {self.max_depth}" + (f"; {timings}" if timings else ""))
+
+class InstrumentedSolver:
+    """
+    A class used as the base of every solving engine
+
+    Engines count their work in a SolveStats object and can report every
+    placement to an optional tracer. The tracer is only called behind an
+    "is not None" check, so leaving it unset costs nothing beyond that test.
+
+    ...
+    Attributes
+    ----------
+    units : SudokuUnits
+        The precomputed unit tables for the board size
+    stats : SolveStats
+        The counters and timings of the last solve
+    tracer : callable
+        Called as tracer(event, cell, value, depth) with the events "place",
+        "undo" and "force", None to disable tracing
+    nodes : int
+        The number of trial placements made during the last solve
+    """
+
+    def __init__(self, square_size=3):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        """
+
+        self.units = get_units(square_size)
+        self.stats = SolveStats()
+        self.tracer = None
+
+    @property
+    def nodes(self):
+        return self.stats.nodes
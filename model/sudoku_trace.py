@@ -0,0 +1,391 @@
+import struct
+import sys
+from array import array
+from model.sudoku_units import get_units
+
+# Trace files start with this header: magic, format version, square size and
+# the number of operations; the starting board (one byte per cell) and the
+# operations (little-endian 32-bit words) follow
+MAGIC = b"SDKT"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxxQ")
+
+# The kinds of operation, matching the tracer events "place", "force", "undo"
+PLACE, FORCE, UNDO = 0, 1, 2
+KINDS = {"place": PLACE, "force": FORCE, "undo": UNDO}
+
+# Every operation is one word: the cell, the kind, then the old and new values
+# of the cell in 5 bits each (values go up to 25)
+VALUE_BITS = 5
+VALUE_MASK = (1 << VALUE_BITS) - 1
+KIND_SHIFT = 2 * VALUE_BITS
+CELL_SHIFT = KIND_SHIFT + 2
+
+# Operations between two stored boards, which bound the work of a seek
+KEYFRAME_INTERVAL = 4096
+
+def pack_op(kind, cell, old, new):
+    """Packs one operation into a word
+
+    Returns:
+        An integer below 2 ** 32
+    """
+
+    return cell << CELL_SHIFT | kind << KIND_SHIFT | old << VALUE_BITS | new
+
+def unpack_op(op):
+    """Unpacks a word written by pack_op
+
+    Returns:
+        The kind, cell, old value and new value of the operation
+    """
+
+    return (op >> KIND_SHIFT) & 3, op >> CELL_SHIFT, (op >> VALUE_BITS) & VALUE_MASK, op & VALUE_MASK
+
+class TraceRecorder:
+    """
+    A class used to record a search as a compact trace
+
+    A recorder is an engine tracer: set it as an engine's tracer and every
+    placement, forced digit and undo is appended to an array of packed
+    words, 4 bytes each, so a million-step search takes 4 MB. Engines that
+    copy their state on a guess instead of undoing every forced digit only
+    report the undo of the guess; the recorder keeps a stack of the cells it
+    filled and clears everything filled deeper than the undo, so replaying
+    the trace always reproduces the board the engine was looking at.
+
+    ...
+    Attributes
+    ----------
+    units : SudokuUnits
+        The precomputed unit tables for the board size
+    initial : bytes
+        The board the search started from, one byte per cell
+    cells : bytearray
+        The board as the search left it
+    ops : array
+        The packed operations recorded so far
+    stack : list
+        (depth, cell) pairs of the cells filled by the search, oldest first
+    tracer : callable
+        Another tracer called with every event, None for none
+
+    Methods
+    -------
+    clear_above(index)
+        Records the undo of every cell filled after a stack entry
+
+    trace()
+        Returns the recording as a SolveTrace
+    """
+
+    def __init__(self, board, square_size=3, tracer=None):
+        """
+        Parameters
+        ----------
+        board : list
+            The board being searched as a collection of lists of integers
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        tracer : callable, optional
+            Another tracer called with every event, default None
+        """
+
+        self.units = get_units(square_size)
+        self.initial = bytes(self.units.flatten(board))
+        self.cells = bytearray(self.initial)
+        self.ops = array("I")
+        self.stack = []
+        self.tracer = tracer
+
+    def __call__(self, event, cell, value, depth):
+        if self.tracer is not None:
+            self.tracer(event, cell, value, depth)
+
+        stack = self.stack
+        if event == "undo":
+            index = len(stack)
+            while index and stack[index - 1][0] > depth:
+                index -= 1
+            # The undone cell itself, usually the next entry down
+            for below in range(index - 1, -1, -1):
+                if stack[below][1] == cell:
+                    index = below
+                    break
+            self.clear_above(index)
+            return
+
+        # Stepwise engines try the next digit of a cell without an undo first
+        if self.cells[cell]:
+            self.clear_above(next(index for index in range(len(stack) - 1, -1, -1) if stack[index][1] == cell))
+        self.ops.append(pack_op(KINDS[event], cell, self.cells[cell], value))
+        self.cells[cell] = value
+        stack.append((depth, cell))
+
+    def clear_above(self, index):
+        """Records the undo of every cell filled after a stack entry
+
+        Parameters
+        ----------
+        index : int
+            The first stack entry to undo
+        """
+
+        stack, cells = self.stack, self.cells
+        while len(stack) > index:
+            _, cell = stack.pop()
+            self.ops.append(pack_op(UNDO, cell, cells[cell], 0))
+            cells[cell] = 0
+
+    def trace(self):
+        """Returns the recording as a SolveTrace
+
+        Returns:
+            A SolveTrace sharing the recorded operations
+        """
+
+        return SolveTrace(self.units.square_size, self.initial, self.ops)
+
+class SolveTrace:
+    """
+    A class used to hold a recorded search for replay
+
+    Every operation holds the old value of its cell as well as the new one,
+    so a trace can be stepped backwards as cheaply as forwards. Boards are
+    kept every KEYFRAME_INTERVAL operations, built as they are first needed,
+    so a seek anywhere in the trace applies at most that many operations.
+
+    ...
+    Attributes
+    ----------
+    square_size : int
+        The width/length of 1 square
+    initial : bytes
+        The board the search started from, one byte per cell
+    ops : array
+        The packed operations
+    keyframes : list
+        The board before every KEYFRAME_INTERVAL-th operation, built so far
+
+    Methods
+    -------
+    board_at(index)
+        Returns the board after the first index operations
+
+    save(path)
+        Writes the trace to a file
+
+    load(path)
+        Reads a trace written by save
+    """
+
+    def __init__(self, square_size, initial, ops):
+        """
+        Parameters
+        ----------
+        square_size : int
+            The width/length of 1 square
+        initial : bytes
+            The board the search started from, one byte per cell
+        ops : array
+            The packed operations
+        """
+
+        if len(initial) != square_size ** 4:
+            raise ValueError(f"Expected {square_size ** 4} cells, got {len(initial)}")
+        self.square_size = square_size
+        self.initial = bytes(initial)
+        self.ops = ops
+        self.keyframes = [self.initial]
+
+    def __len__(self):
+        return len(self.ops)
+
+    def board_at(self, index):
+        """Returns the board after the first index operations
+
+        Parameters
+        ----------
+        index : int
+            The number of operations applied, 0 - len(trace)
+
+        Returns:
+            A bytearray of one value per cell
+        """
+
+        if not 0 <= index <= len(self.ops):
+            raise IndexError("trace position out of range")
+
+        ops, keyframes = self.ops, self.keyframes
+        while len(keyframes) <= index // KEYFRAME_INTERVAL:
+            start = (len(keyframes) - 1) * KEYFRAME_INTERVAL
+            cells = bytearray(keyframes[-1])
+            for op in ops[start:start + KEYFRAME_INTERVAL]:
+                cells[op >> CELL_SHIFT] = op & VALUE_MASK
+            keyframes.append(bytes(cells))
+
+        start = index // KEYFRAME_INTERVAL * KEYFRAME_INTERVAL
+        cells = bytearray(keyframes[index // KEYFRAME_INTERVAL])
+        for op in ops[start:index]:
+            cells[op >> CELL_SHIFT] = op & VALUE_MASK
+        return cells
+
+    def save(self, path):
+        """Writes the trace to a file
+
+        Parameters
+        ----------
+        path : str
+            The file to write
+        """
+
+        ops = self.ops
+        if sys.byteorder == "big":
+            ops = array("I", ops)
+            ops.byteswap()
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.square_size, len(ops)))
+            file.write(self.initial)
+            ops.tofile(file)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a trace written by save
+
+        Parameters
+        ----------
+        path : str
+            The file to read
+
+        Returns:
+            A SolveTrace
+
+        Raises:
+            ValueError if the file is not a trace, is truncated or holds
+            cells or values outside its board
+        """
+
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is too short to be a trace")
+            magic, version, square_size, count = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} trace")
+            if not 2 <= square_size <= 5:
+                raise ValueError(f"{path} has an invalid board size in its header")
+
+            cell_count, row_col_len = square_size ** 4, square_size ** 2
+            initial = file.read(cell_count)
+            ops = array("I")
+            try:
+                if len(initial) < cell_count:
+                    raise EOFError
+                ops.fromfile(file, count)
+            except EOFError:
+                raise ValueError(f"{path} is truncated") from None
+            if file.read(1):
+                raise ValueError(f"{path} has more operations than its header counts")
+        if sys.byteorder == "big":
+            ops.byteswap()
+
+        # Replaying must never index outside the board
+        if max(initial, default=0) > row_col_len:
+            raise ValueError(f"{path} has a value outside the board in its initial board")
+        for index, op in enumerate(ops):
+            if (op >> CELL_SHIFT >= cell_count or op >> KIND_SHIFT & 3 > UNDO
+                    or op >> VALUE_BITS & VALUE_MASK > row_col_len or op & VALUE_MASK > row_col_len):
+                raise ValueError(f"{path} has an invalid operation at index {index}")
+        return cls(square_size, initial, ops)
+
+class TracePlayer:
+    """
+    A class used to move through a SolveTrace
+
+    Short moves apply or take back the operations in between; long ones
+    start from the nearest keyframe and compare the boards. Either way only
+    the cells that end up different are returned, ready to be displayed.
+
+    ...
+    Attributes
+    ----------
+    trace : SolveTrace
+        The trace being played
+    position : int
+        The number of operations applied
+    cells : bytearray
+        The board at the current position
+
+    Methods
+    -------
+    seek(index)
+        Moves to a position in the trace
+
+    step(count=1)
+        Moves forwards, or backwards if count is negative
+
+    at_end()
+        Checks whether every operation has been applied
+    """
+
+    def __init__(self, trace):
+        """
+        Parameters
+        ----------
+        trace : SolveTrace
+            The trace to play, starting at its first operation
+        """
+
+        self.trace = trace
+        self.position = 0
+        self.cells = bytearray(trace.initial)
+
+    def seek(self, index):
+        """Moves to a position in the trace
+
+        Parameters
+        ----------
+        index : int
+            The number of operations to have applied, clamped to the trace
+
+        Returns:
+            A dictionary of the value of every cell that changed, by cell
+        """
+
+        index = max(0, min(index, len(self.trace)))
+        ops, cells, start = self.trace.ops, self.cells, self.position
+        changed = {}
+
+        if abs(index - start) > KEYFRAME_INTERVAL:
+            board = self.trace.board_at(index)
+            changed = {cell: value for cell, (value, old) in enumerate(zip(board, cells)) if value != old}
+            self.cells = board
+        elif index >= start:
+            for op in ops[start:index]:
+                cell = op >> CELL_SHIFT
+                cells[cell] = changed[cell] = op & VALUE_MASK
+        else:
+            for op in reversed(ops[index:start]):
+                cell = op >> CELL_SHIFT
+                cells[cell] = changed[cell] = (op >> VALUE_BITS) & VALUE_MASK
+
+        self.position = index
+        return changed
+
+    def step(self, count=1):
+        """Moves forwards, or backwards if count is negative
+
+        Returns:
+            A dictionary of the value of every cell that changed, by cell
+        """
+
+        return self.seek(self.position + count)
+
+    def at_end(self):
+        """Checks whether every operation has been applied
+
+        Returns:
+            A boolean for whether or not the player is at the end
+        """
+
+        return self.position == len(self.trace)
@@ -0,0 +1,102 @@
+from functools import lru_cache
+from model.sudoku_compact import CompactBoard
+
+class SudokuUnits:
+    """
+    A class used to hold the precomputed unit and peer tables of a board size
+
+    Cells are addressed by their row-major index (row * row_col_len + col) so
+    solvers can look up the row, column, square and peers of a cell without
+    any arithmetic in their inner loops.
+
+    ...
+    Attributes
+    ----------
+    square_size : int
+        The width/length of 1 square
+    row_col_len : int
+        The size of a row/column
+    cell_count : int
+        The number of cells on the board
+    all_digits : int
+        A bitmask with one bit set for every digit (bit d - 1 for digit d)
+    row_of : tuple
+        The row of every cell
+    col_of : tuple
+        The column of every cell
+    square_of : tuple
+        The square (0-based, row-major) of every cell
+    units : tuple
+        Every row, column and square as a tuple of cell indices
+    units_of : tuple
+        The three units (row, column, square) containing every cell
+    peers : tuple
+        The cells sharing a unit with every cell, excluding the cell itself
+    """
+
+    def __init__(self, square_size=3):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The width/length of 1 square, default 3
+        """
+
+        self.square_size = square_size
+        self.row_col_len = square_size * square_size
+        self.cell_count = self.row_col_len * self.row_col_len
+        self.all_digits = (1 << self.row_col_len) - 1
+
+        size = self.row_col_len
+        self.row_of = tuple(cell // size for cell in range(self.cell_count))
+        self.col_of = tuple(cell % size for cell in range(self.cell_count))
+        self.square_of = tuple((self.row_of[cell] // square_size) * square_size + self.col_of[cell] // square_size
+                               for cell in range(self.cell_count))
+
+        rows = [tuple(row * size + col for col in range(size)) for row in range(size)]
+        cols = [tuple(row * size + col for row in range(size)) for col in range(size)]
+        squares = [tuple(cell for cell in range(self.cell_count) if self.square_of[cell] == square)
+                   for square in range(size)]
+        self.units = tuple(rows + cols + squares)
+
+        self.units_of = tuple((rows[self.row_of[cell]], cols[self.col_of[cell]], squares[self.square_of[cell]])
+                              for cell in range(self.cell_count))
+        self.peers = tuple(tuple(sorted(set().union(*self.units_of[cell]) - {cell}))
+                           for cell in range(self.cell_count))
+
+    def flatten(self, board):
+        """Flattens a list of lists of integers (or a CompactBoard) into a
+        row-major list
+
+        Returns:
+            A list of integers
+        """
+
+        if isinstance(board, CompactBoard):
+            return list(board.cells)
+        return [num for row in board for num in row]
+
+    def unflatten(self, cells):
+        """Turns a row-major list of integers back into a list of lists
+
+        Returns:
+            A list of lists of integers
+        """
+
+        size = self.row_col_len
+        return [list(cells[row * size:(row + 1) * size]) for row in range(size)]
+
+@lru_cache(maxsize=None)
+def get_units(square_size=3):
+    """Returns the shared SudokuUnits tables for a square size
+
+    Parameters
+    ----------
+    square_size : int, optional
+        The width/length of 1 square, default 3
+
+    Returns:
+        A SudokuUnits object
+    """
+
+    return SudokuUnits(square_size)
@@ -0,0 +1,236 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from time import perf_counter
+from model.sudoku_core import SudokuCore
+from model.sudoku_engines import engine_names, get_engine
+from model.sudoku_format import parse_puzzle
+
+# Bundled puzzle corpora, one puzzle per line
+CORPUS_DIR = Path(__file__).parent / "corpora"
+CORPORA = ("easy", "hard", "seventeen", "killers")
+
+# Row-major engines (backtracking, bitmask) can take minutes on the killers
+# corpus, so they are only benchmarked when asked for
+DEFAULT_ENGINES = ("propagation", "dlx")
+
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+
+# Timing metrics, and whether higher values are better. They depend on the
+# machine the baseline was written on, so drifting past the tolerance only
+# warns, and only when asked for
+TIMING_METRICS = {"solves_per_sec": True, "p50_ms": False, "p99_ms": False}
+
+def load_corpus(name):
+    """Loads a bundled corpus
+
+    Parameters
+    ----------
+    name : str
+        The name of the corpus
+
+    Returns:
+        A list of puzzles written on one line
+    """
+
+    with open(CORPUS_DIR / f"{name}.txt") as corpus:
+        return [line.strip() for line in corpus if line.strip() and not line.startswith("#")]
+
+def percentile(values, fraction):
+    """Returns the nearest-rank percentile of sorted values
+    """
+
+    index = max(0, min(len(values) - 1, round(fraction * len(values) + 0.5) - 1))
+    return values[index]
+
+def benchmark(engine, puzzles, repeat=3):
+    """Solves every puzzle with an engine and measures it
+
+    Each puzzle is solved repeat times and its fastest time is kept, which
+    filters out most scheduling noise.
+
+    Parameters
+    ----------
+    engine : str
+        The name of the solving engine
+    puzzles : list
+        Puzzles written on one line
+    repeat : int, optional
+        The number of times every puzzle is solved, default 3
+
+    Returns:
+        A dictionary of the puzzle count, failures, solves a second, p50 and
+        p99 latency in milliseconds and the total nodes explored
+    """
+
+    solver = get_engine(engine)
+    times, nodes, failures = [], 0, 0
+
+    for text in puzzles:
+        board = parse_puzzle(text)
+        best = None
+        for _ in range(repeat):
+            start = perf_counter()
+            solution = solver.solve(board)
+            elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        nodes += solver.nodes
+
+        checked = SudokuCore(solution) if solution is not None else None
+        if checked is None or not (checked.is_solved() and checked.check_board()):
+            failures += 1
+        times.append(best)
+
+    times.sort()
+    return {
+        "puzzles": len(puzzles),
+        "failures": failures,
+        "solves_per_sec": round(len(times) / sum(times), 1),
+        "p50_ms": round(1000 * percentile(times, 0.50), 3),
+        "p99_ms": round(1000 * percentile(times, 0.99), 3),
+        "nodes": nodes,
+    }
+
+def compare(results, baseline, tolerance):
+    """Finds the regressions against the baseline that do not depend on the
+    machine: unsolved puzzles and more nodes explored per puzzle
+
+    Parameters
+    ----------
+    results : dict
+        Benchmark results by "engine/corpus"
+    baseline : dict
+        Baseline results in the same format
+    tolerance : float
+        The allowed relative growth, e.g. 0.5 for 50%
+
+    Returns:
+        A list of messages, one per regression
+    """
+
+    regressions = []
+    for key, result in results.items():
+        if result["failures"]:
+            regressions.append(f"{key}: {result['failures']} puzzles not solved")
+        if key not in baseline:
+            continue
+
+        old = baseline[key]["nodes"] / max(1, baseline[key]["puzzles"])
+        new = result["nodes"] / max(1, result["puzzles"])
+        if new > old * (1 + tolerance):
+            regressions.append(f"{key}: nodes per puzzle {old:.1f} -> {new:.1f}")
+    return regressions
+
+def compare_timings(results, baseline, tolerance):
+    """Finds the timing metrics that drifted past the tolerance
+
+    Timings are only comparable with a baseline written on the same machine,
+    so these are reported as warnings and never fail the run.
+
+    Parameters
+    ----------
+    results : dict
+        Benchmark results by "engine/corpus"
+    baseline : dict
+        Baseline results in the same format
+    tolerance : float
+        The allowed relative slowdown, e.g. 0.5 for 50%
+
+    Returns:
+        A list of messages, one per slower metric
+    """
+
+    warnings = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+
+        for metric, higher_is_better in TIMING_METRICS.items():
+            old, new = baseline[key][metric], result[metric]
+            if higher_is_better:
+                slower = new < old * (1 - tolerance)
+            else:
+                slower = new > old * (1 + tolerance)
+            if slower:
+                warnings.append(f"{key}: {metric} {old} -> {new}")
+    return warnings
+
+def format_table(results):
+    """Formats benchmark results as a text table
+
+    Returns:
+        A string with one line per engine and corpus
+    """
+
+    lines = [f"{'engine/corpus':<24}{'puzzles':>8}{'solves/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'nodes':>10}"]
+    for key, result in results.items():
+        lines.append(f"{key:<24}{result['puzzles']:>8}{result['solves_per_sec']:>11}"
+                     f"{result['p50_ms']:>10}{result['p99_ms']:>10}{result['nodes']:>10}")
+    return "\n".join(lines)
+
+def build_parser():
+    """Builds the command line parser
+
+    Returns:
+        An ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark the solving engines on the bundled corpora.")
+    parser.add_argument("-e", "--engines", nargs="+", default=list(DEFAULT_ENGINES), choices=engine_names(),
+                        help=f"engines to benchmark (default: {' '.join(DEFAULT_ENGINES)})")
+    parser.add_argument("-c", "--corpora", nargs="+", default=list(CORPORA), choices=CORPORA,
+                        help="corpora to solve (default: all)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="times every puzzle is solved, keeping the fastest (default: 3)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH),
+                        help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed relative regression before failing (default: 0.5)")
+    parser.add_argument("--check-timings", action="store_true",
+                        help="also warn about timings slower than the baseline, which is only "
+                             "meaningful if it was written on this machine")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write the results as the new baseline instead of comparing")
+    return parser
+
+def run(argv=None):
+    """Runs the benchmarks and compares them against the baseline
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments, defaults to sys.argv
+
+    Returns:
+        The exit status, 1 if a puzzle was not solved or the nodes per
+        puzzle regressed
+    """
+
+    args = build_parser().parse_args(argv)
+
+    results = {}
+    for engine in args.engines:
+        for corpus in args.corpora:
+            results[f"{engine}/{corpus}"] = benchmark(engine, load_corpus(corpus), args.repeat)
+    print(format_table(results))
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    regressions = compare(results, baseline, args.tolerance)
+    if args.check_timings:
+        for warning in compare_timings(results, baseline, args.tolerance):
+            print(f"WARNING {warning}")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(run())
@@ -1,8 +1,29 @@
+import importlib.util
+import io
 import unittest
+from model.sudoku_core import SudokuCore
+from model.sudoku_engines import ENGINES, get_engine
+from model.sudoku_cache import BoardTransform, SolutionCache
+from model.sudoku_iterative import IterativeSolver
+from commands import sudoku_batch
+
+HARD_PUZZLE = ("8..........36......7..9.2...5...7.......457.....1...3"
+               "...1....68..85...1..9....4..")
+EASY_PUZZLE = ("..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82...."
+               "26.95..8..2.3..9..5.1.3..")
+
+def parse_board(text):
+    cells = [0 if char == "." else int(char) for char in text]
+    return [cells[row * 9:(row + 1) * 9] for row in range(9)]
+
+def sleep_then(seconds, value):
+    import time
+    time.sleep(seconds)
+    return [value]
 
 class TestSudokuSolverMethods(unittest.TestCase):
     def setUp(self):
-        self.solvable_board = SudokuBoard(
+        self.solvable_board = SudokuCore(
             [[1,2,0,0,6,0,7,9,0],
              [0,3,0,0,0,0,0,0,0],
              [4,5,6,0,0,0,0,0,0],
@@ -13,5 +34,773 @@ class TestSudokuSolverMethods(unittest.TestCase):
              [0,0,0,0,0,0,0,0,0],
              [6,0,0,0,0,0,0,0,0]])
 
+    def test_check_board(self):
+        self.assertTrue(self.solvable_board.check_board())
+        self.solvable_board.get_board()[8][8] = 6
+        self.assertFalse(self.solvable_board.check_board())
+
+    def test_solve_board_headless(self):
+        updates = []
+        self.solvable_board.listener = lambda *args: updates.append(args)
+        self.solvable_board.solve_board()
+        self.assertTrue(self.solvable_board.is_solved())
+        self.assertTrue(self.solvable_board.check_board())
+        self.assertTrue(updates)
+
+    def test_core_does_not_import_qt(self):
+        import subprocess, sys
+        code = "import sys, model.sudoku_core; sys.exit('PyQt6' in sys.modules)"
+        self.assertEqual(subprocess.call([sys.executable, "-c", code]), 0)
+
+    def test_conflict_index_follows_edits(self):
+        core = self.solvable_board
+        self.assertEqual(core.conflicts.conflicts(), [])
+        self.assertEqual(core.set_value(8, 8, 6), {(8, 8), (8, 0)})
+        self.assertEqual(core.conflicts.conflicts(), [(8, 0), (8, 8)])
+        self.assertEqual(core.set_value(0, 8, 6), {(0, 8), (0, 4), (8, 8)})
+        self.assertTrue(core.conflicts.is_conflicting(0, 4))
+
+        core.set_value(8, 8, 0)
+        core.set_value(0, 8, 0)
+        self.assertEqual(core.conflicts.conflicts(), [])
+        self.assertTrue(core.solve("dlx"))
+        self.assertEqual(core.conflicts.values, [num for row in core.get_board() for num in row])
+
+    def test_load_and_clear_report_only_changed_tiles(self):
+        updates = []
+        core = SudokuCore(listener=lambda *args: updates.append(args))
+        core.load_board(parse_board(HARD_PUZZLE))
+        self.assertEqual(len(updates), 81 - HARD_PUZZLE.count("."))
+        self.assertEqual(core.get_board(), parse_board(HARD_PUZZLE))
+
+        updates.clear()
+        core.load_board(parse_board(HARD_PUZZLE))
+        self.assertEqual(updates, [])
+        core.clear_board()
+        self.assertEqual(len(updates), 81 - HARD_PUZZLE.count("."))
+        self.assertEqual(core.conflicts.values, [0] * 81)
+
+class TestSudokuEngines(unittest.TestCase):
+    def assert_valid_solution(self, puzzle, solution):
+        core = SudokuCore(solution)
+        self.assertTrue(core.is_solved() and core.check_board())
+        for row in range(9):
+            for col in range(9):
+                if puzzle[row][col]:
+                    self.assertEqual(puzzle[row][col], solution[row][col])
+
+    def test_engines_solve_hard_puzzle(self):
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                puzzle = parse_board(HARD_PUZZLE)
+                solution = get_engine(name).solve(puzzle)
+                self.assert_valid_solution(puzzle, solution)
+                self.assertEqual(puzzle, parse_board(HARD_PUZZLE))
+
+    def test_engines_reject_conflicting_givens(self):
+        puzzle = parse_board(HARD_PUZZLE)
+        puzzle[0][1] = 8
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                self.assertIsNone(get_engine(name).solve(puzzle))
+
+    def test_solve_with_engine_updates_board(self):
+        core = SudokuCore(parse_board(HARD_PUZZLE))
+        self.assertTrue(core.solve("bitmask"))
+        self.assert_valid_solution(parse_board(HARD_PUZZLE), core.get_board())
+
+    def test_propagation_solves_easy_puzzle_without_guessing(self):
+        engine = get_engine("propagation")
+        solution = engine.solve(parse_board(EASY_PUZZLE))
+        self.assert_valid_solution(parse_board(EASY_PUZZLE), solution)
+        self.assertEqual(engine.nodes, 0)
+
+    def test_engines_report_stats_and_trace(self):
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                events = []
+                engine = get_engine(name)
+                engine.tracer = lambda event, cell, value, depth: events.append(event)
+                engine.solve(parse_board(HARD_PUZZLE))
+
+                stats = engine.stats.as_dict()
+                self.assertGreater(stats["nodes"], 0)
+                self.assertGreater(stats["max_depth"], 0)
+                self.assertIn("search", stats["timings_ms"])
+                self.assertEqual(events.count("place"), stats["nodes"])
+                self.assertEqual(events.count("undo"), stats["backtracks"])
+
+    def test_scalable_engines_solve_16x16(self):
+        from model.sudoku_format import format_puzzle, parse_puzzle
+        solved = get_engine("propagation", 4).solve([[0] * 16 for _ in range(16)])
+        text = "".join(char if index % 3 else "." for index, char in enumerate(format_puzzle(solved)))
+        puzzle = parse_puzzle(text)
+        self.assertEqual(format_puzzle(puzzle), text)
+
+        for name in ("propagation", "dlx"):
+            with self.subTest(engine=name):
+                core = SudokuCore(puzzle)
+                self.assertEqual(core.square_size, 4)
+                self.assertTrue(core.solve(name))
+                self.assertTrue(core.is_solved() and core.check_board())
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            get_engine("nope")
+
+    def test_count_solutions_leaves_board_untouched(self):
+        puzzle = parse_board(HARD_PUZZLE)
+        core = SudokuCore(puzzle)
+        self.assertEqual(core.uniqueness(), "unique")
+        self.assertEqual(core.get_board(), parse_board(HARD_PUZZLE))
+
+        puzzle[0][0] = 0
+        self.assertEqual(SudokuCore(puzzle).count_solutions(10), 10)
+        self.assertEqual(SudokuCore(puzzle).uniqueness(), "multiple")
+        puzzle[0][0], puzzle[0][1] = 1, 8
+        self.assertEqual(SudokuCore(puzzle).uniqueness(), "none")
+
+    def test_uniqueness_gives_up_after_its_time_budget(self):
+        board = [[0] * 25 for _ in range(25)]
+        board[0][:5] = [1, 2, 3, 4, 5]
+        board[1][5:10] = [1, 2, 3, 4, 5]
+        self.assertEqual(SudokuCore(board, 5).uniqueness(0), "unknown")
+        self.assertEqual(SudokuCore(parse_board(HARD_PUZZLE)).uniqueness(10), "unique")
+
+class TestIterativeSolver(unittest.TestCase):
+    def test_pause_serialize_and_resume(self):
+        import json
+        solver = IterativeSolver()
+        solver.load(parse_board(HARD_PUZZLE))
+        self.assertEqual(solver.run(max_steps=500), "paused")
+
+        restored = IterativeSolver.from_state(json.loads(json.dumps(solver.to_state())))
+        self.assertEqual(restored.run(), "solved")
+        self.assertEqual(restored.solution(), get_engine("dlx").solve(parse_board(HARD_PUZZLE)))
+
+    def test_cancel_and_deadline(self):
+        solver = IterativeSolver()
+        solver.load(parse_board(HARD_PUZZLE))
+        self.assertEqual(solver.run(deadline=0), "paused")
+        solver.cancel()
+        self.assertEqual(solver.run(), "cancelled")
+        self.assertIsNone(solver.solution())
+
+    def test_stopped_solve_leaves_board_untouched(self):
+        updates = []
+        core = SudokuCore(parse_board(HARD_PUZZLE), listener=lambda *args: updates.append(args))
+        self.assertFalse(core.solve("backtracking", deadline=0))
+        self.assertEqual(core.status, "paused")
+        self.assertEqual(core.get_board(), parse_board(HARD_PUZZLE))
+        self.assertEqual(updates[-1][3], 0)
+
+    def test_one_shot_engines_stop_at_deadline_or_cancel(self):
+        core = SudokuCore(parse_board(HARD_PUZZLE))
+        core.solve("backtracking", deadline=0)
+        for engine in ("bitmask", "sat"):
+            with self.subTest(engine=engine):
+                self.assertFalse(core.solve(engine, deadline=0))
+                self.assertEqual(core.status, "paused")
+                self.assertEqual(core.get_board(), parse_board(HARD_PUZZLE))
+
+        core.tracer = lambda *args: core.cancel_solve()
+        self.assertFalse(core.solve("bitmask"))
+        self.assertEqual(core.status, "cancelled")
+        core.tracer = None
+        self.assertTrue(core.solve("bitmask"))
+        self.assertEqual(core.status, "solved")
+
+    def test_instant_solve_reports_only_the_solution(self):
+        updates = []
+        core = SudokuCore(parse_board(HARD_PUZZLE), listener=lambda *args: updates.append(args), animate=False)
+        self.assertTrue(core.solve("backtracking"))
+        self.assertEqual(len(updates), HARD_PUZZLE.count("."))
+
+    def test_speed_paces_the_search(self):
+        import time
+        solver = IterativeSolver()
+        solver.load(parse_board(HARD_PUZZLE))
+        solver.steps_per_second = 1000
+        start = time.monotonic()
+        solver.run(max_steps=50)
+        self.assertGreater(time.monotonic() - start, 0.04)
+
+class TestParallelSolver(unittest.TestCase):
+    def test_split_search_matches_serial(self):
+        from model.sudoku_parallel import ParallelSolver
+        solver = ParallelSolver("dlx", workers=2)
+        subproblems, solution = solver.split(parse_board(HARD_PUZZLE), 8)
+        self.assertIsNone(solution)
+        self.assertGreaterEqual(len(subproblems), 8)
+
+        core = SudokuCore(parse_board(HARD_PUZZLE))
+        self.assertTrue(core.solve("dlx", workers=2))
+        self.assertEqual(core.status, "solved")
+        self.assertEqual(core.get_board(), get_engine("dlx").solve(parse_board(HARD_PUZZLE)))
+        self.assertGreater(core.stats.nodes, 0)
+
+    def test_unsolvable_and_stopped(self):
+        import time
+        from model.sudoku_parallel import ParallelSolver
+        puzzle = parse_board(HARD_PUZZLE)
+        puzzle[0][0], puzzle[0][1] = 1, 8
+        solver = ParallelSolver("propagation", workers=2)
+        self.assertIsNone(solver.solve(puzzle))
+        self.assertEqual(solver.status, "unsolvable")
+
+        # Consistent givens whose every branch dies during the split
+        from model.sudoku_format import parse_puzzle
+        dead_ends = parse_puzzle(".127..3.9...68...5.7...1....5...7..6..9......2.7.......2.9......."
+                                 "8........63.8...")
+        self.assertEqual(solver.split(dead_ends, 8), ([], None))
+        core = SudokuCore(dead_ends)
+        self.assertTrue(core.check_board())
+        self.assertFalse(core.solve("propagation", workers=2))
+        self.assertEqual(core.status, "unsolvable")
+
+        core = SudokuCore(parse_board(HARD_PUZZLE))
+        self.assertFalse(core.solve("backtracking", deadline=time.monotonic(), workers=2))
+        self.assertEqual(core.status, "paused")
+        self.assertEqual(core.get_board(), parse_board(HARD_PUZZLE))
+
+class TestSolveTrace(unittest.TestCase):
+    def test_replay_reaches_every_engines_solution(self):
+        from model.sudoku_trace import TraceRecorder, TracePlayer
+        puzzle = parse_board(HARD_PUZZLE)
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                solver = get_engine(name)
+                solver.tracer = recorder = TraceRecorder(puzzle)
+                solution = bytes(num for row in solver.solve(puzzle) for num in row)
+                trace = recorder.trace()
+                self.assertEqual(bytes(trace.board_at(len(trace))), solution)
+
+                player = TracePlayer(trace)
+                player.seek(len(trace))
+                self.assertEqual(bytes(player.cells), solution)
+                player.seek(len(trace) // 2 - 10)
+                player.step(10)
+                self.assertEqual(player.cells, trace.board_at(len(trace) // 2))
+                player.seek(0)
+                self.assertEqual(bytes(player.cells), trace.initial)
+
+    def test_core_records_and_saves_a_trace(self):
+        import os, tempfile
+        from model.sudoku_trace import SolveTrace
+        core = SudokuCore(parse_board(HARD_PUZZLE), record=True)
+        self.assertTrue(core.solve("backtracking"))
+        self.assertEqual(len(core.trace), 2 * core.stats.nodes - HARD_PUZZLE.count("."))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "hard.sdt")
+            core.trace.save(path)
+            self.assertEqual(os.path.getsize(path), 16 + 81 + 4 * len(core.trace))
+            loaded = SolveTrace.load(path)
+
+            # Corrupt copies fail at load, not during a replay
+            with open(path, "rb") as file:
+                data = file.read()
+            for name, corrupt in (("size", data[:5] + b"\x07" + data[6:]), ("truncated", data[:-3]),
+                                  ("extra", data + b"\x00" * 4), ("cell", data[:-4] + b"\xff" * 4),
+                                  ("value", data[:16] + b"\x1f" + data[17:])):
+                with self.subTest(corruption=name):
+                    bad = os.path.join(directory, f"{name}.sdt")
+                    with open(bad, "wb") as file:
+                        file.write(corrupt)
+                    with self.assertRaises(ValueError):
+                        SolveTrace.load(bad)
+        self.assertEqual(loaded.ops, core.trace.ops)
+        self.assertEqual(loaded.board_at(0), bytearray(num for row in parse_board(HARD_PUZZLE) for num in row))
+
+class TestSatSolver(unittest.TestCase):
+    def test_learns_clauses_and_backjumps(self):
+        solver = get_engine("sat")
+        solution = solver.solve(parse_board(HARD_PUZZLE))
+        self.assertEqual(solution, get_engine("dlx").solve(parse_board(HARD_PUZZLE)))
+        self.assertGreater(solver.learned, 0)
+        self.assertEqual(solver.learned, solver.stats.validations)
+
+    def test_dimacs_round_trip(self):
+        from commands.sudoku_dimacs import decode, read_model
+        solver = get_engine("sat")
+        lines = solver.to_dimacs(parse_board(HARD_PUZZLE)).splitlines()
+        variable_count, clause_count = map(int, lines[1].split()[2:])
+        self.assertEqual((variable_count, clause_count), (729, len(lines) - 2))
+
+        clauses = [[int(var) for var in line.split()[:-1]] for line in lines[2:]]
+        model = "SAT\n" + " ".join(map(str, solver.search(clauses, variable_count + 1))) + " 0\n"
+        solution = get_engine("dlx").solve(parse_board(HARD_PUZZLE))
+        self.assertEqual(decode(read_model(io.StringIO(model))), "".join(str(num) for row in solution for num in row))
+        self.assertIsNone(read_model(io.StringIO("s UNSATISFIABLE\n")))
+
+class TestPortfolioSolver(unittest.TestCase):
+    def test_first_answer_wins(self):
+        from model.sudoku_portfolio import PortfolioSolver
+        with PortfolioSolver(strategies=("propagation", "restart:3")) as portfolio:
+            solution = portfolio.solve(parse_board(HARD_PUZZLE))
+            self.assertEqual(solution, get_engine("dlx").solve(parse_board(HARD_PUZZLE)))
+            self.assertIn(portfolio.winner, portfolio.strategies)
+            self.assertGreater(portfolio.stats.nodes, 0)
+
+            puzzle = parse_board(HARD_PUZZLE)
+            puzzle[0][1] = 8
+            self.assertIsNone(portfolio.solve(puzzle))
+            self.assertEqual(portfolio.status, "unsolvable")
+            self.assertEqual(sum(portfolio.wins.values()), 2)
+
+    def test_core_solves_with_portfolio(self):
+        core = SudokuCore(parse_board(HARD_PUZZLE))
+        try:
+            self.assertTrue(core.solve("portfolio"))
+        finally:
+            core.portfolio.close()
+        self.assertEqual(core.get_board(), get_engine("dlx").solve(parse_board(HARD_PUZZLE)))
+
+    def test_fails_once_no_strategy_is_left(self):
+        from model.sudoku_portfolio import PortfolioSolver
+        malformed = [[0] * 9 for _ in range(9)]
+        malformed[4] = [1]
+        with PortfolioSolver(strategies=("bitmask",)) as portfolio:
+            with self.assertRaisesRegex(RuntimeError, "bitmask: IndexError"):
+                portfolio.solve(malformed)
+            self.assertEqual(portfolio.status, "failed")
+
+            # A strategy that raised keeps serving
+            self.assertIsNotNone(portfolio.solve(parse_board(HARD_PUZZLE)))
+            for process in portfolio.processes:
+                process.terminate()
+                process.join()
+            with self.assertRaisesRegex(RuntimeError, "process exited"):
+                portfolio.solve(parse_board(HARD_PUZZLE))
+
+    def test_rejects_unknown_strategies(self):
+        from model.sudoku_portfolio import parse_strategy
+        self.assertEqual(parse_strategy("restart:7"), ("restart", 7))
+        for strategy in ("nope", "bitmask:1", "restart:x"):
+            with self.subTest(strategy=strategy), self.assertRaises(ValueError):
+                parse_strategy(strategy)
+
+class TestCompactBoard(unittest.TestCase):
+    def test_views_hashing_and_conversion(self):
+        import pickle
+        from model.sudoku_compact import CompactBoard
+        board = CompactBoard.from_text(HARD_PUZZLE)
+        self.assertEqual(board.to_lists(), parse_board(HARD_PUZZLE))
+        self.assertEqual(str(board), HARD_PUZZLE)
+        self.assertEqual(board.column(0).tolist(), [8, 0, 0, 0, 0, 0, 0, 0, 0])
+        self.assertEqual([row.tolist() for row in board.square(4)], [[0, 0, 7], [0, 4, 5], [1, 0, 0]])
+
+        frozen = CompactBoard(bytes(board.cells))
+        self.assertEqual({frozen: 1}[board], 1)
+        self.assertEqual(pickle.loads(pickle.dumps(frozen)), board)
+        with self.assertRaises(TypeError):
+            frozen[0][1] = 1
+
+    def test_model_accepts_compact_boards(self):
+        from model.sudoku_compact import CompactBoard
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                core = SudokuCore(CompactBoard.from_text(HARD_PUZZLE))
+                self.assertTrue(core.check_board())
+                self.assertTrue(core.solve(name))
+                self.assertTrue(core.is_solved() and core.check_board())
+                self.assertEqual(core.get_board().to_lists(), get_engine("dlx").solve(parse_board(HARD_PUZZLE)))
+
+        # Read-only boards, like corpus records, are copied before editing
+        frozen = CompactBoard(bytes(CompactBoard.from_text(HARD_PUZZLE).cells))
+        self.assertTrue(frozen.readonly)
+        core = SudokuCore(frozen)
+        self.assertFalse(core.get_board().readonly)
+        core.set_value(0, 1, 1)
+        core.set_board(frozen)
+        self.assertTrue(core.solve("propagation"))
+        self.assertEqual(str(frozen), HARD_PUZZLE)
+
+class TestSudokuBatch(unittest.TestCase):
+    def test_streams_solutions_in_order(self):
+        source = io.StringIO(f"{HARD_PUZZLE}\n\n# comment\n{EASY_PUZZLE}\n1234\n")
+        out, errors = io.StringIO(), io.StringIO()
+        results = sudoku_batch.solve_puzzles(sudoku_batch.read_puzzles(source))
+        failures = sudoku_batch.write_solutions(results, out, errors)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(failures, 1)
+        self.assertEqual(lines[2], sudoku_batch.INVALID)
+        self.assertIn("line 5", errors.getvalue())
+        for puzzle, line in zip((HARD_PUZZLE, EASY_PUZZLE), lines):
+            self.assertEqual(get_engine("dlx").solve(parse_board(puzzle)), parse_board(line))
+
+    def test_process_pool_matches_serial(self):
+        puzzles = list(enumerate([HARD_PUZZLE, EASY_PUZZLE, "1234"] * 5, 1))
+        serial = list(sudoku_batch.solve_puzzles(puzzles))
+        ordered = list(sudoku_batch.solve_puzzles(puzzles, workers=2, chunksize=2))
+        unordered = list(sudoku_batch.solve_puzzles(puzzles, workers=2, chunksize=2, ordered=False))
+
+        self.assertEqual([result[2] for result in ordered if not isinstance(result[2], ValueError)],
+                         [result[2] for result in serial if not isinstance(result[2], ValueError)])
+        self.assertEqual(sorted(result[0] for result in unordered), [number for number, _ in puzzles])
+
+    def test_unordered_tasks_finish_in_completion_order(self):
+        from model.sudoku_pool import run_tasks
+        # All tasks fit in the backlog, so they are all yielded by the final drain
+        tasks = [(sleep_then, 1.0, "slow")] + [(sleep_then, 0, f"fast {index}") for index in range(2)]
+        self.assertEqual(list(run_tasks(tasks, workers=2, ordered=False))[-1], "slow")
+        self.assertEqual(list(run_tasks(tasks, workers=2))[0], "slow")
+
+    def test_binary_corpus_round_trip_and_shards(self):
+        import os, tempfile
+        from model.sudoku_corpus import PuzzleCorpus, write_corpus
+        from model.sudoku_pool import solve_corpus
+        puzzles = [parse_board(HARD_PUZZLE), parse_board(EASY_PUZZLE)] * 3
+
+        with tempfile.TemporaryDirectory() as directory:
+            for packed in (True, False):
+                path = os.path.join(directory, f"corpus{packed}.sdk")
+                self.assertEqual(write_corpus(path, puzzles, packed=packed), 6)
+                with PuzzleCorpus(path) as corpus:
+                    self.assertEqual([board.to_lists() for board in corpus], puzzles)
+                    self.assertEqual(str(corpus[-1]), EASY_PUZZLE)
+                    shard = corpus.shard(1, 2)
+                    self.assertEqual((shard.start, shard.stop, str(shard[0])), (3, 6, EASY_PUZZLE))
+
+                results = list(solve_corpus(path, workers=2, chunksize=2, start=3))
+                self.assertEqual([result[0] for result in results], [3, 4, 5])
+                self.assertEqual(results[1][2], get_engine("dlx").solve(parse_board(HARD_PUZZLE)))
+
+    def test_invalid_corpus_files_are_closed_and_reported(self):
+        import os, tempfile
+        from unittest import mock
+        from commands import sudoku_corpus
+        from model.sudoku_corpus import PuzzleCorpus
+
+        with tempfile.TemporaryDirectory() as directory:
+            opened = []
+
+            def recording_open(*args, **kwargs):
+                opened.append(open(*args, **kwargs))
+                return opened[-1]
+
+            from model.sudoku_corpus import HEADER, MAGIC, VERSION, is_corpus
+            bad_size = HEADER.pack(MAGIC, VERSION, 0, 1, 1, HEADER.size) + bytes(64)
+            for contents in (b"", b"short", b"x" * 64, bad_size):
+                path = os.path.join(directory, "invalid.sdk")
+                with open(path, "wb") as file:
+                    file.write(contents)
+                with mock.patch("model.sudoku_corpus.open", recording_open, create=True):
+                    with self.assertRaises(ValueError):
+                        PuzzleCorpus(path)
+                self.assertTrue(opened[-1].closed)
+
+            source = os.path.join(directory, "puzzles.txt")
+            with open(source, "w") as file:
+                file.write(f"{EASY_PUZZLE}\n# comment\n{HARD_PUZZLE[:40]}\n")
+            errors = io.StringIO()
+            with mock.patch("sys.stderr", errors):
+                status = sudoku_corpus.run(["pack", source, os.path.join(directory, "out.sdk")])
+            self.assertEqual(status, 1)
+            self.assertIn("line 3", errors.getvalue())
+
+            missing = os.path.join(directory, "missing.sdk")
+            self.assertFalse(is_corpus(missing))
+            with mock.patch("sys.stderr", io.StringIO()):
+                self.assertEqual(sudoku_batch.run([missing]), 1)
+                self.assertEqual(sudoku_batch.run([path]), 1)
+
+class TestSolveService(unittest.TestCase):
+    def test_pipelined_requests_over_tcp(self):
+        import asyncio, json
+        from model.sudoku_service import SolveService
+
+        async def exchange():
+            service = SolveService(workers=1, batch_delay=0.01)
+            await service.start()
+            server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            try:
+                for number in range(6):
+                    writer.write((json.dumps({"id": number, "puzzle": EASY_PUZZLE}) + "\n").encode())
+                writer.write(b'{"id": "bad", "puzzle": "1234"}\nnot json\n')
+                await writer.drain()
+                answers = [json.loads(await reader.readline()) for _ in range(8)]
+                timeout = await service.handle_request({"id": "slow", "puzzle": HARD_PUZZLE, "timeout": 1e-6})
+                for bad in (True, 0, -1):
+                    rejected = await service.handle_request({"puzzle": HARD_PUZZLE, "timeout": bad})
+                    self.assertEqual(rejected["status"], "error")
+                return answers, timeout, service.health()
+            finally:
+                writer.close()
+                server.close()
+                await service.stop()
+
+        answers, timeout, health = asyncio.run(exchange())
+        by_id = {answer["id"]: answer for answer in answers}
+        solution = get_engine("dlx").solve(parse_board(EASY_PUZZLE))
+        self.assertEqual([parse_board(by_id[number]["solution"]) for number in range(6)], [solution] * 6)
+        self.assertEqual((by_id["bad"]["status"], by_id[None]["status"]), ("invalid", "error"))
+        self.assertEqual(timeout["status"], "timeout")
+        self.assertEqual((health["solved"], health["timeouts"]), (6, 1))
+        self.assertLess(health["batches"], 7)
+
+    def test_workers_give_up_at_the_deadline(self):
+        from time import monotonic
+        from model.sudoku_service import TIMEOUT, solve_request
+        self.assertEqual(solve_request("backtracking", HARD_PUZZLE, monotonic() + 60),
+                         get_engine("dlx").solve(parse_board(HARD_PUZZLE)))
+        for engine in ("backtracking", "bitmask"):
+            with self.subTest(engine=engine):
+                self.assertEqual(solve_request(engine, HARD_PUZZLE, monotonic() + 0.01), TIMEOUT)
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is not installed")
+class TestSudokuBulk(unittest.TestCase):
+    def test_validate_boards(self):
+        from model import sudoku_bulk
+
+        puzzle = parse_board(HARD_PUZZLE)
+        solution = get_engine("dlx").solve(puzzle)
+        broken = [row[:] for row in solution]
+        broken[4][0], broken[4][1] = broken[4][1], broken[4][1]
+
+        boards = [puzzle, solution, broken]
+        self.assertEqual(sudoku_bulk.validate_boards(boards).tolist(), [True, True, False])
+        self.assertEqual(sudoku_bulk.validate_boards(boards, complete=True).tolist(), [False, True, False])
+        self.assertEqual(sudoku_bulk.validate_boards([solution, solution], givens=[puzzle, broken]).tolist(),
+                         [True, False])
+
+        conflicts = sudoku_bulk.unit_conflicts(boards)
+        self.assertEqual(conflicts.shape, (3, 27))
+        self.assertEqual(conflicts[2].nonzero()[0].tolist(), [4, 9, 18 + 3])
+
+        # Out-of-range digits are invalid rather than wrapped around to uint8
+        out_of_range = []
+        for value in (-1, 256 + 5, 2 ** 70):
+            board = [row[:] for row in puzzle]
+            board[0][1] = value
+            out_of_range.append(board)
+        self.assertEqual(sudoku_bulk.validate_boards([puzzle] + out_of_range).tolist(), [True] + [False] * 3)
+
+class TestSolutionCache(unittest.TestCase):
+    def test_equivalent_puzzle_hits_cache(self):
+        engine = get_engine("propagation")
+        cache = SolutionCache(maxsize=8)
+        puzzle = parse_board(HARD_PUZZLE)
+        cache.solve(puzzle, engine)
+
+        transform = BoardTransform(True, [5, 3, 4, 0, 2, 1, 6, 8, 7], [2, 0, 1, 6, 7, 8, 3, 5, 4],
+                                   [0, 4, 7, 1, 9, 2, 8, 3, 6, 5])
+        equivalent = transform.apply(puzzle)
+        solution = cache.solve(equivalent, engine)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(solution, engine.solve(equivalent))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        engine = get_engine("propagation")
+        cache = SolutionCache(maxsize=2)
+        cache.solve(parse_board(HARD_PUZZLE), engine)
+        cache.solve(parse_board(EASY_PUZZLE), engine)
+        self.assertEqual(len(cache.entries), 2)
+        self.assertEqual(cache.solve(parse_board(EASY_PUZZLE), engine), engine.solve(parse_board(EASY_PUZZLE)))
+        self.assertEqual(cache.hits, 1)
+
+    def test_capacity_counts_puzzles(self):
+        from testing.sudoku_benchmark import load_corpus
+        from model.sudoku_format import parse_puzzle
+        engine = get_engine("propagation")
+        puzzles = [parse_puzzle(text) for text in load_corpus("easy")[:3]]
+
+        cache = SolutionCache(maxsize=1)
+        cache.solve(puzzles[0], engine)
+        self.assertEqual(cache.solve(puzzles[0], engine), engine.solve(puzzles[0]))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        cache = SolutionCache(maxsize=3)
+        for puzzle in puzzles * 2:
+            cache.solve(puzzle, engine)
+        self.assertEqual((len(cache.entries), cache.hits, cache.misses), (3, 3, 3))
+
+        cache.solve(parse_board(HARD_PUZZLE), engine)
+        self.assertEqual(len(cache.entries), 3)
+        self.assertNotIn(tuple(num for row in puzzles[0] for num in row), cache.exact)
+
+class TestTechniqueGrader(unittest.TestCase):
+    XWING_PUZZLE = "1.....569492.561.8.561.924...964.8.1.64.1....218.356.4.4.5...169.5.614.2621.....5"
+
+    def test_grades_by_hardest_technique(self):
+        from model.sudoku_grader import TechniqueGrader
+        grader = TechniqueGrader()
+        grade = grader.grade(parse_board(EASY_PUZZLE))
+        self.assertEqual(grade["status"], "solved")
+        self.assertIn(grade["technique"], ("naked single", "hidden single"))
+        self.assertEqual(sum(grade["counts"].values()), grade["steps"])
+
+        grade = grader.grade(parse_board(self.XWING_PUZZLE))
+        self.assertEqual((grade["status"], grade["technique"]), ("solved", "x-wing"))
+        self.assertEqual(grader.grade(parse_board(HARD_PUZZLE))["technique"], "guess")
+
+        puzzle = parse_board(HARD_PUZZLE)
+        puzzle[0][1] = 8
+        self.assertEqual(grader.grade(puzzle)["status"], "unsolvable")
+
+    def test_hints_agree_with_the_solution(self):
+        from model.sudoku_grader import TechniqueGrader
+        grader = TechniqueGrader()
+        puzzle = parse_board(self.XWING_PUZZLE)
+        solution = [num for row in get_engine("dlx").solve(puzzle) for num in row]
+        values, candidates = grader.load(puzzle)
+        while hints := grader.next_hints(values, candidates):
+            for hint in hints:
+                self.assertTrue(all(solution[cell] == digit for cell, digit in hint.placements), hint)
+                self.assertTrue(all(solution[cell] != digit for cell, digit in hint.eliminations), hint)
+                grader.apply(hint, values, candidates)
+        self.assertEqual(values, solution)
+
+        hint = grader.next_hint(parse_board(self.XWING_PUZZLE))
+        self.assertEqual(str(hint), "Locked candidates R5C4 R6C4 in square 5 and column 4: removes 9 from R9C4")
+        self.assertIsNone(grader.next_hint(get_engine("dlx").solve(puzzle)))
+
+class TestSudokuGenerator(unittest.TestCase):
+    def test_generated_puzzles_are_unique(self):
+        from model.sudoku_generator import SudokuGenerator
+        generator = SudokuGenerator(seed=7)
+        counter = get_engine("propagation")
+
+        for clues, difficulty in ((None, None), (30, "easy")):
+            with self.subTest(clues=clues, difficulty=difficulty):
+                puzzle = generator.generate(clues, difficulty)
+                self.assertEqual(counter.count_solutions(puzzle), 1)
+                if clues is not None:
+                    self.assertEqual(sum(1 for row in puzzle for num in row if num), clues)
+                if difficulty is not None:
+                    self.assertEqual(generator.grade(puzzle), difficulty)
+
+    def test_seeded_batch_is_reproducible(self):
+        from model.sudoku_generator import generate_many
+        serial = list(generate_many(4, seed="batch", chunksize=3))
+        self.assertEqual(list(generate_many(4, seed="batch", workers=2, chunksize=1)), serial)
+        self.assertNotEqual(list(generate_many(4, seed="other")), serial)
+
+    def test_unreachable_clue_count_is_reported(self):
+        from unittest import mock
+        from commands import sudoku_generate
+        errors = io.StringIO()
+        with mock.patch("sys.stderr", errors):
+            self.assertEqual(sudoku_generate.run(["--size", "2", "--clues", "1", "--seed", "1"]), 1)
+        self.assertIn("1 clues", errors.getvalue())
+
+class TestSudokuBenchmark(unittest.TestCase):
+    def test_benchmark_and_compare(self):
+        from testing import sudoku_benchmark
+
+        result = sudoku_benchmark.benchmark("propagation", sudoku_benchmark.load_corpus("easy")[:5], repeat=1)
+        self.assertEqual((result["puzzles"], result["failures"], result["nodes"]), (5, 0, 0))
+
+        slower = dict(result, p99_ms=result["p99_ms"] * 3 + 1, nodes=10)
+        regressions = sudoku_benchmark.compare({"propagation/easy": slower}, {"propagation/easy": result}, 0.5)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("nodes per puzzle", regressions[0])
+        self.assertEqual(sudoku_benchmark.compare({"propagation/easy": result}, {}, 0.5), [])
+
+        # Timings alone never fail the comparison, they are only warned about
+        slower = dict(result, p99_ms=result["p99_ms"] * 3 + 1)
+        self.assertEqual(sudoku_benchmark.compare({"propagation/easy": slower}, {"propagation/easy": result}, 0.5), [])
+        warnings = sudoku_benchmark.compare_timings({"propagation/easy": slower}, {"propagation/easy": result}, 0.5)
+        self.assertEqual(len(warnings), 1)
+
+@unittest.skipUnless(importlib.util.find_spec("PyQt6"), "PyQt6 is not installed")
+class TestQtAdapter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import os
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6.QtWidgets import QApplication
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_worker_reports_a_failed_solve(self):
+        from model.sudoku_board import SudokuBoard
+        from worker.worker import Worker
+
+        def fail(*args):
+            raise RuntimeError("engine broke")
+
+        model = SudokuBoard()
+        model.solve = fail
+        statuses = []
+        worker = Worker(model, None, "propagation")
+        worker.solveFinished.connect(statuses.append)
+        worker.run()
+        self.assertEqual(statuses, ["failed"])
+        self.assertEqual(worker.error, "RuntimeError: engine broke")
+
+    def recorded_board(self):
+        from model.sudoku_board import SudokuBoard
+        model = SudokuBoard()
+        change_sets = []
+        model.boardChanged.connect(change_sets.append)
+        return model, change_sets
+
+    def changes_by_tile(self, model, changes):
+        tiles = {}
+        for square_row, square_col, pos, value, conflict in changes:
+            for row in range(model.row_col_len):
+                for col in range(model.row_col_len):
+                    if model.translate_tile_to_view(row, col) == (square_row, square_col, pos):
+                        tiles[row, col] = (value, conflict)
+        return tiles
+
+    def test_flush_sends_one_change_set_with_conflicts(self):
+        model, change_sets = self.recorded_board()
+        model.set_value(0, 0, 5)
+        model.set_value(0, 1, 3)
+        model.set_value(0, 0, 7)
+        self.assertEqual(change_sets, [])
+
+        model.flush_view()
+        self.assertEqual(len(change_sets), 1)
+        self.assertEqual(self.changes_by_tile(model, change_sets[0]), {(0, 0): (7, False), (0, 1): (3, False)})
+
+        # A clash flags the untouched peer too, and clearing it unflags both
+        model.set_value(8, 1, 3)
+        model.flush_view()
+        self.assertEqual(self.changes_by_tile(model, change_sets[1]), {(8, 1): (3, True), (0, 1): (3, True)})
+        model.set_value(8, 1, 0)
+        model.flush_view()
+        self.assertEqual(self.changes_by_tile(model, change_sets[2]), {(8, 1): (0, False), (0, 1): (3, False)})
+
+        model.flush_view()
+        self.assertEqual(len(change_sets), 3)
+
+    def test_frame_timer_coalesces_updates(self):
+        from time import monotonic
+        model, change_sets = self.recorded_board()
+        model.start_animation()
+        try:
+            for value in range(1, 10):
+                model.update_view(4, 4, value)
+            deadline = monotonic() + 2
+            while not change_sets and monotonic() < deadline:
+                self.app.processEvents()
+            self.assertEqual(len(change_sets), 1)
+            self.assertEqual(self.changes_by_tile(model, change_sets[0]), {(4, 4): (9, False)})
+
+            model.update_view(2, 2, 1)
+        finally:
+            model.stop_animation()
+        self.assertEqual(len(change_sets), 2)
+        self.assertFalse(model.frame_timer.isActive())
+
+    def test_refresh_view_redisplays_the_board(self):
+        model, change_sets = self.recorded_board()
+        model.load_board(parse_board(EASY_PUZZLE))
+        model.flush_view()
+
+        # A replay showed other values; refreshing sends the real board back
+        model.refresh_view()
+        model.flush_view()
+        self.assertEqual(len(change_sets), 2)
+        tiles = self.changes_by_tile(model, change_sets[1])
+        self.assertEqual(len(tiles), 81)
+        self.assertEqual({tile: value for tile, (value, _) in tiles.items()},
+                         {(row, col): model.board[row][col] for row in range(9) for col in range(9)})
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
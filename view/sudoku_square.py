@@ -10,6 +10,8 @@ class SudokuSquare(QWidget):
 
     Attributes
     ----------
+    square_size : int
+        The number of tiles along one side of the square
     square: list
         A collection of SudokuTile objects
     
@@ -22,9 +24,20 @@ class SudokuSquare(QWidget):
         String representation of the SudokuSquare object
     """
     
-    def __init__(self):
+    def __init__(self, square_size=3, tile_size=50):
+        """
+        Parameters
+        ----------
+        square_size : int, optional
+            The number of tiles along one side of the square, default 3
+        tile_size : int, optional
+            The width of a tile in pixels, default 50
+        """
+        
         super().__init__()
-        self.setFixedSize(QSize(156, 156))
+        self.square_size = square_size
+        side = square_size * (tile_size + 2)
+        self.setFixedSize(QSize(side, side))
 
         # Establishes the layout of the SudokuSquare object
         self.layout = QGridLayout()
@@ -34,9 +47,9 @@ class SudokuSquare(QWidget):
         self.square = []
 
         # Initialize and add SudokuTile widgets to the layout
-        for j in range(3):
-            for k in range(3):
-                tile = SudokuTile()
+        for j in range(square_size):
+            for k in range(square_size):
+                tile = SudokuTile(tile_size, square_size * square_size)
                 self.square.append(tile)
                 self.layout.addWidget(tile, j, k)
     
@@ -1,4 +1,6 @@
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import QPushButton
+from model.sudoku_format import value_of
 
 class SudokuTile(QPushButton):
     """
@@ -6,10 +8,20 @@ class SudokuTile(QPushButton):
 
     ...
     
+    Attributes
+    ----------
+    max_value : int
+        The largest value the tile accepts, 9 on a 9x9 board
+    valueEntered : pyqtSignal
+        Emitted with the value typed into the tile, 0 when it is cleared
+
     Methods
     -------
+    set_conflict(conflict)
+        Highlights the tile while its value conflicts with a peer
+
     keyPressEvent(event)
-        Registers the numbers 1-9 on key press
+        Reports the symbols up to max_value typed on the tile
 
     mousePressEvent(event)
         Highlights the current tile position 
@@ -18,22 +30,43 @@ class SudokuTile(QPushButton):
         String representation of the SudokuTile object
     """
     
-    def __init__(self):
+    # Signal to emit when a value is typed into the tile
+    valueEntered = pyqtSignal(int)
+    
+    def __init__(self, tile_size=50, max_value=9):
+        """
+        Parameters
+        ----------
+        tile_size : int, optional
+            The width of the tile in pixels, default 50
+        max_value : int, optional
+            The largest value the tile accepts, default 9
+        """
+        
         super().__init__()
-        self.setFixedSize(50, 50)  # Fixed size for each tile
+        self.max_value = max_value
+        self.setFixedSize(tile_size, tile_size)  # Fixed size for each tile
         self.setText("")  # Start with an empty text
         self.hasFocus = False  # Flag to track focus state
         
         # Style adjustments
-        self.setStyleSheet("""
-            QPushButton {
+        self.setStyleSheet(f"""
+            QPushButton {{
                 border: 1px solid black;
-                font-size: 16px;
-            }
-            QPushButton:focus {
+                font-size: {min(16, tile_size // 2)}px;
+            }}
+            QPushButton[conflict="true"] {{
+                background-color: #F4A6A6;
+                color: #8B0000;
+            }}
+            QPushButton:focus {{
                 background-color: #81CFED;
                 color: white;
-            }
+            }}
+            QPushButton[conflict="true"]:focus {{
+                background-color: #E57373;
+                color: white;
+            }}
         """)
     
     def set_text(self, text):
@@ -47,19 +80,45 @@ class SudokuTile(QPushButton):
         
         self.setText(text)
 
+    def set_conflict(self, conflict):
+        """Highlights the tile while its value conflicts with a peer
+
+        Parameters
+        ----------
+        conflict : bool
+            Whether the tile conflicts
+        """
+        
+        if self.property("conflict") == conflict:
+            return
+        self.setProperty("conflict", conflict)
+        self.style().unpolish(self)
+        self.style().polish(self)
+
     def keyPressEvent(self, event):
-        """Registers the numbers 1-9 in Tile cell on key press
+        """Reports the symbols 1-9, then A-P, up to max_value typed on the tile
+        
+        Backspace, Delete, 0 and "." clear the tile. The text is not changed
+        here; the controller updates the model, which updates the tile.
         
         Parameters
         ----------
-        event : QMouseEvent
-            A mouse click
+        event : QKeyEvent
+            A key press
         """
         
-        key = event.key()
-        if 49 <= key <= 57:  # ASCII values for digits 1-9
-            digit = chr(key)
-            self.setText(digit)
+        if event.key() in (Qt.Key.Key_Backspace, Qt.Key.Key_Delete):
+            self.valueEntered.emit(0)
+            return
+        text = event.text().upper()
+        if len(text) != 1:
+            return
+        try:
+            value = value_of(text)
+        except ValueError:
+            return
+        if value <= self.max_value:
+            self.valueEntered.emit(value)
 
     def mousePressEvent(self, event):
         """Highlights the current tile position
@@ -1,6 +1,8 @@
-from PyQt6.QtWidgets import QMainWindow, QWidget, QGridLayout, QPushButton, QGridLayout, QMessageBox
+from PyQt6.QtWidgets import QMainWindow, QWidget, QGridLayout, QPushButton, QGridLayout, QMessageBox, QComboBox, QSlider, QCheckBox, QHBoxLayout, QFileDialog
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon
 from view.sudoku_square import SudokuSquare
+from model.sudoku_format import symbol_for
 
 class SudokuView(QMainWindow):
     """
@@ -10,6 +12,8 @@ class SudokuView(QMainWindow):
 
     Attributes
     ----------
+    square_size : int
+        The number of tiles along one side of a SudokuSquare (2 - 5)
     squares: list
         A collection of lists of SudokuSquare objects
     board : list
@@ -26,32 +30,108 @@ class SudokuView(QMainWindow):
     get_solve_button()
         Gets the solve button
     
+    get_clear_button()
+        Gets the clear button
+    
+    get_hint_button()
+        Gets the hint button
+    
     get_quit_button()
         Gets the quit button
     
+    get_stop_button()
+        Gets the stop button
+    
+    get_engine_box()
+        Gets the solving engine selector
+    
+    set_engines(names)
+        Fills the solving engine selector
+    
+    get_selected_engine()
+        Gets the name of the selected solving engine
+    
+    get_speed_slider()
+        Gets the solving speed slider
+    
+    get_instant_box()
+        Gets the instant solving checkbox
+    
+    get_parallel_box()
+        Gets the checkbox for searching on every CPU
+    
+    get_record_box()
+        Gets the checkbox for recording solves
+    
+    get_replay_button()
+        Gets the button playing and pausing the recorded trace
+    
+    get_save_trace_button()
+        Gets the button saving the recorded trace
+    
+    get_load_trace_button()
+        Gets the button loading a saved trace
+    
+    get_trace_slider()
+        Gets the slider seeking through the recorded trace
+    
+    set_trace_length(length)
+        Enables the replay controls for a trace of length operations
+    
+    set_trace_position(position)
+        Moves the trace slider without seeking
+    
+    set_replay_playing(playing)
+        Shows whether the trace is playing on the replay button
+    
+    ask_trace_path(save)
+        Asks for the file to save a trace to or load one from
+    
+    trace_error_message(message)
+        Displays a message explaining why a trace could not be used
+    
     get_squares()
         Gets a 2D list of SudokuSquares
     
     update_tile(square_row, square_col, pos, value)
         Updates the current tile text with the provided value
     
-    validation_result_message(result)
+    set_tile_conflict(square_row, square_col, pos, conflict)
+        Highlights or clears the highlight of a conflicting tile
+    
+    apply_changes(changes)
+        Displays a change set from the model in a single repaint
+    
+    validation_result_message(result, uniqueness=None, conflicts=None)
         Displays a message indicating the result of the validation check
     
+    solve_result_message(status)
+        Displays a message explaining why a solve did not finish
+    
+    show_solve_stats(stats, winner=None)
+        Displays the search stats of the last solve in the status bar
+    
+    show_solve_error(error)
+        Displays the error that ended the last solve in the status bar
+    
+    show_hint(message, tile=None)
+        Displays a hint in the status bar and focuses the tile it is about
+    
     shutdown()
         Executes the shutdown process
     """
     
-    def __init__(self):
+    def __init__(self, square_size=3):
         """
         Parameters
         ----------
-        board: list
-            A list of lists of integers from the model
+        square_size : int, optional
+            The number of tiles along one side of a SudokuSquare, default 3
         """
         
         # Establishes board and UI
         super().__init__()
+        self.square_size = square_size
         self.init_ui()
         
     def init_ui(self):
@@ -61,18 +141,23 @@ class SudokuView(QMainWindow):
         # Establishes window elements
         self.setWindowIcon(QIcon('../assets/sudoku_icon.png'))
         self.setWindowTitle("Sudoku Solver")
-        self.setFixedSize(550, 550)  # Adjusted for spacing and margins
+        
+        # Shrinks the tiles of larger boards so every size fits on screen
+        size = self.square_size
+        tile_size = min(50, 450 // (size * size))
+        board_size = size * (size * tile_size + 2 * size) + 10 * (size - 1)
+        self.setFixedSize(board_size + 62, board_size + 392)  # Adjusted for spacing and margins
 
         # Establishes the layout of the board
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
         self.grid_layout = QGridLayout(self.central_widget)
-        self.grid_layout.setSpacing(10)  # Spacing between the 3x3 Sudoku squares
+        self.grid_layout.setSpacing(10)  # Spacing between the Sudoku squares
 
-        # Create and add 9 SudokuSquare widgets to form the 9x9 board
-        self.squares = [[SudokuSquare() for _ in range(3)] for _ in range(3)]
-        for i in range(3):
-            for j in range(3):
+        # Create and add the SudokuSquare widgets that form the board
+        self.squares = [[SudokuSquare(size, tile_size) for _ in range(size)] for _ in range(size)]
+        for i in range(size):
+            for j in range(size):
                 self.grid_layout.addWidget(self.squares[i][j], i, j)
                 
         # Sets up buttons on the main board
@@ -82,8 +167,49 @@ class SudokuView(QMainWindow):
         self.solve_button = QPushButton("Solve Board")
         self.grid_layout.addWidget(self.solve_button)
         
+        self.clear_button = QPushButton("Clear Board")
+        self.grid_layout.addWidget(self.clear_button)
+        
+        self.hint_button = QPushButton("Hint")
+        self.grid_layout.addWidget(self.hint_button)
+        
+        self.stop_button = QPushButton("Stop Solving")
+        self.grid_layout.addWidget(self.stop_button)
+        
         self.quit_button = QPushButton("Quit")
         self.grid_layout.addWidget(self.quit_button)
+        
+        self.engine_box = QComboBox()
+        self.grid_layout.addWidget(self.engine_box)
+        
+        # Speed of the solving animation, from slowest (left) to full speed (right)
+        self.speed_slider = QSlider(Qt.Orientation.Horizontal)
+        self.speed_slider.setRange(0, 100)
+        self.speed_slider.setValue(33)
+        self.grid_layout.addWidget(self.speed_slider)
+        
+        self.instant_box = QCheckBox("Instant")
+        self.grid_layout.addWidget(self.instant_box)
+        
+        # Splits the search of one puzzle across every CPU
+        self.parallel_box = QCheckBox("Use all cores")
+        self.grid_layout.addWidget(self.parallel_box)
+        
+        # Records solves so they can be replayed, scrubbed and saved
+        self.trace_controls = QWidget()
+        trace_layout = QHBoxLayout(self.trace_controls)
+        trace_layout.setContentsMargins(0, 0, 0, 0)
+        self.record_box = QCheckBox("Record")
+        self.replay_button = QPushButton("Replay")
+        self.save_trace_button = QPushButton("Save Trace")
+        self.load_trace_button = QPushButton("Load Trace")
+        for widget in (self.record_box, self.replay_button, self.save_trace_button, self.load_trace_button):
+            trace_layout.addWidget(widget)
+        self.grid_layout.addWidget(self.trace_controls)
+        
+        self.trace_slider = QSlider(Qt.Orientation.Horizontal)
+        self.grid_layout.addWidget(self.trace_slider)
+        self.set_trace_length(None)
     
     def get_validate_button(self):
         """Gets the validate button
@@ -103,6 +229,33 @@ class SudokuView(QMainWindow):
         
         return self.solve_button
     
+    def get_clear_button(self):
+        """Gets the clear button
+        
+        Returns:
+            The clear button
+        """
+        
+        return self.clear_button
+    
+    def get_hint_button(self):
+        """Gets the hint button
+        
+        Returns:
+            The hint button
+        """
+        
+        return self.hint_button
+    
+    def get_stop_button(self):
+        """Gets the stop button
+        
+        Returns:
+            The stop button
+        """
+        
+        return self.stop_button
+    
     def get_quit_button(self):
         """Gets the quit button
         
@@ -112,6 +265,177 @@ class SudokuView(QMainWindow):
         
         return self.quit_button
     
+    def get_engine_box(self):
+        """Gets the solving engine selector
+        
+        Returns:
+            The solving engine selector
+        """
+        
+        return self.engine_box
+    
+    def set_engines(self, names):
+        """Fills the solving engine selector
+        
+        Parameters
+        ----------
+        names : list
+            The names of the solving engines to offer
+        """
+        
+        self.engine_box.clear()
+        self.engine_box.addItems(names)
+    
+    def get_selected_engine(self):
+        """Gets the name of the selected solving engine
+        
+        Returns:
+            The name of the selected solving engine
+        """
+        
+        return self.engine_box.currentText()
+    
+    def get_speed_slider(self):
+        """Gets the solving speed slider
+        
+        Returns:
+            The solving speed slider
+        """
+        
+        return self.speed_slider
+    
+    def get_instant_box(self):
+        """Gets the instant solving checkbox
+        
+        Returns:
+            The instant solving checkbox
+        """
+        
+        return self.instant_box
+    
+    def get_parallel_box(self):
+        """Gets the checkbox for searching on every CPU
+        
+        Returns:
+            The parallel search checkbox
+        """
+        
+        return self.parallel_box
+    
+    def get_record_box(self):
+        """Gets the checkbox for recording solves
+        
+        Returns:
+            The recording checkbox
+        """
+        
+        return self.record_box
+    
+    def get_replay_button(self):
+        """Gets the button playing and pausing the recorded trace
+        
+        Returns:
+            The replay button
+        """
+        
+        return self.replay_button
+    
+    def get_save_trace_button(self):
+        """Gets the button saving the recorded trace
+        
+        Returns:
+            The save trace button
+        """
+        
+        return self.save_trace_button
+    
+    def get_load_trace_button(self):
+        """Gets the button loading a saved trace
+        
+        Returns:
+            The load trace button
+        """
+        
+        return self.load_trace_button
+    
+    def get_trace_slider(self):
+        """Gets the slider seeking through the recorded trace
+        
+        Returns:
+            The trace slider
+        """
+        
+        return self.trace_slider
+    
+    def set_trace_length(self, length):
+        """Enables the replay controls for a trace of length operations
+        
+        Parameters
+        ----------
+        length : int
+            The number of operations in the trace, None to disable replay
+        """
+        
+        self.trace_slider.blockSignals(True)
+        self.trace_slider.setRange(0, length or 0)
+        self.trace_slider.blockSignals(False)
+        for widget in (self.replay_button, self.save_trace_button, self.trace_slider):
+            widget.setDisabled(length is None)
+        self.set_replay_playing(False)
+    
+    def set_trace_position(self, position):
+        """Moves the trace slider without seeking
+        
+        Parameters
+        ----------
+        position : int
+            The number of operations applied
+        """
+        
+        self.trace_slider.blockSignals(True)
+        self.trace_slider.setValue(position)
+        self.trace_slider.blockSignals(False)
+    
+    def set_replay_playing(self, playing):
+        """Shows whether the trace is playing on the replay button
+        
+        Parameters
+        ----------
+        playing : bool
+            Whether the trace is playing
+        """
+        
+        self.replay_button.setText("Pause" if playing else "Replay")
+    
+    def ask_trace_path(self, save):
+        """Asks for the file to save a trace to or load one from
+        
+        Parameters
+        ----------
+        save : bool
+            Whether the trace is being saved rather than loaded
+        
+        Returns:
+            The chosen path, or an empty string if cancelled
+        """
+        
+        if save:
+            path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "", "Sudoku traces (*.sdt)")
+        else:
+            path, _ = QFileDialog.getOpenFileName(self, "Load Trace", "", "Sudoku traces (*.sdt)")
+        return path
+    
+    def trace_error_message(self, message):
+        """Displays a message explaining why a trace could not be used
+        
+        Parameters
+        ----------
+        message : str
+            The reason
+        """
+        
+        QMessageBox.critical(self, "Trace error", message, QMessageBox.StandardButton.Ok)
+    
     def get_squares(self):
         """Gets a 2D list of SudokuSquares
         
@@ -136,28 +460,142 @@ class SudokuView(QMainWindow):
                 The value to update the SudokuTile with
         """
         
-        if value == 0:
-            self.squares[square_row][square_col].get_list()[pos].set_text("")
-        else:
-            self.squares[square_row][square_col].get_list()[pos].set_text(str(value))
+        self.squares[square_row][square_col].get_list()[pos].set_text(symbol_for(value))
+    
+    def set_tile_conflict(self, square_row, square_col, pos, conflict):
+        """Highlights or clears the highlight of a conflicting tile
+        
+        Parameters
+        ----------
+        square_row : int
+            The SudokuSquare row location
+        square_col : int
+            The SudokuSquare column location
+        pos : int
+            The position in the SudokuSquare list
+        conflict : bool
+            Whether the tile conflicts with a peer
+        """
+        
+        self.squares[square_row][square_col].get_list()[pos].set_conflict(conflict)
     
-    def validation_result_message(self, result):
+    def apply_changes(self, changes):
+        """Displays a change set from the model in a single repaint
+        
+        Painting is suspended while the tiles change, so a whole board
+        costs one repaint instead of one per tile.
+        
+        Parameters
+        ----------
+        changes : list
+            (square_row, square_col, pos, value, conflict) tuples, one per
+            changed tile
+        """
+        
+        self.central_widget.setUpdatesEnabled(False)
+        try:
+            for square_row, square_col, pos, value, conflict in changes:
+                tile = self.squares[square_row][square_col].get_list()[pos]
+                tile.set_text(symbol_for(value))
+                tile.set_conflict(conflict)
+        finally:
+            self.central_widget.setUpdatesEnabled(True)
+    
+    def validation_result_message(self, result, uniqueness=None, conflicts=None):
         """Displays a message indicating the result of the validation check
         
         Parameters
         ----------
         result : boolean
             The result of the validation
+        uniqueness : str, optional
+            "unique", "multiple" or "none" solutions, or "unknown" if the
+            check ran out of time, default not checked
+        conflicts : list, optional
+            The (row, col) pairs of the conflicting tiles, default not listed
         """
         
-        if result:
-            QMessageBox.information(self, "Success!", "This is a valid Sudoku board",
+        messages = {
+            "unique": "This is a valid Sudoku board with a unique solution.",
+            "multiple": "This is a valid Sudoku board, but it has multiple solutions.",
+            "none": "This board breaks no rules, but it has no solution.",
+            "unknown": "This is a valid Sudoku board. It is too open to tell quickly whether its solution "
+                       "is unique.",
+        }
+        
+        if result and uniqueness == "none":
+            QMessageBox.warning(self, "No solution", messages[uniqueness],
+                                QMessageBox.StandardButton.Ok)
+        elif result:
+            QMessageBox.information(self, "Success!", messages.get(uniqueness, "This is a valid Sudoku board"),
                                     QMessageBox.StandardButton.Ok)
         else:
-            QMessageBox.critical(self, "Error!", "This is not a valid Sudoku board. Please correct it before moving forward.",
+            message = "This is not a valid Sudoku board. Please correct it before moving forward."
+            if conflicts:
+                cells = ", ".join(f"R{row + 1}C{col + 1}" for row, col in conflicts[:12])
+                more = f" and {len(conflicts) - 12} more" if len(conflicts) > 12 else ""
+                message += f"\n\nConflicting tiles: {cells}{more}"
+            QMessageBox.critical(self, "Error!", message,
                                     QMessageBox.StandardButton.Ok)
         
     
+    def solve_result_message(self, status):
+        """Displays a message explaining why a solve did not finish
+        
+        Parameters
+        ----------
+        status : str
+            The model's solve status
+        """
+        
+        messages = {
+            "unsolvable": "This Sudoku board has no solution.",
+            "cancelled": "Solving was stopped.",
+            "paused": "Solving ran out of time and was stopped.",
+        }
+        QMessageBox.warning(self, "Not solved", messages.get(status, f"Solving ended: {status}"),
+                            QMessageBox.StandardButton.Ok)
+    
+    def show_solve_stats(self, stats, winner=None):
+        """Displays the search stats of the last solve in the status bar
+        
+        Parameters
+        ----------
+        stats : SolveStats
+            The counters and timings of the last solve
+        winner : str, optional
+            The portfolio strategy that answered first, default None
+        """
+        
+        self.statusBar().showMessage(f"{winner} won: {stats}" if winner else str(stats))
+    
+    def show_solve_error(self, error):
+        """Displays the error that ended the last solve in the status bar
+        
+        Parameters
+        ----------
+        error : str
+            The exception raised by the solve
+        """
+        
+        self.statusBar().showMessage(f"Solving failed: {error}")
+    
+    def show_hint(self, message, tile=None):
+        """Displays a hint in the status bar and focuses the tile it is about
+        
+        Parameters
+        ----------
+        message : str
+            The hint
+        tile : tuple, optional
+            The (square_row, square_col, pos) of the tile to focus
+        """
+        
+        self.statusBar().showMessage(message)
+        if tile is not None:
+            square_row, square_col, pos = tile
+            self.squares[square_row][square_col].get_list()[pos].setFocus()
+    
     def shutdown(self):
         """Executes the shutdown process
         """
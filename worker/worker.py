@@ -1,4 +1,6 @@
+from time import monotonic
 from PyQt6.QtCore import QThread, pyqtSignal
+from model.sudoku_iterative import FAILED
 
 class Worker(QThread):
     """
@@ -11,14 +13,31 @@ class Worker(QThread):
         The model being adjusted
     controller : SudokuController
         The controller handling user decisions
+    engine : str
+        The name of the solving engine to use
+    time_budget : float
+        Seconds the solve may take before it gives up, None for no limit
+    workers : int
+        The number of processes searching the board, 0 for one per CPU
+    solveFinished : pyqtSignal
+        Emitted with the model's solve status once the solve ends, FAILED
+        if the solve raised
+    error : str
+        The exception the last solve raised, None if it did not
         
     Methods
     -------
     run()
         Runs the worker thread
+    
+    cancel()
+        Asks the running solve to stop
     """
     
-    def __init__(self, model, controller):
+    # Signal to emit when the solve ends
+    solveFinished = pyqtSignal(str)
+    
+    def __init__(self, model, controller, engine="backtracking", time_budget=None, workers=1):
         """
         Parameters
         ----------
@@ -26,21 +45,43 @@ class Worker(QThread):
             The model being adjusted
         controller : SudokuController
             The controller handling user decisions
+        engine : str, optional
+            The name of the solving engine to use, default "backtracking"
+        time_budget : float, optional
+            Seconds the solve may take before it gives up, default no limit
+        workers : int, optional
+            The number of processes searching the board, default 1 and 0 for
+            one per CPU
         """
         
         super().__init__()
         self.model = model
         self.controller = controller
+        self.engine = engine
+        self.time_budget = time_budget
+        self.workers = workers
+        self.error = None
 
     def run(self):
         """Runs the worker thread
         """
         
-        # Disables buttons on the board until the board is solved
-        self.controller.disable_buttons()
+        deadline = None
+        if self.time_budget is not None:
+            deadline = monotonic() + self.time_budget
         
-        # Solves the board
-        self.model.solve_board()
+        # Solves the board and reports how the solve ended, even if it
+        # raised, so the controller always gets the board back
+        self.error = None
+        try:
+            self.model.solve(self.engine, deadline, self.workers)
+        except Exception as error:
+            self.error = f"{type(error).__name__}: {error}"
+            self.model.status = FAILED
+        self.solveFinished.emit(self.model.status)
+    
+    def cancel(self):
+        """Asks the running solve to stop
+        """
         
-        # Enables buttons once the board is solved
-        self.controller.enable_buttons()
\ No newline at end of file
+        self.model.cancel_solve()